@@ -8,6 +8,7 @@ from apps.inventory.api_v1.views import (
     StockReportViewSet,
     InventoryTransactionViewSet,
     StockJournalViewSet,
+    VoucherSeriesViewSet,
     BulkInventoryTransactionView,
 )
 
@@ -26,6 +27,7 @@ router.register(
 )
 router.register("financial-year", FinancialYearViewSet, basename="financial-year")
 router.register("stock-journal", StockJournalViewSet, basename="stock-journal")
+router.register("voucher-series", VoucherSeriesViewSet, basename="voucher-series")
 
 
 urlpatterns = [
@@ -1,7 +1,10 @@
+import math
+
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from rest_framework import serializers
 from apps.main.serializers import BaseModelSerializer
-from django.db.models import Max
+from apps.main.fastpath import ValuesSerializer
 from apps.inventory.models import (
     Openingstock,
     FinancialYear,
@@ -9,7 +12,18 @@ from apps.inventory.models import (
     InventoryTransaction,
     StockJournal,
     StockJournalEntry,
+    VoucherSeries,
+)
+from apps.inventory.functions import (
+    STOCK_ADJUSTMENT,
+    STOCK_JOURNAL,
+    STOCK_TRANSFER,
+    number_stock_journals,
+    post_stock_journal,
+    unpost_stock_journal,
 )
+from apps.item.models import Godown, StockItem
+from apps.main.functions import get_auto_id, get_auto_ids
 # from datetime import  date
 
 
@@ -121,6 +135,8 @@ class CreateInventoryTransactionSerializer(InventoryBaseSerializer):
             "creator",
             "updated_at",
             "updated_by",
+            "entered_unit",
+            "entered_quantity",
         ]
 
     def validate(self, data):
@@ -136,15 +152,23 @@ class CreateInventoryTransactionSerializer(InventoryBaseSerializer):
 
     def create(self, validated_data):
         transaction = InventoryTransaction(**validated_data)
-        transaction.save()
+        self._save(transaction)
         return transaction
 
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        self._save(instance)
         return instance
 
+    def _save(self, instance):
+        try:
+            instance.save()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(
+                e.message_dict if hasattr(e, "error_dict") else e.messages
+            )
+
 
 class ListInventoryTransactionSerializer(InventoryBaseSerializer):
     item_name = serializers.CharField(source="item.name", read_only=True)
@@ -163,6 +187,8 @@ class ListInventoryTransactionSerializer(InventoryBaseSerializer):
             "godown",
             "godown_name",
             "quantity",
+            "entered_unit",
+            "entered_quantity",
             "transaction_type",
             "evaluation_method",
             "transaction_date",
@@ -173,6 +199,10 @@ class ListInventoryTransactionSerializer(InventoryBaseSerializer):
         read_only_fields = ["id", "transaction_date"]
 
 
+class ListInventoryTransactionValues(ValuesSerializer):
+    serializer_class = ListInventoryTransactionSerializer
+
+
 # class InventoryTransactionSerializer(BaseModelSerializer):
 #     class Meta:
 #         model = InventoryTransaction
@@ -341,98 +371,206 @@ class ListInventoryTransactionSerializer(InventoryBaseSerializer):
 #         print(f"Transaction Effect Logged: {transaction.transaction_type} - {transaction.quantity} units at {transaction.godown}")
 
 
+class VoucherSeriesSerializer(BaseModelSerializer):
+    class Meta:
+        model = VoucherSeries
+        fields = "__all__"
+        read_only_fields = [
+            "id",
+            "auto_id",
+            "organization_id",
+            "date_added",
+            "creator",
+            "updated_at",
+            "updated_by",
+        ]
+
+    def validate(self, data):
+        series = VoucherSeries(
+            prefix=data.get("prefix", getattr(self.instance, "prefix", "")),
+            padding=data.get("padding", getattr(self.instance, "padding", 4)),
+            reset_every_financial_year=data.get(
+                "reset_every_financial_year",
+                getattr(self.instance, "reset_every_financial_year", True),
+            ),
+        )
+        try:
+            series.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+        existing = VoucherSeries.objects.filter(
+            organization_id=self.context["request"].user.fk_organization,
+            transaction_type=data.get(
+                "transaction_type", getattr(self.instance, "transaction_type", None)
+            ),
+        )
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        if existing.exists():
+            raise serializers.ValidationError(
+                "A voucher series already exists for this transaction type."
+            )
+        return data
+
+
 class StockJournalEntrySerializer(BaseModelSerializer):
     class Meta:
         model = StockJournalEntry
         fields = "__all__"
 
 
+class StockJournalEntryWriteSerializer(BaseModelSerializer):
+    # Resolved for all entries at once in CreateStockJournalSerializer.validate
+    # instead of one lookup per entry.
+    item = serializers.UUIDField()
+
+    class Meta:
+        model = StockJournalEntry
+        fields = [
+            "item",
+            "quantity",
+            "rate",
+            "total_amount",
+            "transaction_type",
+            "current_quantity",
+            "new_quantity",
+        ]
+
+
 class CreateStockJournalSerializer(BaseModelSerializer):
-    entries = StockJournalEntrySerializer(many=True, write_only=True)
+    entries = StockJournalEntryWriteSerializer(many=True, write_only=True)
 
     class Meta:
         model = StockJournal
         fields = "__all__"
+        # The number is allocated from the organization's voucher series and
+        # the organization is the user's own.
+        read_only_fields = ["voucher_number", "organization_id"]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Journals post stock, so they may only name the user's own godowns.
+        godowns = Godown.objects.filter(organization_id=self.organization_id)
+        for name in ("source_godown", "destination_godown", "adjustment_godown"):
+            fields[name].queryset = godowns
+        return fields
+
+    @property
+    def organization_id(self):
+        request = self.context.get("request")
+        return request.user.fk_organization if request else None
+
+    def validate(self, data):
+        journal_type = data.get(
+            "transaction_type", getattr(self.instance, "transaction_type", None)
+        )
+
+        def godown(field):
+            return data.get(field, getattr(self.instance, field, None))
+
+        if journal_type == STOCK_TRANSFER:
+            if not godown("source_godown") or not godown("destination_godown"):
+                raise serializers.ValidationError(
+                    "Source and destination godowns are required for a transfer."
+                )
+            if godown("source_godown") == godown("destination_godown"):
+                raise serializers.ValidationError(
+                    "Source and destination godowns must be different."
+                )
+        elif journal_type == STOCK_ADJUSTMENT:
+            if not godown("adjustment_godown"):
+                raise serializers.ValidationError(
+                    "Adjustment godown is required for an adjustment."
+                )
+        elif journal_type == STOCK_JOURNAL:
+            if not godown("source_godown"):
+                raise serializers.ValidationError(
+                    "Source godown is required for a stock journal."
+                )
+        else:
+            raise serializers.ValidationError("Transaction type is required.")
+
+        entries = data.get("entries", [])
+        items = (
+            StockItem.objects.filter(organization_id=self.organization_id)
+            .only("id", "name", "unit_id")
+            .in_bulk({entry["item"] for entry in entries})
+        )
+        for entry in entries:
+            item = entry["item"] = items.get(entry["item"])
+            quantity = entry.get("quantity")
+            if not item:
+                raise serializers.ValidationError("Invalid item in entries.")
+            if not item.unit_id:
+                raise serializers.ValidationError(f"Item {item.name} has no unit.")
+            if (
+                quantity is None
+                or not math.isfinite(quantity)
+                or quantity != int(quantity)
+            ):
+                raise serializers.ValidationError(
+                    "Entry quantities must be whole numbers."
+                )
+            if quantity == 0 or (journal_type != STOCK_ADJUSTMENT and quantity < 0):
+                raise serializers.ValidationError(
+                    "Entry quantities must be greater than zero."
+                )
+        return data
 
     @transaction.atomic
     def create(self, validated_data):
-        validated_data["auto_id"] = self._generate_auto_id(StockJournal)
+        validated_data["auto_id"] = get_auto_id(StockJournal)
+        validated_data["organization_id"] = self.organization_id
+        user = self.context["request"].user
+        validated_data["creator"] = validated_data["updated_by"] = user.id
 
         entries_data = validated_data.pop("entries", [])
-        stock_journal = StockJournal.objects.create(**validated_data)
+        stock_journal = StockJournal(**validated_data)
+        stock_journal.save(force_insert=True)
+        entries = self._create_entries(stock_journal, entries_data)
+        post_stock_journal(stock_journal, entries, creator=str(user.id))
+
+        # Numbered last: the series' counter stays locked only until the
+        # commit, not through the posting.
+        number_stock_journals([stock_journal])
+        StockJournal.objects.filter(pk=stock_journal.pk).update(
+            voucher_number=stock_journal.voucher_number
+        )
+        return stock_journal
 
-        for entry_data in entries_data:
-            entry_data["auto_id"] = self._generate_auto_id(StockJournalEntry)
-            StockJournalEntry.objects.create(journal=stock_journal, **entry_data)
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        user = self.context["request"].user
+        entries_data = validated_data.pop("entries", None)
 
-        return stock_journal
+        unpost_stock_journal(instance)
+        validated_data["updated_by"] = user.id
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save()
 
-    def _generate_auto_id(self, model_class):
-        last_auto_id = model_class.objects.aggregate(max_id=Max("auto_id"))["max_id"]
-        return (last_auto_id or 0) + 1
-
-    def _create_inventory_transactions(self, journal_entry, stock_journal):
-        if stock_journal.transaction_type == 0:  # Stock-Transfer
-            # Outbound transaction from source godown
-            outbound_transaction = InventoryTransaction.objects.create(
-                organization_id=stock_journal.organization_id,
-                item=journal_entry.item,
-                unit=journal_entry.item.unit,
-                godown=stock_journal.source_godown,
-                quantity=-journal_entry.quantity,  # Negative for outbound
-                transaction_type="Outbound",
-                reference_document_type="StockJournal",
-                reference_document=f"Journal {stock_journal.voucher_number}",
-                remarks=f"Transfer from {stock_journal.source_godown} to {stock_journal.destination_godown}",
-            )
-            self._log_transaction_effect(outbound_transaction)
-
-            # Inbound transaction to destination godown
-            inbound_transaction = InventoryTransaction.objects.create(
-                organization_id=stock_journal.organization_id,
-                item=journal_entry.item,
-                unit=journal_entry.item.unit,
-                godown=stock_journal.destination_godown,
-                quantity=journal_entry.quantity,  # Positive for inbound
-                transaction_type="Inbound",
-                reference_document_type="StockJournal",
-                reference_document=f"Journal {stock_journal.voucher_number}",
-                remarks=f"Transfer to {stock_journal.destination_godown} from {stock_journal.source_godown}",
-            )
-            self._log_transaction_effect(inbound_transaction)
-
-        elif stock_journal.transaction_type == 1:  # Stock-Adjustment
-            adjustment_transaction = InventoryTransaction.objects.create(
-                organization_id=stock_journal.organization_id,
-                item=journal_entry.item,
-                unit=journal_entry.item.unit,
-                godown=stock_journal.adjustment_godown,
-                quantity=journal_entry.quantity,
-                transaction_type="Adjustment",
-                reference_document_type="StockJournal",
-                reference_document=f"Journal {stock_journal.voucher_number}",
-                remarks=f"Adjustment for {stock_journal.adjustment_godown}",
-            )
-            self._log_transaction_effect(adjustment_transaction)
-
-        elif stock_journal.transaction_type == 2:  # Stock-Journal
-            journal_transaction = InventoryTransaction.objects.create(
-                organization_id=stock_journal.organization_id,
-                item=journal_entry.item,
-                unit=journal_entry.item.unit,
-                godown=stock_journal.source_godown,
-                quantity=journal_entry.quantity,
-                transaction_type="Journal",
-                reference_document_type="StockJournal",
-                reference_document=f"Journal {stock_journal.voucher_number}",
-                remarks=f"Journal entry in {stock_journal.source_godown}",
-            )
-            self._log_transaction_effect(journal_transaction)
+        if entries_data is None:
+            entries = list(instance.entries.all())
+        else:
+            instance.entries.all().delete()
+            entries = self._create_entries(instance, entries_data)
+        post_stock_journal(instance, entries, creator=str(user.id))
+        return instance
 
-    def _log_transaction_effect(self, transaction):
-        print(
-            f"Transaction Effect Logged: {transaction.transaction_type} - {transaction.quantity} units at {transaction.godown}"
-        )
+    def _create_entries(self, stock_journal, entries_data):
+        auto_ids = get_auto_ids(StockJournalEntry, len(entries_data))
+        entries = [
+            StockJournalEntry(
+                journal=stock_journal,
+                auto_id=auto_id,
+                creator=stock_journal.updated_by,
+                updated_by=stock_journal.updated_by,
+                **entry_data,
+            )
+            for auto_id, entry_data in zip(auto_ids, entries_data)
+        ]
+        return StockJournalEntry.objects.bulk_create(entries)
 
 
 class StockJournalSerializer(BaseModelSerializer):
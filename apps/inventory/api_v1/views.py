@@ -1,13 +1,17 @@
 import requests
+import uuid
+from datetime import timedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction, models
 from rest_framework.views import APIView
-from rest_framework.exceptions import NotFound
 from rest_framework.decorators import action
 from apps.main.viewsets import BaseModelViewSet
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.filters import SearchFilter
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from django.utils.dateparse import parse_date
 from rest_framework.response import Response
 from rest_framework import serializers, status
 
@@ -19,17 +23,41 @@ from apps.inventory.models import (
     InventoryTransaction,
     StockJournal,
     # StockJournalEntry,
+    VoucherSeries,
+    snapshot_cutoff,
+    STOCK_SUMMARY_CACHE,
 )
 from apps.inventory.api_v1.serializers import (
     OpeningstockSerializer,
     FinancialYearSerializer,
     CreateInventoryTransactionSerializer,
     ListInventoryTransactionSerializer,
+    ListInventoryTransactionValues,
     StockSReportSerializer,
     StockJournalSerializer,
     CreateStockJournalSerializer,
     StockJournalFullListSerializer,
+    VoucherSeriesSerializer,
 )
+from apps.inventory.functions import (
+    validate_bulk_transactions,
+    post_inventory_transactions,
+    stock_balances_as_of,
+    stock_movement_report,
+    stock_summary,
+    MOVEMENT_GROUPS,
+    SUMMARY_GROUPS,
+)
+from apps.main.exports import (
+    EXPORT_FORMATS,
+    ExportError,
+    export_response,
+    filter_by_params,
+)
+from apps.main.functions import versioned_cache_key
+from apps.main.pagination import KeysetPagination
+from apps.inventory.valuation import stock_valuation, cost_of_goods_sold
+from apps.item.models import StockItem, Godown
 
 
 class OpeningBalanceViewSet(BaseModelViewSet):
@@ -318,18 +346,52 @@ class FinancialYearViewSet(BaseModelViewSet):
             )
 
 
+# Upper bound on staleness if an invalidation is ever missed; postings
+# invalidate the organization's entries immediately.
+STOCK_SUMMARY_CACHE_TIMEOUT = 300
+
+
 class StockReportViewSet(BaseModelViewSet):
     queryset = StockReport.objects.all()
     serializer_class = StockSReportSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
-    search_fields = ["item__name", "godown__name", "financial_year__name"]
+    search_fields = ["item__name", "godown__name"]
+    # column -> (header, lookup)
+    export_columns = {
+        "item": ("Item", "item__name"),
+        "item_code": ("Item Code", "item__item_code"),
+        "godown": ("Godown", "godown__name"),
+        "financial_year_start": ("Financial Year Start", "financial_year__start_date"),
+        "financial_year_end": ("Financial Year End", "financial_year__end_date"),
+        "opening_balance": ("Opening Balance", "opening_balance"),
+        "received": ("Received", "received"),
+        "quantity": ("Quantity", "quantity"),
+        "closing_balance": ("Closing Balance", "closing_balance"),
+        "updated_at": ("Updated At", "updated_at"),
+    }
+    export_filters = {
+        "item": "item_id",
+        "godown": "godown_id",
+        "financial_year": "financial_year_id",
+    }
 
     def get_queryset(self):
         return StockReport.objects.filter(
             organization_id=self.request.user.fk_organization
         )
 
+    def get_uuid_params(self, *names):
+        """The query parameters ``names`` as UUIDs, ``None`` where absent."""
+        params = {}
+        for name in names:
+            value = self.request.query_params.get(name)
+            try:
+                params[name] = uuid.UUID(value) if value else None
+            except ValueError:
+                raise serializers.ValidationError({name: ["Must be a valid UUID."]})
+        return params
+
     @swagger_auto_schema(
         operation_description="Retrieve a list of stock summaries.",
         responses={200: StockSReportSerializer(many=True)},
@@ -460,35 +522,404 @@ class StockReportViewSet(BaseModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="export")
+    @swagger_auto_schema(
+        operation_description=(
+            "Download the stock reports as a CSV or XLSX sheet. `columns` is a comma "
+            f"separated subset of: {', '.join(export_columns)}."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file_format", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[*EXPORT_FORMATS], default="csv"),
+            openapi.Parameter("columns", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("search", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("item", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("financial_year", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+        ],
+    )
+    def export(self, request, *args, **kwargs):
+        try:
+            queryset = filter_by_params(
+                self.filter_queryset(self.get_queryset()),
+                request.query_params,
+                self.export_filters,
+            )
+            return export_response(
+                queryset.order_by("item__name", "godown__name", "id"),
+                self.export_columns,
+                "stock-reports",
+                file_format=request.query_params.get("file_format"),
+                requested=request.query_params.get("columns"),
+            )
+        except ExportError as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error exporting stock reports: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="summary")
+    @swagger_auto_schema(
+        operation_description=(
+            "Stock totals of the organization grouped by item, godown, stock "
+            "group or brand. Keyset paginated through the `cursor` parameter."
+        ),
+        manual_parameters=[
+            openapi.Parameter("group_by", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[*SUMMARY_GROUPS], default="item"),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+    )
+    def summary(self, request, *args, **kwargs):
+        return self._summary(request, request.query_params.get("group_by") or "item")
+
     @action(detail=False, methods=["get"], url_path="summary-by-item")
     @swagger_auto_schema(
         operation_description="Retrieve summarized stock details grouped by item.",
-        responses={200: StockSReportSerializer(many=True)},
+        manual_parameters=[
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
     )
     def summary_by_item(self, request, *args, **kwargs):
+        return self._summary(request, "item")
+
+    def _summary(self, request, group_by):
+        if group_by not in SUMMARY_GROUPS:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"group_by must be one of: {', '.join(SUMMARY_GROUPS)}.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
-            queryset = (
-                StockReport.objects.values("item__name")
-                .annotate(
-                    total_quantity=models.Sum("quantity"),
-                    total_opening_balance=models.Sum("opening_balance"),
-                    total_closing_balance=models.Sum("closing_balance"),
+            organization_id = request.user.fk_organization
+            paginator = KeysetPagination()
+            paginator.ordering = ("group_name", "group_id")
+            cache_key = versioned_cache_key(
+                STOCK_SUMMARY_CACHE,
+                organization_id,
+                group_by,
+                request.query_params.get(paginator.cursor_query_param, ""),
+                paginator.get_page_size(request),
+            )
+            page = cache.get(cache_key)
+            if page is None:
+                rows = paginator.paginate_queryset(
+                    stock_summary(organization_id, group_by), request, view=self
                 )
-                .order_by("item__name")
+                page = {
+                    "next_cursor": paginator.next_cursor,
+                    "data": [
+                        {
+                            "id": row["group_id"] or None,
+                            "name": row["group_name"] or None,
+                            "total_quantity": row["total_quantity"],
+                            "total_opening_balance": row["total_opening_balance"],
+                            "total_closing_balance": row["total_closing_balance"],
+                        }
+                        for row in rows
+                    ],
+                }
+                cache.set(cache_key, page, STOCK_SUMMARY_CACHE_TIMEOUT)
+            else:
+                paginator.request = request
+                paginator.next_cursor = page["next_cursor"]
+
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Stock summaries retrieved successfully.",
+                    "next": paginator.get_next_link(),
+                    "next_cursor": page["next_cursor"],
+                    "data": page["data"],
+                },
+                status=status.HTTP_200_OK,
+            )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving stock summaries: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="as-of")
+    @swagger_auto_schema(
+        operation_description=(
+            "Stock balance per item and godown at the end of the given date."
+        ),
+        manual_parameters=[
+            openapi.Parameter("date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("item", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+        ],
+    )
+    def as_of(self, request, *args, **kwargs):
+        try:
+            as_of_date = parse_date(request.query_params.get("date") or "")
+        except ValueError:
+            as_of_date = None
+        if not as_of_date:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": "A valid date (YYYY-MM-DD) is required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            params = self.get_uuid_params("item", "godown")
+            balances = stock_balances_as_of(
+                request.user.fk_organization,
+                snapshot_cutoff(as_of_date),
+                item_id=params["item"],
+                godown_id=params["godown"],
+            )
+            item_names = dict(
+                StockItem.objects.filter(
+                    id__in={item for item, _ in balances}
+                ).values_list("id", "name")
+            )
+            godown_names = dict(
+                Godown.objects.filter(
+                    id__in={godown for _, godown in balances if godown}
+                ).values_list("id", "name")
+            )
+            data = sorted(
+                (
+                    {
+                        "item": item,
+                        "item_name": item_names.get(item),
+                        "godown": godown,
+                        "godown_name": godown_names.get(godown),
+                        "balance": balance,
+                    }
+                    for (item, godown), balance in balances.items()
+                ),
+                key=lambda row: (row["item_name"] or "", row["godown_name"] or ""),
             )
             return Response(
                 {
                     "StatusCode": 6000,
-                    "message": "Stock summaries by item retrieved successfully.",
-                    "data": queryset,
+                    "message": "Stock balances retrieved successfully.",
+                    "date": as_of_date,
+                    "data": data,
                 },
                 status=status.HTTP_200_OK,
             )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving stock balances: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="valuation")
+    @swagger_auto_schema(
+        operation_description=(
+            "Quantity and cost value of the stock on hand per item and godown. "
+            "`stock_group` includes the items of its subgroups."
+        ),
+        manual_parameters=[
+            openapi.Parameter("item", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("stock_group", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+        ],
+    )
+    def valuation(self, request, *args, **kwargs):
+        try:
+            params = self.get_uuid_params("item", "godown", "stock_group")
+            rows = stock_valuation(
+                request.user.fk_organization,
+                item_id=params["item"],
+                godown_id=params["godown"],
+                stock_group_id=params["stock_group"],
+            )
+            data = [
+                {
+                    "item": row["item"],
+                    "item_name": row["item__name"],
+                    "godown": row["godown"],
+                    "godown_name": row["godown__name"],
+                    "quantity": row["quantity"],
+                    "value": row["value"],
+                }
+                for row in rows
+            ]
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Stock valuation retrieved successfully.",
+                    "total_value": sum(row["value"] for row in data),
+                    "data": data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving stock valuation: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="cogs")
+    @swagger_auto_schema(
+        operation_description="Cost of goods sold per item between two dates (inclusive).",
+        manual_parameters=[
+            openapi.Parameter("from_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("to_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("item", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+        ],
+    )
+    def cogs(self, request, *args, **kwargs):
+        try:
+            from_date = parse_date(request.query_params.get("from_date") or "")
+            to_date = parse_date(request.query_params.get("to_date") or "")
+        except ValueError:
+            from_date = to_date = None
+        if not from_date or not to_date or from_date > to_date:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": "Valid from_date and to_date (YYYY-MM-DD) are required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            params = self.get_uuid_params("item")
+            rows = cost_of_goods_sold(
+                request.user.fk_organization,
+                snapshot_cutoff(from_date - timedelta(days=1)),
+                snapshot_cutoff(to_date),
+                item_id=params["item"],
+            )
+            data = [
+                {
+                    "item": row["item"],
+                    "item_name": row["item__name"],
+                    "quantity": row["quantity"],
+                    "value": row["value"],
+                }
+                for row in rows
+            ]
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Cost of goods sold retrieved successfully.",
+                    "total_value": sum(row["value"] for row in data),
+                    "data": data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {
                     "StatusCode": 6001,
-                    "error": f"Error retrieving stock summaries by item: {str(e)}",
+                    "error": f"Error retrieving cost of goods sold: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="movement")
+    @swagger_auto_schema(
+        operation_description=(
+            "Opening, inward, outward, adjustment and closing stock between two "
+            "dates (inclusive), grouped by item, godown, stock group or stock category."
+        ),
+        manual_parameters=[
+            openapi.Parameter("from_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("to_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("group_by", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[*MOVEMENT_GROUPS], default="item"),
+        ],
+    )
+    def movement(self, request, *args, **kwargs):
+        group_by = request.query_params.get("group_by") or "item"
+        try:
+            from_date = parse_date(request.query_params.get("from_date") or "")
+            to_date = parse_date(request.query_params.get("to_date") or "")
+        except ValueError:
+            from_date = to_date = None
+        if not from_date or not to_date or from_date > to_date or group_by not in MOVEMENT_GROUPS:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": (
+                        "Valid from_date and to_date (YYYY-MM-DD) are required and "
+                        f"group_by must be one of: {', '.join(MOVEMENT_GROUPS)}."
+                    ),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            data = stock_movement_report(
+                request.user.fk_organization, from_date, to_date, group_by=group_by
+            )
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Stock movement retrieved successfully.",
+                    "data": data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving stock movement: {str(e)}",
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
@@ -499,6 +930,27 @@ class InventoryTransactionViewSet(BaseModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["item__name", "reference_document"]
+    # column -> (header, lookup)
+    export_columns = {
+        "transaction_date": ("Date", "transaction_date"),
+        "transaction_type": ("Type", "transaction_type"),
+        "item": ("Item", "item__name"),
+        "item_code": ("Item Code", "item__item_code"),
+        "godown": ("Godown", "godown__name"),
+        "unit": ("Unit", "unit__name"),
+        "quantity": ("Quantity", "quantity"),
+        "rate": ("Rate", "rate"),
+        "reference_document_type": ("Reference Type", "reference_document_type"),
+        "reference_document": ("Reference", "reference_document"),
+        "remarks": ("Remarks", "remarks"),
+    }
+    export_filters = {
+        "item": "item_id",
+        "godown": "godown_id",
+        "transaction_type": "transaction_type",
+        "from_date": "transaction_date__date__gte",
+        "to_date": "transaction_date__date__lte",
+    }
 
     def get_queryset(self):
         return InventoryTransaction.objects.filter(
@@ -520,12 +972,13 @@ class InventoryTransactionViewSet(BaseModelViewSet):
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
             return Response(
                 {
                     "StatusCode": 6000,
                     "message": "Inventory transactions retrieved successfully.",
-                    "data": serializer.data,
+                    "data": ListInventoryTransactionValues(
+                        queryset, self.get_serializer_context()
+                    ).data,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -538,6 +991,54 @@ class InventoryTransactionViewSet(BaseModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="export")
+    @swagger_auto_schema(
+        operation_description=(
+            "Download the inventory transactions as a CSV or XLSX sheet. `columns` is a comma "
+            f"separated subset of: {', '.join(export_columns)}."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file_format", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[*EXPORT_FORMATS], default="csv"),
+            openapi.Parameter("columns", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("search", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("item", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("transaction_type", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[choice for choice, _ in InventoryTransaction.TRANSACTION_TYPE_CHOICES]),
+            openapi.Parameter("from_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date"),
+            openapi.Parameter("to_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date"),
+        ],
+    )
+    def export(self, request, *args, **kwargs):
+        try:
+            queryset = filter_by_params(
+                self.filter_queryset(self.get_queryset()),
+                request.query_params,
+                self.export_filters,
+            )
+            return export_response(
+                queryset.order_by("transaction_date", "id"),
+                self.export_columns,
+                "inventory-transactions",
+                file_format=request.query_params.get("file_format"),
+                requested=request.query_params.get("columns"),
+            )
+        except ExportError as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error exporting inventory transactions: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
     @swagger_auto_schema(
         operation_description="Create a new inventory transaction.",
         request_body=CreateInventoryTransactionSerializer,
@@ -655,7 +1156,8 @@ class StockJournalViewSet(BaseModelViewSet):
         )
 
     def get_serializer_class(self):
-        if self.action == "create" or self.action == "update":
+        # PATCH too, so every edit is unposted and posted again.
+        if self.action in ("create", "update", "partial_update"):
             return CreateStockJournalSerializer
         elif self.action == "list" or self.action == "retrieve":
             return StockJournalFullListSerializer
@@ -679,6 +1181,14 @@ class StockJournalViewSet(BaseModelViewSet):
                 },
                 status=status.HTTP_201_CREATED,
             )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Validation Error: {ve.detail}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {
@@ -763,6 +1273,14 @@ class StockJournalViewSet(BaseModelViewSet):
                 },
                 status=status.HTTP_200_OK,
             )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Validation Error: {ve.detail}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {
@@ -828,6 +1346,137 @@ class StockJournalViewSet(BaseModelViewSet):
 #             )
 
 
+class VoucherSeriesViewSet(BaseModelViewSet):
+    serializer_class = VoucherSeriesSerializer
+    permission_classes = [IsAuthenticated]
+    # Deleting a series would restart its numbering; edit it instead.
+    http_method_names = ["get", "post", "put", "patch", "head", "options"]
+
+    def get_queryset(self):
+        return VoucherSeries.objects.filter(
+            organization_id=self.request.user.fk_organization
+        ).order_by("transaction_type")
+
+    @swagger_auto_schema(
+        operation_description="Retrieve the voucher series of the organization.",
+        responses={200: VoucherSeriesSerializer(many=True)},
+    )
+    def list(self, request, *args, **kwargs):
+        try:
+            serializer = self.get_serializer(self.get_queryset(), many=True)
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Voucher series retrieved successfully.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving voucher series: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @swagger_auto_schema(
+        operation_description="Configure the voucher series of a journal type.",
+        responses={201: VoucherSeriesSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        try:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(organization_id=request.user.fk_organization)
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Voucher series created successfully.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_201_CREATED,
+            )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error creating voucher series: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @swagger_auto_schema(
+        operation_description="Retrieve a voucher series.",
+        responses={200: VoucherSeriesSerializer},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            serializer = self.get_serializer(self.get_object())
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Voucher series retrieved successfully.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error retrieving voucher series: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @swagger_auto_schema(
+        operation_description="Update a voucher series. Numbers already issued are kept.",
+        responses={200: VoucherSeriesSerializer},
+    )
+    def update(self, request, *args, **kwargs):
+        try:
+            partial = kwargs.pop("partial", False)
+            serializer = self.get_serializer(
+                self.get_object(), data=request.data, partial=partial
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Voucher series updated successfully.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except serializers.ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error updating voucher series: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 class BulkInventoryTransactionView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -843,23 +1492,32 @@ class BulkInventoryTransactionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        response_data = []
-
         try:
+            instances, errors = validate_bulk_transactions(
+                transactions_data,
+                organization_id=request.user.fk_organization,
+                creator=str(request.user.id),
+            )
+            if errors:
+                return Response(
+                    {
+                        "StatusCode": 6001,
+                        "error": errors,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             with transaction.atomic():
-                for transaction_data in transactions_data:
-                    serializer = CreateInventoryTransactionSerializer(
-                        data=transaction_data
-                    )
-                    serializer.is_valid(raise_exception=True)
-                    transaction_instance = serializer.save()
-                    response_data.append(
-                        {
-                            "id": transaction_instance.id,
-                            "message": "Transaction created successfully.",
-                        }
-                    )
+                post_inventory_transactions(instances)
 
+            response_data = [
+                {
+                    "index": index,
+                    "id": instance.id,
+                    "message": "Transaction created successfully.",
+                }
+                for index, instance in enumerate(instances)
+            ]
             return Response(
                 {
                     "StatusCode": 6000,
@@ -869,14 +1527,6 @@ class BulkInventoryTransactionView(APIView):
                 status=status.HTTP_201_CREATED,
             )
 
-        except serializers.ValidationError as ve:
-            return Response(
-                {
-                    "StatusCode": 6001,
-                    "error": ve.detail,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
         except Exception as e:
             return Response(
                 {
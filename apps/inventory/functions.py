@@ -0,0 +1,766 @@
+import re
+import uuid
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, F, Max, Min, Sum, Value, Window
+from django.db.models.functions import Cast, Coalesce, RowNumber, TruncDate
+from django.utils import timezone
+
+from apps.inventory.models import (
+    DailyStockMovement,
+    FinancialYear,
+    InventoryTransaction,
+    StockBalanceSnapshot,
+    STOCK_SUMMARY_CACHE,
+    StockReport,
+    VOUCHER_NUMBER_LENGTH,
+    VoucherCounter,
+    VoucherSeries,
+    add_daily_movement,
+    forget_stock_levels_on_commit,
+    signed_quantity,
+    snapshot_cutoff,
+)
+from apps.inventory.valuation import apply_valuation, revalue_stock
+from apps.item.models import Godown, MeasurementUnit, StockItem
+from apps.item.units import load_conversion_graphs
+from apps.main.functions import bump_cache_version_on_commit, get_auto_id
+
+
+TRANSACTION_TYPES = {choice for choice, _ in InventoryTransaction.TRANSACTION_TYPE_CHOICES}
+EVALUATION_METHODS = {choice for choice, _ in InventoryTransaction.EVALUATION_METHOD_CHOICES}
+
+
+def _parse_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _parse_quantity(value):
+    # Mirrors DRF IntegerField: "5", 5 and "5.0" are accepted, "5.5" is not.
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return int(re.sub(r"\.0*\s*$", "", str(value)))
+    except ValueError:
+        return None
+
+
+def _parse_rate(value):
+    if value in (None, ""):
+        return Decimal(0)
+    if isinstance(value, bool):
+        return None
+    try:
+        rate = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    # Bounded by the rate column: DecimalField(max_digits=12, decimal_places=2).
+    if not rate.is_finite() or rate < 0 or rate >= 10 ** 10:
+        return None
+    return rate.quantize(Decimal("0.01"))
+
+
+def _load_ids(model, values):
+    ids = {value for value in values if value}
+    if not ids:
+        return set()
+    return set(model.objects.filter(id__in=ids).values_list("id", flat=True))
+
+
+def _load_owners(model, values):
+    """``{id: organization_id}`` of the ``model`` rows among ``values``."""
+    ids = {value for value in values if value}
+    if not ids:
+        return {}
+    return {
+        pk: _parse_uuid(owner)
+        for pk, owner in model.objects.filter(id__in=ids).values_list(
+            "id", "organization_id"
+        )
+    }
+
+
+def validate_bulk_transactions(rows, organization_id=None, creator=None):
+    """
+    Validate raw transaction payloads in one pass.
+
+    Foreign keys are resolved through one ``id__in`` query per model instead
+    of per-row lookups. Items and godowns must belong to the row's
+    organization, which is ``organization_id`` when given; a row naming
+    another one is invalid. Returns ``(instances, errors)`` where ``errors``
+    is a list of ``{"index": i, "errors": {...}}`` for every invalid row.
+    """
+    organization_id = _parse_uuid(organization_id) if organization_id else None
+    parsed = []
+    for row in rows:
+        row = row if isinstance(row, dict) else {}
+        row_organization = _parse_uuid(row.get("organization_id"))
+        parsed.append(
+            {
+                "organization_id": organization_id or row_organization,
+                "foreign_organization": bool(
+                    organization_id
+                    and row.get("organization_id")
+                    and row_organization != organization_id
+                ),
+                "item": _parse_uuid(row.get("item")),
+                "unit": _parse_uuid(row.get("unit")),
+                "godown": _parse_uuid(row.get("godown")) if row.get("godown") else None,
+                "raw_godown": row.get("godown"),
+                "quantity": _parse_quantity(row.get("quantity")),
+                "rate": _parse_rate(row.get("rate")),
+                "transaction_type": row.get("transaction_type"),
+                "evaluation_method": row.get("evaluation_method") or "10",
+                "reference_document_type": row.get("reference_document_type"),
+                "reference_document": row.get("reference_document"),
+                "remarks": row.get("remarks"),
+            }
+        )
+
+    item_owners = _load_owners(StockItem, (row["item"] for row in parsed))
+    unit_ids = _load_ids(MeasurementUnit, (row["unit"] for row in parsed))
+    godown_owners = _load_owners(Godown, (row["godown"] for row in parsed))
+
+    # Quantities are posted in each item's base unit.
+    graphs = load_conversion_graphs(list(item_owners))
+
+    instances = []
+    errors = []
+    for index, row in enumerate(parsed):
+        row_errors = {}
+        if row["foreign_organization"]:
+            row_errors["organization_id"] = ["Must be your own organization."]
+        elif not row["organization_id"]:
+            row_errors["organization_id"] = ["Organization ID is required."]
+        if not row["item"] or item_owners.get(row["item"]) != row["organization_id"]:
+            row_errors["item"] = ["Item is required." if not row["item"] else "Invalid item."]
+        if row["unit"] not in unit_ids:
+            row_errors["unit"] = ["Unit is required." if not row["unit"] else "Invalid unit."]
+        if row["raw_godown"] and (
+            godown_owners.get(row["godown"]) != row["organization_id"]
+        ):
+            row_errors["godown"] = ["Invalid godown."]
+        if row["quantity"] is None or row["quantity"] <= 0:
+            row_errors["quantity"] = ["Quantity must be greater than zero."]
+        if row["rate"] is None:
+            row_errors["rate"] = ["A valid non-negative rate is required."]
+        if row["transaction_type"] not in TRANSACTION_TYPES:
+            row_errors["transaction_type"] = ["Transaction type is required."]
+        if row["evaluation_method"] not in EVALUATION_METHODS:
+            row_errors["evaluation_method"] = ["Invalid evaluation method."]
+
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+            continue
+
+        instance = InventoryTransaction(
+            organization_id=row["organization_id"],
+            item_id=row["item"],
+            unit_id=row["unit"],
+            godown_id=row["godown"],
+            quantity=row["quantity"],
+            rate=row["rate"],
+            transaction_type=row["transaction_type"],
+            evaluation_method=row["evaluation_method"],
+            reference_document_type=row["reference_document_type"],
+            reference_document=row["reference_document"],
+            remarks=row["remarks"],
+            creator=creator,
+            updated_by=creator,
+        )
+        try:
+            instance.normalize_unit(graphs[row["item"]])
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.message_dict})
+            continue
+        instances.append(instance)
+    return instances, errors
+
+
+def post_inventory_transactions(transactions, batch_size=1000):
+    """
+    Insert validated transactions and post their net effect to StockReport.
+
+    Rows are written with ``bulk_create`` and the balance deltas are summed in
+    memory, so each affected (organization, item, godown) gets exactly one
+    UPDATE regardless of how many lines touch it. Must run inside a
+    transaction.
+    """
+    InventoryTransaction.objects.bulk_create(transactions, batch_size=batch_size)
+
+    deltas = defaultdict(int)
+    movements = {}
+    for instance in transactions:
+        deltas[instance._stock_key()] += instance.stock_delta
+        add_daily_movement(movements, instance._movement_row())
+    StockReport.objects.apply_deltas(deltas)
+    DailyStockMovement.objects.apply_movements(movements)
+    apply_valuation(transactions)
+    return transactions
+
+
+def stock_balances_as_of(organization_id, as_of, item_id=None, godown_id=None):
+    """
+    Return ``{(item_id, godown_id): balance}`` for transactions before ``as_of``.
+
+    Starts from the latest snapshot that ends at or before ``as_of`` and only
+    aggregates the transactions recorded after it, so the cost follows the
+    recent activity rather than the full history.
+    """
+    snapshots = StockBalanceSnapshot.objects.filter(organization_id=organization_id)
+    transactions = InventoryTransaction.objects.filter(
+        organization_id=organization_id, transaction_date__lt=as_of
+    )
+    if item_id:
+        snapshots = snapshots.filter(item_id=item_id)
+        transactions = transactions.filter(item_id=item_id)
+    if godown_id:
+        snapshots = snapshots.filter(godown_id=godown_id)
+        transactions = transactions.filter(godown_id=godown_id)
+
+    balances = defaultdict(int)
+    snapshot_date = StockBalanceSnapshot.objects.filter(
+        organization_id=organization_id,
+        snapshot_date__lt=timezone.localdate(as_of),
+    ).aggregate(latest=Max("snapshot_date"))["latest"]
+    if snapshot_date:
+        for item, godown, balance in snapshots.filter(
+            snapshot_date=snapshot_date
+        ).values_list("item_id", "godown_id", "balance"):
+            balances[(item, godown)] += balance
+        transactions = transactions.filter(
+            transaction_date__gte=snapshot_cutoff(snapshot_date)
+        )
+
+    movements = (
+        transactions.order_by()
+        .values_list("item_id", "godown_id")
+        .annotate(net=Sum(signed_quantity()))
+    )
+    for item, godown, net in movements:
+        balances[(item, godown)] += net or 0
+    return {key: balance for key, balance in balances.items() if balance}
+
+
+def stock_quantities(organization_id, item_ids, godown_id=None):
+    """
+    Return ``{item_id: closing balance}`` for the organization's ``item_ids``
+    in one query, summed across godowns or of ``godown_id`` alone. Items
+    without stock are left out.
+    """
+    reports = StockReport.objects.filter(
+        organization_id=organization_id, item_id__in=item_ids
+    )
+    if godown_id:
+        reports = reports.filter(godown_id=godown_id)
+    return dict(
+        reports.order_by()
+        .values_list("item_id")
+        .annotate(quantity=Sum("closing_balance"))
+    )
+
+
+def take_stock_snapshot(organization_id, snapshot_date):
+    """
+    Store the organization's closing balances at the end of ``snapshot_date``.
+
+    Only completed days can be snapshotted; today's balance keeps moving.
+    Returns the number of rows written.
+    """
+    if snapshot_date >= timezone.localdate():
+        raise ValueError("Snapshots can only be taken for days that have ended.")
+
+    balances = stock_balances_as_of(organization_id, snapshot_cutoff(snapshot_date))
+    with transaction.atomic():
+        StockBalanceSnapshot.objects.filter(
+            organization_id=organization_id, snapshot_date=snapshot_date
+        ).delete()
+        StockBalanceSnapshot.objects.bulk_create(
+            [
+                StockBalanceSnapshot(
+                    organization_id=organization_id,
+                    item_id=item_id,
+                    godown_id=godown_id,
+                    snapshot_date=snapshot_date,
+                    balance=balance,
+                )
+                for (item_id, godown_id), balance in balances.items()
+            ],
+            batch_size=1000,
+        )
+    return len(balances)
+
+
+def _expected_stock_reports(organization_id, item_ids):
+    """
+    Recompute ``{(item_id, godown_id): (opening, closing)}`` for some items,
+    as the postings keep them: the closing balance is the net of all posted
+    transactions, aggregated in the database one row per item/godown, and
+    the opening is never posted to. Openingstock is left out, as no posting
+    path (nor the as-of and movement reports) counts it.
+    """
+    expected = defaultdict(lambda: [0, 0])
+    movements = (
+        InventoryTransaction.objects.filter(
+            organization_id=organization_id, item_id__in=item_ids
+        )
+        .order_by()
+        .values_list("item_id", "godown_id")
+        .annotate(net=Sum(signed_quantity()))
+    )
+    for item_id, godown_id, net in movements.iterator(chunk_size=2000):
+        expected[(item_id, godown_id)][1] += net or 0
+    return expected
+
+
+def _reconciled_item_ids(organization_id):
+    item_ids = set()
+    for model, field in ((InventoryTransaction, "item_id"), (StockReport, "item_id")):
+        item_ids.update(
+            model.objects.filter(organization_id=organization_id, **{f"{field}__isnull": False})
+            .order_by()
+            .values_list(field, flat=True)
+            .distinct()
+            .iterator(chunk_size=2000)
+        )
+    return sorted(item_ids, key=str)
+
+
+def reconcile_stock_reports(organization_id, fix=False, item_batch_size=500, sample_size=20):
+    """
+    Compare an organization's StockReport rows with their recomputed values.
+
+    Items are processed in batches so memory stays bounded by the batch, not
+    by the number of transactions. With ``fix`` each batch locks its report
+    rows before aggregating, then corrects drifted rows with ``bulk_update``
+    and creates the missing ones with ``bulk_create``; postings racing with
+    the rebuild wait on those locks and apply their delta on top.
+
+    Returns ``{"checked", "mismatched", "fixed", "samples"}`` where
+    ``samples`` lists the first ``sample_size`` mismatches.
+    """
+    result = {"checked": 0, "mismatched": 0, "fixed": 0, "samples": []}
+    item_ids = _reconciled_item_ids(organization_id)
+
+    for start in range(0, len(item_ids), item_batch_size):
+        batch = item_ids[start:start + item_batch_size]
+        with transaction.atomic():
+            reports = StockReport.objects.filter(
+                organization_id=organization_id, item_id__in=batch
+            ).only("id", "item_id", "godown_id", "opening_balance", "closing_balance")
+            if fix:
+                reports = reports.select_for_update()
+            stored = {(report.item_id, report.godown_id): report for report in reports}
+            expected = _expected_stock_reports(organization_id, batch)
+
+            to_update = []
+            to_create = []
+            for key in stored.keys() | expected.keys():
+                opening, closing = expected.get(key, (0, 0))
+                report = stored.get(key)
+                result["checked"] += 1
+                if report and (report.opening_balance, report.closing_balance) == (opening, closing):
+                    continue
+                if not report and not opening and not closing:
+                    continue
+
+                result["mismatched"] += 1
+                if len(result["samples"]) < sample_size:
+                    result["samples"].append(
+                        {
+                            "item": key[0],
+                            "godown": key[1],
+                            "stored": (
+                                (report.opening_balance, report.closing_balance)
+                                if report else None
+                            ),
+                            "expected": (opening, closing),
+                        }
+                    )
+                if not fix:
+                    continue
+                if report:
+                    report.opening_balance = opening
+                    report.closing_balance = closing
+                    to_update.append(report)
+                else:
+                    to_create.append(
+                        StockReport(
+                            organization_id=organization_id,
+                            item_id=key[0],
+                            godown_id=key[1],
+                            opening_balance=opening,
+                            closing_balance=closing,
+                        )
+                    )
+
+            if to_update:
+                StockReport.objects.bulk_update(
+                    to_update, ["opening_balance", "closing_balance"], batch_size=1000
+                )
+            if to_create:
+                StockReport.objects.bulk_create(to_create, batch_size=1000)
+            if to_update or to_create:
+                bump_cache_version_on_commit(STOCK_SUMMARY_CACHE, [organization_id])
+                forget_stock_levels_on_commit(
+                    (organization_id, report.item_id) for report in to_update + to_create
+                )
+            result["fixed"] += len(to_update) + len(to_create)
+    return result
+
+
+JOURNAL_REFERENCE_TYPE = "StockJournal"
+
+STOCK_TRANSFER = 0
+STOCK_ADJUSTMENT = 1
+STOCK_JOURNAL = 2
+
+# StockJournalEntry.transaction_type
+ENTRY_DESTINATION = 0
+ENTRY_SOURCE = 1
+
+
+def _journal_movements(journal, entry):
+    """Yield ``(transaction_type, godown, quantity)`` for one journal entry."""
+    quantity = int(entry.quantity)
+    if journal.transaction_type == STOCK_TRANSFER:
+        yield "Outbound", journal.source_godown_id, quantity
+        yield "Inbound", journal.destination_godown_id, quantity
+    elif journal.transaction_type == STOCK_ADJUSTMENT:
+        yield (
+            "Inbound" if quantity > 0 else "Outbound",
+            journal.adjustment_godown_id,
+            abs(quantity),
+        )
+    elif journal.transaction_type == STOCK_JOURNAL:
+        if entry.transaction_type == ENTRY_SOURCE:
+            yield "Outbound", journal.source_godown_id, quantity
+        else:
+            yield (
+                "Inbound",
+                journal.destination_godown_id or journal.source_godown_id,
+                quantity,
+            )
+
+
+def post_stock_journal(journal, entries=None, creator=None):
+    """
+    Post every entry of ``journal`` as inventory movements in one batch.
+
+    Units come from one query over the entries' items; the movements are
+    written through ``post_inventory_transactions`` so the whole journal
+    costs one bulk INSERT and one balance UPDATE per item/godown.
+    """
+    entries = list(journal.entries.all()) if entries is None else entries
+    item_units = dict(
+        StockItem.objects.filter(
+            id__in={entry.item_id for entry in entries}
+        ).values_list("id", "unit_id")
+    )
+    reference = str(journal.id)
+    remarks = f"Journal {journal.voucher_number or reference}"
+
+    transactions = []
+    for entry in entries:
+        for transaction_type, godown_id, quantity in _journal_movements(journal, entry):
+            if not quantity:
+                continue
+            transactions.append(
+                InventoryTransaction(
+                    organization_id=journal.organization_id,
+                    item_id=entry.item_id,
+                    unit_id=item_units[entry.item_id],
+                    godown_id=godown_id,
+                    quantity=quantity,
+                    rate=entry.rate or 0,
+                    transaction_type=transaction_type,
+                    reference_document_type=JOURNAL_REFERENCE_TYPE,
+                    reference_document=reference,
+                    remarks=remarks,
+                    creator=creator,
+                    updated_by=creator,
+                )
+            )
+    return post_inventory_transactions(transactions)
+
+
+def reverse_inventory_transactions(queryset):
+    """
+    Delete posted transactions in bulk and take their effect off the books.
+
+    The balance deltas are aggregated in the database, so reversing a
+    journal costs one UPDATE per item/godown rather than one per line.
+    """
+    rows = list(
+        queryset.order_by()
+        .values_list("organization_id", "item_id", "godown_id")
+        .annotate(net=Sum(signed_quantity()), since=Min("transaction_date"))
+    )
+    if not rows:
+        return 0
+    daily = (
+        queryset.order_by()
+        .annotate(day=TruncDate("transaction_date"))
+        .values("organization_id", "item_id", "godown_id", "day", "transaction_type")
+        .annotate(total=Sum("quantity"))
+    )
+    movements = {}
+    for row in daily:
+        add_daily_movement(
+            movements,
+            {**row, "quantity": row["total"], "transaction_date": row["day"]},
+            sign=-1,
+        )
+    deleted, _ = queryset.delete()
+
+    StockReport.objects.apply_deltas(
+        {(org, item, godown): -(net or 0) for org, item, godown, net, _ in rows}
+    )
+    DailyStockMovement.objects.apply_movements(movements)
+    earliest = {}
+    for org, item, godown, _, since in rows:
+        revalue_stock(org, item, godown)
+        earliest[org] = min(since, earliest.get(org, since))
+    for org, since in earliest.items():
+        StockBalanceSnapshot.objects.invalidate(org, since)
+    return deleted
+
+
+def unpost_stock_journal(journal):
+    return reverse_inventory_transactions(
+        InventoryTransaction.objects.filter(
+            organization_id=journal.organization_id,
+            reference_document_type=JOURNAL_REFERENCE_TYPE,
+            reference_document=str(journal.id),
+        )
+    )
+
+
+# Prefix of the series created for a journal type on its first voucher.
+VOUCHER_PREFIXES = {STOCK_TRANSFER: "ST", STOCK_ADJUSTMENT: "SA", STOCK_JOURNAL: "SJ"}
+
+
+def financial_year_code(organization_id, on_date):
+    """
+    Short code of the financial year containing ``on_date`` ("24-25").
+
+    Uses the organization's FinancialYear rows, falling back to the
+    April-March year when none covers the date.
+    """
+    bounds = (
+        FinancialYear.objects.filter(
+            organization_id=organization_id,
+            start_date__lte=on_date,
+            end_date__gte=on_date,
+            is_deleted=False,
+        )
+        .order_by("start_date")
+        .values_list("start_date", "end_date")
+        .first()
+    )
+    if bounds is None:
+        start_year = on_date.year if on_date.month >= 4 else on_date.year - 1
+        bounds = date(start_year, 4, 1), date(start_year + 1, 3, 31)
+    start, end = bounds
+    if start.year == end.year:
+        return f"{start.year % 100:02d}"
+    return f"{start.year % 100:02d}-{end.year % 100:02d}"
+
+
+def get_voucher_series(organization_id, transaction_type):
+    """The organization's series for a journal type, created on first use."""
+    series = VoucherSeries.objects.filter(
+        organization_id=organization_id, transaction_type=transaction_type
+    ).first()
+    if series is not None:
+        return series
+    try:
+        with transaction.atomic():
+            return VoucherSeries.objects.create(
+                auto_id=get_auto_id(VoucherSeries),
+                organization_id=organization_id,
+                transaction_type=transaction_type,
+                prefix=VOUCHER_PREFIXES.get(transaction_type, ""),
+            )
+    except IntegrityError:
+        return VoucherSeries.objects.get(
+            organization_id=organization_id, transaction_type=transaction_type
+        )
+
+
+def allocate_voucher_numbers(organization_id, transaction_type, count=1, on_date=None):
+    """
+    Take the next ``count`` voucher numbers of a journal type.
+
+    The whole range costs one UPDATE of the series' counter row, whatever
+    ``count`` is, so bulk imports reserve their numbers in one go. The
+    counter is locked until the surrounding transaction ends and a rollback
+    gives the numbers back, which keeps the series free of gaps; only
+    writers of the same organization, journal type and financial year wait
+    on each other. Call it inside the transaction that stores the vouchers,
+    as late as possible.
+    """
+    if count <= 0:
+        return []
+    series = get_voucher_series(organization_id, transaction_type)
+    period = ""
+    if series.reset_every_financial_year:
+        period = financial_year_code(organization_id, on_date or timezone.localdate())
+
+    counters = VoucherCounter.objects.filter(series=series, period=period)
+    with transaction.atomic():
+        if not counters.update(last_number=F("last_number") + count):
+            try:
+                with transaction.atomic():
+                    VoucherCounter.objects.create(
+                        series=series, period=period, last_number=count
+                    )
+            except IntegrityError:
+                counters.update(last_number=F("last_number") + count)
+        last_number = counters.values_list("last_number", flat=True).get()
+
+    numbers = [
+        series.format_number(period, number)
+        for number in range(last_number - count + 1, last_number + 1)
+    ]
+    if len(numbers[-1]) > VOUCHER_NUMBER_LENGTH:
+        raise ValueError(
+            f"Voucher numbers of {series} no longer fit in "
+            f"{VOUCHER_NUMBER_LENGTH} characters."
+        )
+    return numbers
+
+
+def number_stock_journals(journals, on_date=None):
+    """
+    Give every unnumbered journal a voucher number, reserving one range per
+    organization and journal type. The journals are not saved.
+    """
+    unnumbered = defaultdict(list)
+    for journal in journals:
+        if not journal.voucher_number:
+            unnumbered[(journal.organization_id, journal.transaction_type)].append(journal)
+    for (organization_id, transaction_type), group in unnumbered.items():
+        numbers = allocate_voucher_numbers(
+            organization_id, transaction_type, len(group), on_date
+        )
+        for journal, number in zip(group, numbers):
+            journal.voucher_number = number
+    return journals
+
+
+MOVEMENT_GROUPS = {
+    "item": ("item_id", "item__name"),
+    "godown": ("godown_id", "godown__name"),
+    "stock_group": ("item__stock_group_id", "item__stock_group__name"),
+    "stock_category": ("item__stock_category_id", "item__stock_category__name"),
+}
+
+
+def stock_movement_report(organization_id, start, end, group_by="item"):
+    """
+    Opening, inward, outward, adjustment and closing between two dates.
+
+    Reads only DailyStockMovement: the closing comes from each item/godown's
+    latest day on or before ``end`` and the opening is derived from it by
+    taking back the movement inside the range. Two grouped queries answer
+    the report whatever the number of transactions.
+    """
+    id_field, name_field = MOVEMENT_GROUPS[group_by]
+    days = DailyStockMovement.objects.filter(organization_id=organization_id)
+
+    groups = {}
+
+    def group(group_id, name):
+        return groups.setdefault(
+            group_id,
+            {
+                "id": group_id,
+                "name": name,
+                "opening": 0,
+                "inward": 0,
+                "outward": 0,
+                "adjustment": 0,
+                "closing": 0,
+            },
+        )
+
+    latest = (
+        days.filter(movement_date__lte=end)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("item_id"), F("godown_id")],
+                order_by=F("movement_date").desc(),
+            )
+        )
+        .filter(position=1)
+        .values_list(id_field, name_field, "closing")
+    )
+    for group_id, name, closing in latest:
+        row = group(group_id, name)
+        row["closing"] += closing
+        row["opening"] += closing
+
+    moved = (
+        days.filter(movement_date__gte=start, movement_date__lte=end)
+        .order_by()
+        .values_list(id_field, name_field)
+        .annotate(
+            inward=Sum("inward"), outward=Sum("outward"), adjustment=Sum("adjustment")
+        )
+    )
+    for group_id, name, inward, outward, adjustment in moved:
+        row = group(group_id, name)
+        row["inward"] += inward
+        row["outward"] += outward
+        row["adjustment"] += adjustment
+        row["opening"] -= inward - outward
+
+    return sorted(
+        (
+            row
+            for row in groups.values()
+            if any(row[field] for field in ("opening", "inward", "outward", "adjustment", "closing"))
+        ),
+        key=lambda row: (row["name"] or "", str(row["id"])),
+    )
+
+
+SUMMARY_GROUPS = {
+    "item": ("item_id", "item__name"),
+    "godown": ("godown_id", "godown__name"),
+    "stock_group": ("item__stock_group_id", "item__stock_group__name"),
+    "brand": ("item__brand_id", "item__brand__name"),
+}
+
+
+def stock_summary(organization_id, group_by="item"):
+    """
+    StockReport totals of one organization grouped by ``SUMMARY_GROUPS``.
+
+    ``group_name``/``group_id`` are coalesced to strings so the rows have a
+    NULL-free composite key for keyset pagination.
+    """
+    id_field, name_field = SUMMARY_GROUPS[group_by]
+    return (
+        StockReport.objects.filter(organization_id=organization_id)
+        .values(
+            group_id=Coalesce(Cast(id_field, CharField()), Value("")),
+            group_name=Coalesce(name_field, Value("")),
+        )
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_opening_balance=Sum("opening_balance"),
+            total_closing_balance=Sum("closing_balance"),
+        )
+    )
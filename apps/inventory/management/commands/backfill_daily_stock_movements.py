@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from apps.inventory.models import (
+    MOVEMENT_COLUMNS,
+    DailyStockMovement,
+    InventoryTransaction,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyStockMovement table from InventoryTransaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            help="Organization ID to rebuild. May be repeated; defaults to all.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows written per bulk INSERT.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = options["organization"] or list(
+            InventoryTransaction.objects.order_by()
+            .values_list("organization_id", flat=True)
+            .distinct()
+        )
+        for organization_id in organizations:
+            with transaction.atomic():
+                rows = self._rebuild(organization_id, options["batch_size"])
+            self.stdout.write(f"{organization_id}: {rows} daily rows written")
+
+    def _rebuild(self, organization_id, batch_size):
+        DailyStockMovement.objects.filter(organization_id=organization_id).delete()
+
+        # Grouped per item, godown, day and type in the database and streamed
+        # in key order, so the running balance needs one key in memory.
+        totals = (
+            InventoryTransaction.objects.filter(
+                organization_id=organization_id,
+                transaction_type__in=list(MOVEMENT_COLUMNS),
+            )
+            .annotate(day=TruncDate("transaction_date"))
+            .order_by("item_id", "godown_id", "day")
+            .values_list("item_id", "godown_id", "day", "transaction_type")
+            .annotate(total=Sum("quantity"))
+        )
+
+        pending = []
+        written = 0
+        current = None
+        balance = 0
+        for item_id, godown_id, day, transaction_type, total in totals.iterator(
+            chunk_size=batch_size
+        ):
+            if current is None or (current.item_id, current.godown_id, current.movement_date) != (
+                item_id,
+                godown_id,
+                day,
+            ):
+                if current is None or (current.item_id, current.godown_id) != (item_id, godown_id):
+                    balance = 0
+                current = DailyStockMovement(
+                    organization_id=organization_id,
+                    item_id=item_id,
+                    godown_id=godown_id,
+                    movement_date=day,
+                    opening=balance,
+                    closing=balance,
+                )
+                pending.append(current)
+            column = MOVEMENT_COLUMNS[transaction_type]
+            setattr(current, column, getattr(current, column) + total)
+            if column in ("inward", "outward"):
+                net = total if column == "inward" else -total
+                current.closing += net
+                balance += net
+
+            if len(pending) > batch_size:
+                # Keep the row being accumulated; write the finished ones.
+                DailyStockMovement.objects.bulk_create(pending[:-1])
+                written += len(pending) - 1
+                pending = pending[-1:]
+
+        DailyStockMovement.objects.bulk_create(pending)
+        return written + len(pending)
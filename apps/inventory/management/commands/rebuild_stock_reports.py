@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.inventory.functions import reconcile_stock_reports
+from apps.inventory.models import InventoryTransaction, StockReport
+
+
+def _init_worker():
+    # Forked workers must not share the parent's database sockets.
+    django.setup()
+    connections.close_all()
+
+
+def _reconcile(organization_id, fix, item_batch_size):
+    try:
+        return organization_id, reconcile_stock_reports(
+            organization_id, fix=fix, item_batch_size=item_batch_size
+        )
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute StockReport balances from InventoryTransaction, report "
+        "drifted rows and optionally fix them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            help="Organization ID to check. May be repeated; defaults to all.",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Write the recomputed balances back to StockReport.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Organizations processed in parallel (1 runs in-process).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Items aggregated per query batch.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = options["organization"] or self._organizations()
+        fix = options["fix"]
+        batch_size = options["batch_size"]
+
+        if options["workers"] <= 1 or len(organizations) <= 1:
+            results = (
+                _reconcile(organization_id, fix, batch_size)
+                for organization_id in organizations
+            )
+            totals = self._report(results, options["verbosity"])
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=_init_worker
+            ) as pool:
+                futures = [
+                    pool.submit(_reconcile, organization_id, fix, batch_size)
+                    for organization_id in organizations
+                ]
+                totals = self._report(
+                    (future.result() for future in as_completed(futures)),
+                    options["verbosity"],
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {totals['checked']} balances, "
+                f"{totals['mismatched']} mismatched, {totals['fixed']} fixed."
+            )
+        )
+
+    def _organizations(self):
+        organizations = set()
+        for model in (InventoryTransaction, StockReport):
+            organizations.update(
+                model.objects.filter(organization_id__isnull=False)
+                .order_by()
+                .values_list("organization_id", flat=True)
+                .distinct()
+            )
+        return sorted(str(organization_id) for organization_id in organizations)
+
+    def _report(self, results, verbosity):
+        totals = {"checked": 0, "mismatched": 0, "fixed": 0}
+        for organization_id, result in results:
+            for key in totals:
+                totals[key] += result[key]
+            if result["mismatched"]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{organization_id}: {result['mismatched']} of "
+                        f"{result['checked']} balances drifted"
+                    )
+                )
+            if verbosity >= 2:
+                for sample in result["samples"]:
+                    self.stdout.write(
+                        f"  item={sample['item']} godown={sample['godown']} "
+                        f"stored={sample['stored']} expected={sample['expected']}"
+                    )
+        return totals
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.inventory.functions import take_stock_snapshot
+from apps.inventory.models import InventoryTransaction
+
+
+class Command(BaseCommand):
+    help = "Store end-of-day stock balances used by the as-of balance report."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Day to snapshot (YYYY-MM-DD). Defaults to yesterday.",
+        )
+        parser.add_argument(
+            "--organization",
+            help="Only snapshot this organization ID.",
+        )
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            snapshot_date = parse_date(options["date"])
+            if not snapshot_date:
+                raise CommandError("--date must be in YYYY-MM-DD format.")
+        else:
+            snapshot_date = timezone.localdate() - timedelta(days=1)
+
+        if options["organization"]:
+            organizations = [options["organization"]]
+        else:
+            organizations = (
+                InventoryTransaction.objects.order_by()
+                .values_list("organization_id", flat=True)
+                .distinct()
+            )
+
+        for organization_id in organizations:
+            try:
+                rows = take_stock_snapshot(organization_id, snapshot_date)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(
+                f"{organization_id}: {rows} balances stored for {snapshot_date}"
+            )
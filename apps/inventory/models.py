@@ -1,10 +1,15 @@
-from django.db import models, transaction
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Case, When, Value
 import uuid
 from django.core.exceptions import ValidationError
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from django.core.cache import cache
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.main.models import BaseModel
+from apps.main.functions import bump_cache_version_on_commit
 from apps.item.models import StockItem, Godown, MeasurementUnit
+from apps.item.units import ConversionError, load_conversion_graphs, round_quantity
 
 
 class InventoryBaseModel(models.Model):
@@ -66,6 +71,92 @@ class Openingstock(BaseModel):
 
 
 
+# Cache namespace of the per-organization stock summaries; bumped whenever
+# a StockReport balance changes.
+STOCK_SUMMARY_CACHE = "stock-summary"
+
+# Per-item balances cached for the barcode lookup; dropped on every posting.
+STOCK_LEVEL_CACHE = "stock-level"
+
+
+def stock_level_cache_key(organization_id, item_id):
+    return f"{STOCK_LEVEL_CACHE}:{organization_id}:{item_id}"
+
+
+def forget_stock_levels_on_commit(keys):
+    """Drop the cached balances of ``(organization_id, item_id)`` pairs."""
+    cache_keys = {stock_level_cache_key(*key) for key in keys}
+    if cache_keys:
+        transaction.on_commit(lambda: cache.delete_many(list(cache_keys)))
+
+# Sign applied to a transaction's quantity when posting it to StockReport.
+# Transfer and Adjustment rows are informational and do not move the balance.
+STOCK_DIRECTIONS = {"Inbound": 1, "Outbound": -1}
+
+
+def signed_quantity(prefix=""):
+    """SQL expression for a transaction's signed effect on the stock balance."""
+    return Case(
+        *[
+            When(**{f"{prefix}transaction_type": transaction_type}, then=F(f"{prefix}quantity") * sign)
+            for transaction_type, sign in STOCK_DIRECTIONS.items()
+        ],
+        default=Value(0),
+        output_field=models.IntegerField(),
+    )
+
+
+def snapshot_cutoff(snapshot_date):
+    """First instant after the day a snapshot covers (local midnight)."""
+    return timezone.make_aware(datetime.combine(snapshot_date + timedelta(days=1), time.min))
+
+
+class StockReportManager(models.Manager):
+    def apply_delta(self, organization_id, item_id, godown_id, delta):
+        """
+        Add ``delta`` to the closing balance of one item/godown row.
+
+        The balance is adjusted with a single conditional UPDATE so concurrent
+        postings never overwrite each other. The row is only inserted when the
+        UPDATE matched nothing; a concurrent insert losing the race on the
+        unique constraint falls back to the UPDATE.
+        """
+        if not delta:
+            return
+        lookup = {
+            "organization_id": organization_id,
+            "item_id": item_id,
+            "godown_id": godown_id,
+        }
+        if self._increment(lookup, delta):
+            return
+        try:
+            with transaction.atomic():
+                self.create(opening_balance=0, closing_balance=delta, **lookup)
+        except IntegrityError:
+            self._increment(lookup, delta)
+
+    def apply_deltas(self, deltas):
+        """
+        Apply a mapping of ``(organization_id, item_id, godown_id) -> delta``.
+
+        Keys are applied in a stable order so that two postings touching the
+        same rows always lock them in the same sequence.
+        """
+        for key in sorted(deltas, key=lambda k: tuple(str(part) for part in k)):
+            self.apply_delta(*key, deltas[key])
+        changed = [key for key, delta in deltas.items() if delta]
+        if changed:
+            bump_cache_version_on_commit(STOCK_SUMMARY_CACHE, {key[0] for key in changed})
+            forget_stock_levels_on_commit(key[:2] for key in changed)
+
+    def _increment(self, lookup, delta):
+        return self.filter(**lookup).update(
+            closing_balance=F("closing_balance") + delta,
+            updated_at=timezone.now(),
+        )
+
+
 class StockReport(InventoryBaseModel):
     organization_id = models.UUIDField(
         null=True, blank=True, help_text="Unique identifier for the organization"
@@ -102,14 +193,236 @@ class StockReport(InventoryBaseModel):
         default=True, help_text="Indicates if the stock report is active"
     )
 
+    objects = StockReportManager()
+
     def __str__(self):
         return f"Stock Report: {self.item} | FY: {self.financial_year}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_cache_version_on_commit(STOCK_SUMMARY_CACHE, [self.organization_id])
+        forget_stock_levels_on_commit([(self.organization_id, self.item_id)])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_cache_version_on_commit(STOCK_SUMMARY_CACHE, [self.organization_id])
+        forget_stock_levels_on_commit([(self.organization_id, self.item_id)])
+        return result
+
     class Meta:
         db_table = "stock_report"
         verbose_name = "Stock Report"
         verbose_name_plural = "Stock Reports"
         # ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization_id", "item", "godown"],
+                name="unique_stock_report_item_godown",
+            ),
+            models.UniqueConstraint(
+                fields=["organization_id", "item"],
+                condition=models.Q(godown__isnull=True),
+                name="unique_stock_report_item_without_godown",
+            ),
+        ]
+
+
+class StockBalanceSnapshotManager(models.Manager):
+    def invalidate(self, organization_id, since):
+        """
+        Drop snapshots that include transactions dated on or after ``since``.
+
+        Called when a historical transaction is edited or deleted; the dropped
+        days are simply recomputed by the next snapshot run.
+        """
+        since = timezone.localdate(since) if isinstance(since, datetime) else since
+        return self.filter(
+            organization_id=organization_id, snapshot_date__gte=since
+        ).delete()
+
+
+class StockBalanceSnapshot(InventoryBaseModel):
+    """
+    Closing balance of an item/godown at the end of ``snapshot_date``.
+
+    Snapshots are taken for a whole organization at once and only non-zero
+    balances are stored, so an item/godown missing from a snapshot day had a
+    balance of zero on that day.
+    """
+
+    organization_id = models.UUIDField(help_text="Unique identifier for the organization")
+    item = models.ForeignKey(
+        StockItem,
+        on_delete=models.CASCADE,
+        related_name="balance_snapshots",
+        help_text="Reference to the stock item",
+    )
+    godown = models.ForeignKey(
+        Godown,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="balance_snapshots",
+        help_text="Reference to the godown associated with the stock",
+    )
+    snapshot_date = models.DateField(help_text="Day whose closing balance is stored")
+    balance = models.IntegerField(default=0, help_text="Closing balance at the end of the day")
+
+    objects = StockBalanceSnapshotManager()
+
+    def __str__(self):
+        return f"Snapshot: {self.item_id} | {self.snapshot_date} | {self.balance}"
+
+    class Meta:
+        db_table = "stock_balance_snapshot"
+        verbose_name = "Stock Balance Snapshot"
+        verbose_name_plural = "Stock Balance Snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization_id", "snapshot_date", "item", "godown"],
+                name="unique_stock_snapshot_item_godown",
+            ),
+            models.UniqueConstraint(
+                fields=["organization_id", "snapshot_date", "item"],
+                condition=models.Q(godown__isnull=True),
+                name="unique_stock_snapshot_item_without_godown",
+            ),
+        ]
+
+
+# Daily movement column that each transaction type adds its quantity to.
+MOVEMENT_COLUMNS = {"Inbound": "inward", "Outbound": "outward", "Adjustment": "adjustment"}
+
+
+def add_daily_movement(movements, row, sign=1):
+    """Accumulate one transaction ``row`` (a dict of its fields) into ``movements``."""
+    column = MOVEMENT_COLUMNS.get(row["transaction_type"])
+    if not column:
+        return
+    day = row["transaction_date"]
+    if isinstance(day, datetime):
+        day = timezone.localdate(day)
+    key = (row["organization_id"], row["item_id"], row["godown_id"], day)
+    day = movements.setdefault(key, {})
+    day[column] = day.get(column, 0) + sign * row["quantity"]
+
+
+class DailyStockMovementManager(models.Manager):
+    def apply_movements(self, movements):
+        """
+        Add ``{(organization_id, item_id, godown_id, date): {column: qty}}``.
+
+        Each day row is adjusted with one conditional UPDATE (inserted from
+        the previous day's closing when missing). Changes to past days also
+        shift the opening/closing of every later day of that item/godown.
+        """
+        today = timezone.localdate()
+        for key in sorted(movements, key=lambda k: tuple(str(part) for part in k)):
+            columns = {name: qty for name, qty in movements[key].items() if qty}
+            if not columns:
+                continue
+            organization_id, item_id, godown_id, movement_date = key
+            lookup = {
+                "organization_id": organization_id,
+                "item_id": item_id,
+                "godown_id": godown_id,
+            }
+            net = columns.get("inward", 0) - columns.get("outward", 0)
+            self._apply_day(lookup, movement_date, columns, net)
+            if net and movement_date < today:
+                self.filter(movement_date__gt=movement_date, **lookup).update(
+                    opening=F("opening") + net,
+                    closing=F("closing") + net,
+                    updated_at=timezone.now(),
+                )
+
+    def _apply_day(self, lookup, movement_date, columns, net):
+        if self._increment(lookup, movement_date, columns, net):
+            return
+        previous = (
+            self.filter(movement_date__lt=movement_date, **lookup)
+            .order_by("-movement_date")
+            .values_list("closing", flat=True)
+            .first()
+        ) or 0
+        try:
+            with transaction.atomic():
+                self.create(
+                    movement_date=movement_date,
+                    opening=previous,
+                    closing=previous + net,
+                    **columns,
+                    **lookup,
+                )
+        except IntegrityError:
+            self._increment(lookup, movement_date, columns, net)
+
+    def _increment(self, lookup, movement_date, columns, net):
+        return self.filter(movement_date=movement_date, **lookup).update(
+            closing=F("closing") + net,
+            updated_at=timezone.now(),
+            **{name: F(name) + qty for name, qty in columns.items()},
+        )
+
+
+class DailyStockMovement(InventoryBaseModel):
+    """
+    Stock movement of one item/godown on one day.
+
+    Maintained on posting, so range reports read one row per item, godown
+    and day instead of scanning InventoryTransaction.
+    """
+
+    organization_id = models.UUIDField(help_text="Unique identifier for the organization")
+    item = models.ForeignKey(
+        StockItem,
+        on_delete=models.CASCADE,
+        related_name="daily_movements",
+        help_text="Reference to the stock item",
+    )
+    godown = models.ForeignKey(
+        Godown,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="daily_movements",
+        help_text="Reference to the godown associated with the stock",
+    )
+    movement_date = models.DateField()
+    opening = models.IntegerField(default=0, help_text="Balance at the start of the day")
+    inward = models.IntegerField(default=0, help_text="Inbound quantity")
+    outward = models.IntegerField(default=0, help_text="Outbound quantity")
+    adjustment = models.IntegerField(
+        default=0, help_text="Quantity recorded as adjustments (does not move the balance)"
+    )
+    closing = models.IntegerField(default=0, help_text="Balance at the end of the day")
+
+    objects = DailyStockMovementManager()
+
+    def __str__(self):
+        return f"Movement: {self.item_id} | {self.movement_date}"
+
+    class Meta:
+        db_table = "daily_stock_movement"
+        verbose_name = "Daily Stock Movement"
+        verbose_name_plural = "Daily Stock Movements"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization_id", "item", "godown", "movement_date"],
+                name="unique_daily_movement_item_godown",
+            ),
+            models.UniqueConstraint(
+                fields=["organization_id", "item", "movement_date"],
+                condition=models.Q(godown__isnull=True),
+                name="unique_daily_movement_item_without_godown",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["organization_id", "movement_date"],
+                name="daily_movement_org_date_idx",
+            ),
+        ]
 
 
 class InventoryTransaction(InventoryBaseModel):
@@ -137,6 +450,25 @@ class InventoryTransaction(InventoryBaseModel):
         Godown, on_delete=models.CASCADE,null=True, blank=True, related_name="inventory_transactions"
     )
     quantity = models.IntegerField()
+    rate = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        default=0,
+        help_text="Unit cost of inbound stock",
+    )
+    entered_unit = models.ForeignKey(
+        MeasurementUnit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Unit the quantity was entered in, when not the item's unit",
+    )
+    entered_quantity = models.IntegerField(
+        null=True, blank=True, help_text="Quantity as entered, in entered_unit"
+    )
     transaction_type = models.CharField(
         max_length=20, choices=TRANSACTION_TYPE_CHOICES
     )
@@ -160,53 +492,273 @@ class InventoryTransaction(InventoryBaseModel):
             raise ValidationError("Transaction type is required.")
 
 
+    def normalize_unit(self, graph=None):
+        """
+        Express ``quantity`` in the item's base unit, keeping what was
+        entered in ``entered_unit``/``entered_quantity``, so every balance
+        adds up in one unit. ``graph`` is the item's ConversionGraph, loaded
+        when not given and needed. Raises ValidationError for a unit that
+        does not convert or a quantity that is not a whole number of base
+        units.
+        """
+        if graph is None:
+            base_unit_id = self.item.unit_id
+            if not base_unit_id or (
+                self.unit_id == base_unit_id and not self.entered_unit_id
+            ):
+                return
+            graph = load_conversion_graphs([self.item_id])[self.item_id]
+        if not graph.base_unit_id:
+            return
+
+        if str(self.unit_id) == graph.base_unit_id:
+            # An edit of the quantity or unit makes the entered values stale.
+            if self.entered_unit_id:
+                try:
+                    entered = round_quantity(
+                        graph.to_base(self.entered_quantity, self.entered_unit_id)
+                    )
+                except (ConversionError, TypeError):
+                    entered = None
+                if entered != self.quantity:
+                    self.entered_unit_id = self.entered_quantity = None
+            return
+
+        try:
+            # Rounded, as inverse factors such as 1/7 are not exact decimals.
+            quantity = round_quantity(graph.to_base(self.quantity, self.unit_id))
+        except ConversionError as e:
+            raise ValidationError({"unit": [str(e)]})
+        if quantity != quantity.to_integral_value():
+            raise ValidationError(
+                {"quantity": ["Must be a whole number of the item's unit."]}
+            )
+        self.entered_unit_id, self.entered_quantity = self.unit_id, self.quantity
+        self.unit_id, self.quantity = uuid.UUID(graph.base_unit_id), int(quantity)
+
+    @property
+    def priced_quantity(self):
+        """The quantity ``rate`` is for: the one entered, before conversion."""
+        return self.entered_quantity if self.entered_unit_id else self.quantity
+
+    @property
+    def stock_delta(self):
+        return STOCK_DIRECTIONS.get(self.transaction_type, 0) * self.quantity
+
+    def _stock_key(self):
+        return (self.organization_id, self.item_id, self.godown_id)
+
+    def _movement_row(self):
+        return {
+            "organization_id": self.organization_id,
+            "item_id": self.item_id,
+            "godown_id": self.godown_id,
+            "transaction_type": self.transaction_type,
+            "quantity": self.quantity,
+            "transaction_date": self.transaction_date,
+        }
+
+    def _posted_row(self):
+        """
+        Return the stored stock-relevant fields of this row, locking it.
+
+        Reading the stored row (rather than trusting the in-memory instance)
+        keeps edits and deletes exact even when the instance was modified.
+        """
+        if self._state.adding:
+            return None
+        return (
+            InventoryTransaction.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values(
+                "organization_id",
+                "item_id",
+                "godown_id",
+                "transaction_type",
+                "quantity",
+                "entered_quantity",
+                "rate",
+                "transaction_date",
+            )
+            .first()
+        )
+
+    @staticmethod
+    def _stock_effect(row):
+        if not row:
+            return {}
+        key = (row["organization_id"], row["item_id"], row["godown_id"])
+        return {key: STOCK_DIRECTIONS.get(row["transaction_type"], 0) * row["quantity"]}
+
     @transaction.atomic
     def save(self, *args, **kwargs):
+        from apps.inventory.valuation import apply_valuation, revalue_stock
+
         self.clean()
+        self.normalize_unit()
 
-        stock_report, created = StockReport.objects.get_or_create(
-            organization_id=self.organization_id,
-            item=self.item,
-            godown=self.godown,
-            defaults={"opening_balance": 0, "closing_balance": 0},
-        )
-        if self.pk:
-            previous_transaction = InventoryTransaction.objects.filter(pk=self.pk).first()
-            if previous_transaction:
-                if previous_transaction.transaction_type == "Inbound":
-                    stock_report.closing_balance -= previous_transaction.quantity
-                elif previous_transaction.transaction_type == "Outbound":
-                    stock_report.closing_balance += previous_transaction.quantity
-                    
-        if self.transaction_type == "Inbound":
-            stock_report.closing_balance += self.quantity
-        elif self.transaction_type == "Outbound":
-            stock_report.closing_balance -= self.quantity
-
-        stock_report.save()
+        posted = self._posted_row()
+        posted_effect = self._stock_effect(posted)
+        deltas = {key: -delta for key, delta in posted_effect.items()}
         super().save(*args, **kwargs)
 
+        key = self._stock_key()
+        deltas[key] = deltas.get(key, 0) + self.stock_delta
+        StockReport.objects.apply_deltas(deltas)
+
+        movements = {}
+        if posted:
+            add_daily_movement(movements, posted, sign=-1)
+        add_daily_movement(movements, self._movement_row())
+        DailyStockMovement.objects.apply_movements(movements)
+
+        if not posted:
+            apply_valuation([self])
+            return
+        if (
+            posted_effect == {key: self.stock_delta}
+            and posted["rate"] == self.rate
+            and posted["entered_quantity"] == self.entered_quantity
+        ):
+            return
+        # Edits are rare: rebuild the cost layers of the affected stock only.
+        for affected in {key, (posted["organization_id"], posted["item_id"], posted["godown_id"])}:
+            revalue_stock(*affected)
+        if posted_effect != {key: self.stock_delta}:
+            for organization_id in {posted["organization_id"], self.organization_id}:
+                StockBalanceSnapshot.objects.invalidate(
+                    organization_id, posted["transaction_date"]
+                )
+
     @transaction.atomic
     def delete(self, *args, **kwargs):
-        stock_report = StockReport.objects.filter(
-            organization_id=self.organization_id,
-            item=self.item,
-            godown=self.godown,
-        ).first()
-
-        if stock_report:
-            if self.transaction_type == "Inbound":
-                stock_report.closing_balance -= self.quantity
-            elif self.transaction_type == "Outbound":
-                stock_report.closing_balance += self.quantity
-            stock_report.save()
-        super().delete(*args, **kwargs)
+        from apps.inventory.valuation import revalue_stock
+
+        posted = self._posted_row()
+        deltas = {key: -delta for key, delta in self._stock_effect(posted).items()}
+        result = super().delete(*args, **kwargs)
+        StockReport.objects.apply_deltas(deltas)
+        if posted:
+            movements = {}
+            add_daily_movement(movements, posted, sign=-1)
+            DailyStockMovement.objects.apply_movements(movements)
+            revalue_stock(posted["organization_id"], posted["item_id"], posted["godown_id"])
+            StockBalanceSnapshot.objects.invalidate(
+                posted["organization_id"], posted["transaction_date"]
+            )
+        return result
 
     class Meta:
         db_table = "inventory_transaction"
         ordering = ["-transaction_date"]
         verbose_name = "Inventory Transaction"
         verbose_name_plural = "Inventory Transactions"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "transaction_date"],
+                name="inventory_txn_org_date_idx",
+            ),
+            # Per item and godown replays: valuation, reconciliation, as-of.
+            models.Index(
+                fields=["organization_id", "item", "godown", "transaction_date"],
+                name="inventory_txn_item_date_idx",
+            ),
+            models.Index(
+                fields=["organization_id", "reference_document_type", "reference_document"],
+                name="inventory_txn_reference_idx",
+            ),
+        ]
+
+
+class CostLayer(InventoryBaseModel):
+    """
+    Quantity received by one inbound transaction that is still in stock.
+
+    Outbound postings consume open layers oldest-first (FIFO) or newest-first
+    (LIFO); weighted-average consumption re-prices the remaining layers at
+    the average cost.
+    """
+
+    organization_id = models.UUIDField()
+    item = models.ForeignKey(
+        StockItem, on_delete=models.CASCADE, related_name="cost_layers"
+    )
+    godown = models.ForeignKey(
+        Godown, on_delete=models.CASCADE, null=True, blank=True, related_name="cost_layers"
+    )
+    source = models.ForeignKey(
+        InventoryTransaction,
+        on_delete=models.CASCADE,
+        related_name="cost_layers",
+        help_text="Inbound transaction that created this layer",
+    )
+    received_at = models.DateTimeField()
+    quantity = models.IntegerField(help_text="Quantity received")
+    unit_cost = models.DecimalField(
+        max_digits=14, decimal_places=4, default=0, help_text="Cost per unit on receipt"
+    )
+    remaining_quantity = models.IntegerField(help_text="Quantity not yet consumed")
+    remaining_value = models.DecimalField(
+        max_digits=18, decimal_places=4, default=0, help_text="Cost of the remaining quantity"
+    )
+
+    def __str__(self):
+        return f"Cost Layer: {self.item_id} | {self.remaining_quantity} left"
+
+    class Meta:
+        db_table = "inventory_cost_layer"
+        verbose_name = "Cost Layer"
+        verbose_name_plural = "Cost Layers"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "item", "godown", "received_at"],
+                name="cost_layer_open_idx",
+                condition=models.Q(remaining_quantity__gt=0),
+            ),
+        ]
+
+
+class CostConsumption(InventoryBaseModel):
+    """Cost of goods taken out of stock by an outbound transaction."""
+
+    organization_id = models.UUIDField()
+    item = models.ForeignKey(
+        StockItem, on_delete=models.CASCADE, related_name="cost_consumptions"
+    )
+    godown = models.ForeignKey(
+        Godown, on_delete=models.CASCADE, null=True, blank=True, related_name="cost_consumptions"
+    )
+    transaction = models.ForeignKey(
+        InventoryTransaction,
+        on_delete=models.CASCADE,
+        related_name="cost_consumptions",
+        help_text="Outbound transaction that consumed the stock",
+    )
+    layer = models.ForeignKey(
+        CostLayer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="consumptions",
+        help_text="Layer consumed; empty when stock ran short",
+    )
+    consumed_at = models.DateTimeField()
+    quantity = models.IntegerField()
+    value = models.DecimalField(max_digits=18, decimal_places=4, default=0)
+
+    def __str__(self):
+        return f"Consumption: {self.item_id} | {self.quantity} @ {self.value}"
+
+    class Meta:
+        db_table = "inventory_cost_consumption"
+        verbose_name = "Cost Consumption"
+        verbose_name_plural = "Cost Consumptions"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "consumed_at"],
+                name="cost_consumption_period_idx",
+            ),
+        ]
 
 
 class StockJournal(BaseModel):
@@ -274,17 +826,22 @@ class StockJournal(BaseModel):
         verbose_name = "Stock Journal"
         verbose_name_plural = "Stock Journals"
         ordering = ["-date_added"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization_id", "voucher_number"],
+                name="unique_journal_voucher_number",
+            ),
+        ]
 
     def __str__(self):
         return f"Journal {self.voucher_number or 'Unnumbered'}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.handle_inventory_transactions()
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        from apps.inventory.functions import unpost_stock_journal
 
-    def handle_inventory_transactions(self):
-        for entry in self.entries.all():
-            entry.process_transaction()
+        unpost_stock_journal(self)
+        return super().delete(*args, **kwargs)
 
 
 class StockJournalEntry(BaseModel):
@@ -334,3 +891,80 @@ class StockJournalEntry(BaseModel):
 
     def __str__(self):
         return f"Entry for {self.item.name if self.item else 'Unknown Item'}"
+
+
+VOUCHER_NUMBER_LENGTH = StockJournal._meta.get_field("voucher_number").max_length
+
+
+class VoucherSeries(BaseModel):
+    """
+    How the voucher numbers of one journal type are built for an
+    organization: ``<prefix>/<financial year>/<zero padded number>``, with
+    the financial year part left out when numbering never resets.
+    """
+
+    organization_id = models.UUIDField()
+    transaction_type = models.IntegerField(
+        choices=[(0, "Stock-Transfer"), (1, "Stock-Adjustment"), (2, "Stock-journal")],
+        help_text="Journal type numbered by this series",
+    )
+    prefix = models.CharField(max_length=6, blank=True, default="")
+    padding = models.PositiveSmallIntegerField(
+        default=4, help_text="Minimum number of digits of the running number"
+    )
+    reset_every_financial_year = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "voucher_series"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization_id", "transaction_type"],
+                name="unique_voucher_series",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_transaction_type_display()} series {self.prefix or '-'}"
+
+    def clean(self):
+        longest = self.format_number("00-00" if self.reset_every_financial_year else "", 0)
+        if len(longest) > VOUCHER_NUMBER_LENGTH:
+            raise ValidationError(
+                f"Prefix and padding make voucher numbers longer than "
+                f"{VOUCHER_NUMBER_LENGTH} characters."
+            )
+
+    def format_number(self, period, number):
+        return "/".join(
+            part
+            for part in (self.prefix, period, f"{number:0{self.padding}d}")
+            if part
+        )
+
+
+class VoucherCounter(models.Model):
+    """
+    Last number handed out by a voucher series in one period.
+
+    ``period`` is the financial year code ("24-25"), or empty for series
+    that never reset. The row is incremented inside the transaction that
+    stores the vouchers, so a rollback returns its numbers and the series
+    stays gap-free.
+    """
+
+    series = models.ForeignKey(
+        VoucherSeries, on_delete=models.CASCADE, related_name="counters"
+    )
+    period = models.CharField(max_length=5, blank=True, default="")
+    last_number = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "voucher_counter"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["series", "period"], name="unique_voucher_counter"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.series} {self.period}: {self.last_number}"
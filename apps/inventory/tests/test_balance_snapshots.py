@@ -0,0 +1,124 @@
+import io
+import uuid
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.inventory.functions import stock_balances_as_of, take_stock_snapshot
+from apps.inventory.models import (
+    InventoryTransaction,
+    StockBalanceSnapshot,
+    snapshot_cutoff,
+)
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.main.utils import UserProxy
+
+
+class StockBalanceSnapshotTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/stock-report/as-of/"
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def post_on(self, days_ago, quantity, transaction_type="Inbound", godown=None):
+        transaction = self.post(quantity, transaction_type, godown)
+        moment = snapshot_cutoff(self.today - timedelta(days=days_ago + 1)) + timedelta(hours=12)
+        InventoryTransaction.objects.filter(pk=transaction.pk).update(
+            transaction_date=moment
+        )
+        return transaction
+
+    def as_of(self, days_ago):
+        balances = stock_balances_as_of(
+            self.organization_id,
+            snapshot_cutoff(self.today - timedelta(days=days_ago)),
+        )
+        return balances.get((self.item.id, self.godown.id), 0)
+
+    def test_balances_without_snapshots_replay_history(self):
+        self.post_on(5, 10)
+        self.post_on(3, 4, "Outbound")
+        self.post_on(1, 7)
+
+        self.assertEqual(self.as_of(6), 0)
+        self.assertEqual(self.as_of(4), 10)
+        self.assertEqual(self.as_of(2), 6)
+        self.assertEqual(self.as_of(0), 13)
+
+    def test_snapshot_limits_the_transactions_read(self):
+        self.post_on(5, 10)
+        self.post_on(3, 4, "Outbound")
+        take_stock_snapshot(self.organization_id, self.today - timedelta(days=3))
+        # A row behind the snapshot no longer contributes to later balances.
+        InventoryTransaction.objects.filter(quantity=10).update(quantity=1000)
+        self.post_on(1, 7)
+
+        self.assertEqual(self.as_of(3), 6)
+        self.assertEqual(self.as_of(0), 13)
+
+    def test_editing_an_old_transaction_invalidates_later_snapshots(self):
+        transaction = self.post_on(5, 10)
+        take_stock_snapshot(self.organization_id, self.today - timedelta(days=6))
+        take_stock_snapshot(self.organization_id, self.today - timedelta(days=2))
+
+        transaction = InventoryTransaction.objects.get(pk=transaction.pk)
+        transaction.quantity = 3
+        transaction.save()
+
+        self.assertEqual(
+            list(StockBalanceSnapshot.objects.values_list("snapshot_date", flat=True)),
+            [],
+        )
+        self.assertEqual(self.as_of(0), 3)
+
+    def test_today_cannot_be_snapshotted(self):
+        with self.assertRaises(ValueError):
+            take_stock_snapshot(self.organization_id, self.today)
+
+    def test_command_snapshots_each_organization(self):
+        self.post_on(2, 10)
+        self.post_on(2, 5, godown=self.other_godown)
+
+        call_command("snapshot_stock_balances", stdout=io.StringIO())
+
+        self.assertEqual(
+            StockBalanceSnapshot.objects.filter(
+                snapshot_date=self.today - timedelta(days=1)
+            ).count(),
+            2,
+        )
+
+    def test_as_of_endpoint(self):
+        self.post_on(4, 10)
+        self.post_on(1, 3, "Outbound")
+
+        response = self.client.get(
+            self.url, {"date": str(self.today - timedelta(days=2))}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["item_name"], row["godown_name"], row["balance"]) for row in response.json()["data"]],
+            [("Pen", "Main", 10)],
+        )
+
+    def test_as_of_endpoint_requires_a_date(self):
+        response = self.client.get(self.url, {"date": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_as_of_endpoint_rejects_malformed_ids(self):
+        response = self.client.get(
+            self.url, {"date": str(self.today), "godown": "not-a-uuid"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("godown", response.json()["error"])
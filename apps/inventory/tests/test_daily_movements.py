@@ -0,0 +1,121 @@
+import io
+import uuid
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.inventory.functions import stock_movement_report
+from apps.inventory.models import DailyStockMovement, InventoryTransaction, snapshot_cutoff
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.item.models import StockGroup
+from apps.main.utils import UserProxy
+
+
+class DailyStockMovementTest(StockFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+
+    def post_on(self, days_ago, quantity, transaction_type="Inbound", godown=None):
+        transaction = self.post(quantity, transaction_type, godown)
+        moment = snapshot_cutoff(self.today - timedelta(days=days_ago + 1)) + timedelta(hours=12)
+        InventoryTransaction.objects.filter(pk=transaction.pk).update(
+            transaction_date=moment
+        )
+        return transaction
+
+    def days(self):
+        return list(
+            DailyStockMovement.objects.filter(godown=self.godown)
+            .order_by("movement_date")
+            .values_list("opening", "inward", "outward", "adjustment", "closing")
+        )
+
+    def test_postings_accumulate_into_todays_row(self):
+        self.post(10)
+        self.post(4, "Outbound")
+        self.post(2, "Adjustment")
+
+        self.assertEqual(self.days(), [(0, 10, 4, 2, 6)])
+
+    def test_editing_a_past_day_shifts_later_days(self):
+        self.post(5)
+        old = self.post_on(3, 10)
+        DailyStockMovement.objects.all().delete()
+        call_command("backfill_daily_stock_movements", stdout=io.StringIO())
+
+        old = InventoryTransaction.objects.get(pk=old.pk)
+        old.quantity = 7
+        old.save()
+
+        self.assertEqual(self.days(), [(0, 7, 0, 0, 7), (7, 5, 0, 0, 12)])
+
+    def test_backfill_matches_incremental_maintenance(self):
+        self.post(10)
+        self.post(3, "Outbound")
+        self.post(6, godown=self.other_godown)
+        incremental = sorted(
+            DailyStockMovement.objects.values_list(
+                "godown_id", "opening", "inward", "outward", "closing"
+            )
+        )
+
+        DailyStockMovement.objects.all().delete()
+        call_command("backfill_daily_stock_movements", stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(
+                DailyStockMovement.objects.values_list(
+                    "godown_id", "opening", "inward", "outward", "closing"
+                )
+            ),
+            incremental,
+        )
+
+    def test_report_derives_opening_from_the_latest_closing(self):
+        for days_ago, quantity, transaction_type in [
+            (10, 20, "Inbound"),
+            (5, 5, "Outbound"),
+            (2, 8, "Inbound"),
+        ]:
+            self.post_on(days_ago, quantity, transaction_type)
+        DailyStockMovement.objects.all().delete()
+        call_command("backfill_daily_stock_movements", stdout=io.StringIO())
+
+        report = stock_movement_report(
+            self.organization_id,
+            self.today - timedelta(days=6),
+            self.today - timedelta(days=3),
+        )
+        self.assertEqual(
+            [(row["opening"], row["inward"], row["outward"], row["closing"]) for row in report],
+            [(20, 0, 5, 15)],
+        )
+
+        # No movement in the range still reports the carried balance.
+        report = stock_movement_report(self.organization_id, self.today, self.today)
+        self.assertEqual(report[0]["opening"], 23)
+        self.assertEqual(report[0]["closing"], 23)
+
+    def test_movement_endpoint_groups_by_stock_group(self):
+        group = StockGroup.objects.create(auto_id=1, name="Stationery")
+        self.item.stock_group = group
+        self.item.save()
+        self.post(10)
+        self.post(6, godown=self.other_godown)
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+
+        response = client.get(
+            "/api/v1/inventory/stock-report/movement/",
+            {"from_date": str(self.today), "to_date": str(self.today), "group_by": "stock_group"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["name"], row["inward"], row["closing"]) for row in response.json()["data"]],
+            [("Stationery", 16, 16)],
+        )
@@ -0,0 +1,50 @@
+import csv
+import io
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.main.utils import UserProxy
+
+
+class InventoryExportTest(StockFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=UserProxy(None, self.organization_id))
+        self.post(10)
+        self.post(4, "Outbound")
+        self.post(3, godown=self.other_godown)
+
+    def rows(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_stock_reports(self):
+        rows = self.rows(
+            "/api/v1/inventory/stock-report/export/",
+            columns="item,godown,closing_balance",
+        )
+
+        self.assertEqual(
+            rows,
+            [
+                ["Item", "Godown", "Closing Balance"],
+                ["Pen", "Main", "6"],
+                ["Pen", "Store", "3"],
+            ],
+        )
+
+    def test_transactions_are_filtered(self):
+        url = "/api/v1/inventory/inventory-transaction/export/"
+
+        outbound = self.rows(url, transaction_type="Outbound", columns="transaction_type,quantity")
+        in_main = self.rows(url, godown=str(self.godown.id), columns="quantity")
+        invalid = self.client.get(url, {"from_date": "yesterday"})
+
+        self.assertEqual(outbound, [["Type", "Quantity"], ["Outbound", "4"]])
+        self.assertEqual(in_main, [["Quantity"], ["10"], ["4"]])
+        self.assertEqual(invalid.status_code, 400)
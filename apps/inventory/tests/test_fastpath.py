@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.inventory.api_v1.serializers import ListInventoryTransactionSerializer
+from apps.inventory.models import InventoryTransaction
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.main.utils import UserProxy
+
+
+class TransactionListTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/inventory-transaction/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=UserProxy(None, self.organization_id))
+        self.post(10)
+        self.post(4, "Outbound", godown=self.other_godown)
+
+    def test_list_matches_the_serializer(self):
+        queryset = InventoryTransaction.objects.filter(
+            organization_id=self.organization_id
+        )
+        expected = ListInventoryTransactionSerializer(queryset, many=True).data
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            JSONRenderer().render(response.data["data"]), JSONRenderer().render(expected)
+        )
+        self.assertEqual(
+            {row["godown_name"] for row in response.data["data"]}, {"Main", "Store"}
+        )
+
+    def test_list_is_one_query(self):
+        for _ in range(5):
+            self.post(1)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.json()["data"]), 7)
+        selects = [query for query in context if query["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
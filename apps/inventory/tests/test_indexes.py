@@ -0,0 +1,67 @@
+import uuid
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.inventory.functions import JOURNAL_REFERENCE_TYPE
+from apps.inventory.models import InventoryTransaction, StockReport
+from apps.main.tests.explain import IndexUsageMixin
+
+
+class InventoryIndexTest(IndexUsageMixin, TestCase):
+    organization_id = uuid.uuid4()
+    item_id = uuid.uuid4()
+    godown_id = uuid.uuid4()
+
+    def transactions(self, **filters):
+        return InventoryTransaction.objects.filter(
+            organization_id=self.organization_id, **filters
+        )
+
+    def test_transactions_by_date(self):
+        self.assertUsesIndex(self.transactions(), "inventory_txn_org_date_idx")
+        self.assertUsesIndex(
+            self.transactions(transaction_date__lt=timezone.now()),
+            "inventory_txn_org_date_idx",
+        )
+
+    def test_transactions_of_an_item(self):
+        replay = self.transactions(
+            item_id=self.item_id,
+            godown_id=self.godown_id,
+            transaction_type__in=["Inbound", "Outbound"],
+        ).order_by("transaction_date", "date_added")
+        net = (
+            self.transactions(item_id__in=[self.item_id])
+            .order_by()
+            .values_list("item_id", "godown_id")
+            .annotate(net=Sum("quantity"))
+        )
+
+        self.assertUsesIndex(replay, "inventory_txn_item_date_idx")
+        self.assertUsesIndex(net, "inventory_txn_item_date_idx")
+
+    def test_transactions_of_a_journal(self):
+        # Unposting a journal aggregates its lines without ordering them.
+        lines = self.transactions(
+            reference_document_type=JOURNAL_REFERENCE_TYPE,
+            reference_document=str(uuid.uuid4()),
+        ).order_by()
+
+        self.assertUsesIndex(lines, "inventory_txn_reference_idx")
+
+    def test_stock_report_rows_use_the_unique_constraint(self):
+        reports = StockReport.objects.filter(
+            organization_id=self.organization_id,
+            item_id=self.item_id,
+            godown_id=self.godown_id,
+        )
+
+        if connection.vendor == "postgresql":
+            self.assertUsesIndex(reports, "unique_stock_report_item_godown")
+        else:
+            # SQLite names the index of a unique constraint itself.
+            plan = self.explain(reports)
+            self.assertIn("organization_id=? AND item_id=? AND godown_id=?", plan)
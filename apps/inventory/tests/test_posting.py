@@ -0,0 +1,177 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import InventoryTransaction, StockReport
+from apps.item.models import Godown, MeasurementUnit, StockItem
+from apps.main.utils import UserProxy
+
+
+class StockFixtureMixin:
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.unit = MeasurementUnit.objects.create(auto_id=1, name="Nos")
+        self.godown = Godown.objects.create(
+            auto_id=1, name="Main", organization_id=self.organization_id
+        )
+        self.other_godown = Godown.objects.create(
+            auto_id=2, name="Store", organization_id=self.organization_id
+        )
+        self.item = StockItem.objects.create(
+            auto_id=1, name="Pen", organization_id=self.organization_id
+        )
+
+    def post(self, quantity, transaction_type="Inbound", godown=None):
+        return InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            item=self.item,
+            unit=self.unit,
+            godown=godown or self.godown,
+            quantity=quantity,
+            transaction_type=transaction_type,
+        )
+
+    def balance(self, godown=None):
+        return StockReport.objects.get(
+            organization_id=self.organization_id,
+            item=self.item,
+            godown=godown or self.godown,
+        ).closing_balance
+
+
+class InventoryPostingTest(StockFixtureMixin, TestCase):
+    """
+    InventoryTransaction.save/delete must keep StockReport.closing_balance in
+    step with the posted transactions.
+    """
+
+    def test_inbound_and_outbound_share_one_report_row(self):
+        self.post(10)
+        self.post(4, "Outbound")
+        self.post(3)
+
+        self.assertEqual(self.balance(), 9)
+        self.assertEqual(StockReport.objects.count(), 1)
+
+    def test_update_reverses_the_stored_effect(self):
+        transaction = self.post(10)
+        transaction = InventoryTransaction.objects.get(pk=transaction.pk)
+        transaction.quantity = 6
+        transaction.transaction_type = "Outbound"
+        transaction.save()
+
+        self.assertEqual(self.balance(), -6)
+
+    def test_moving_a_transaction_to_another_godown(self):
+        transaction = self.post(10)
+        transaction = InventoryTransaction.objects.get(pk=transaction.pk)
+        transaction.godown = self.other_godown
+        transaction.save()
+
+        self.assertEqual(self.balance(), 0)
+        self.assertEqual(self.balance(self.other_godown), 10)
+
+    def test_delete_reverses_the_effect_once(self):
+        self.post(10)
+        transaction = self.post(4)
+        stale_copy = InventoryTransaction.objects.get(pk=transaction.pk)
+
+        transaction.delete()
+        stale_copy.delete()
+
+        self.assertEqual(self.balance(), 10)
+
+    def test_single_posting_query_budget(self):
+        self.post(1)
+        # SAVEPOINT/RELEASE around the insert, the UPDATEs of the balance and
+        # of the day's movement row, and the INSERT of the cost layer.
+        with self.assertNumQueries(6):
+            self.post(1)
+
+
+class BulkInventoryTransactionViewTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/bulk-inventory-transactions/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def line(self, quantity, transaction_type="Inbound", godown=None):
+        return {
+            "item": str(self.item.id),
+            "unit": str(self.unit.id),
+            "godown": str((godown or self.godown).id),
+            "quantity": quantity,
+            "transaction_type": transaction_type,
+        }
+
+    def test_balances_are_posted_once_per_item_and_godown(self):
+        lines = [self.line(2) for _ in range(100)]
+        lines += [self.line(1, "Outbound") for _ in range(50)]
+        lines += [self.line(5, godown=self.other_godown) for _ in range(10)]
+
+        response = self.client.post(self.url, {"transactions": lines}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["data"]), 160)
+        self.assertEqual(self.balance(), 150)
+        self.assertEqual(self.balance(self.other_godown), 50)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        small = [self.line(1) for _ in range(5)]
+        large = [self.line(1) for _ in range(300)]
+        self.client.post(self.url, {"transactions": small}, format="json")
+
+        with CaptureQueriesContext(connection) as small_batch:
+            self.client.post(self.url, {"transactions": small}, format="json")
+        with CaptureQueriesContext(connection) as large_batch:
+            self.client.post(self.url, {"transactions": large}, format="json")
+
+        def non_insert_queries(context):
+            return [
+                query["sql"]
+                for query in context.captured_queries
+                if not query["sql"].startswith("INSERT")
+            ]
+
+        # Only the number of INSERT batches may depend on the batch size.
+        self.assertEqual(
+            len(non_insert_queries(small_batch)), len(non_insert_queries(large_batch))
+        )
+
+    def test_invalid_rows_reject_the_whole_batch(self):
+        lines = [self.line(2), self.line(0), {**self.line(1), "item": str(uuid.uuid4())}]
+
+        response = self.client.post(self.url, {"transactions": lines}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [row["index"] for row in response.json()["error"]], [1, 2]
+        )
+        self.assertFalse(InventoryTransaction.objects.exists())
+
+    def test_rows_cannot_post_into_other_organizations(self):
+        other = uuid.uuid4()
+        their_item = StockItem.objects.create(auto_id=2, name="Theirs", organization_id=other)
+        their_godown = Godown.objects.create(auto_id=3, name="Theirs", organization_id=other)
+        lines = [
+            {**self.line(1), "organization_id": str(other)},
+            {**self.line(1), "item": str(their_item.id)},
+            {**self.line(1), "godown": str(their_godown.id)},
+            {**self.line(1), "organization_id": str(self.organization_id)},
+        ]
+
+        response = self.client.post(self.url, {"transactions": lines}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(row["index"], list(row["errors"])) for row in response.json()["error"]],
+            [(0, ["organization_id"]), (1, ["item"]), (2, ["godown"])],
+        )
+        self.assertFalse(StockReport.objects.filter(organization_id=other).exists())
@@ -0,0 +1,63 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.inventory.functions import reconcile_stock_reports
+from apps.inventory.models import Openingstock, StockReport
+from apps.inventory.tests.test_posting import StockFixtureMixin
+
+
+class RebuildStockReportsTest(StockFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.post(10)
+        self.post(3, "Outbound")
+        self.post(5, godown=self.other_godown)
+
+    def test_posted_balances_reconcile_cleanly(self):
+        result = reconcile_stock_reports(self.organization_id)
+
+        self.assertEqual(result["mismatched"], 0)
+        self.assertEqual(result["checked"], 2)
+
+    def test_drift_is_reported_without_fix(self):
+        StockReport.objects.filter(godown=self.godown).update(closing_balance=99)
+
+        result = reconcile_stock_reports(self.organization_id)
+
+        self.assertEqual(result["mismatched"], 1)
+        self.assertEqual(result["samples"][0]["stored"], (0, 99))
+        self.assertEqual(result["samples"][0]["expected"], (0, 7))
+        self.assertEqual(self.balance(), 99)
+
+    def test_fix_repairs_drifted_and_missing_rows(self):
+        StockReport.objects.filter(godown=self.godown).update(closing_balance=99)
+        StockReport.objects.filter(godown=self.other_godown).delete()
+
+        result = reconcile_stock_reports(self.organization_id, fix=True, item_batch_size=1)
+
+        self.assertEqual(result["fixed"], 2)
+        self.assertEqual(self.balance(), 7)
+        self.assertEqual(self.balance(self.other_godown), 5)
+        self.assertEqual(reconcile_stock_reports(self.organization_id)["mismatched"], 0)
+
+    def test_opening_stock_is_not_drift(self):
+        # No posting path counts Openingstock in StockReport.
+        Openingstock.objects.create(
+            auto_id=1, organization_id=self.organization_id, stock_item=self.item, quantity=4
+        )
+
+        result = reconcile_stock_reports(self.organization_id, fix=True)
+
+        self.assertEqual((result["mismatched"], result["fixed"]), (0, 0))
+        self.assertFalse(StockReport.objects.filter(godown__isnull=True).exists())
+
+    def test_command_runs_in_process(self):
+        StockReport.objects.filter(godown=self.godown).update(closing_balance=99)
+        out = io.StringIO()
+
+        call_command("rebuild_stock_reports", "--fix", "--workers", "1", stdout=out)
+
+        self.assertIn("1 mismatched, 1 fixed", out.getvalue())
+        self.assertEqual(self.balance(), 7)
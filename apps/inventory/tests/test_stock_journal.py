@@ -0,0 +1,154 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import (
+    InventoryTransaction,
+    StockJournal,
+    StockJournalEntry,
+    StockReport,
+)
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.item.models import Godown, StockItem
+from apps.main.utils import UserProxy
+
+
+class StockJournalPostingTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/stock-journal/"
+
+    def setUp(self):
+        super().setUp()
+        self.item.unit = self.unit
+        self.item.save()
+        self.post(20)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def transfer(self, quantities):
+        return {
+            "transaction_type": 0,
+            "organization_id": str(self.organization_id),
+            "source_godown": str(self.godown.id),
+            "destination_godown": str(self.other_godown.id),
+            "entries": [
+                {"item": str(self.item.id), "quantity": quantity, "rate": 2}
+                for quantity in quantities
+            ],
+        }
+
+    def test_transfer_moves_stock_between_godowns(self):
+        response = self.client.post(self.url, self.transfer([6, 4]), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.balance(), 10)
+        self.assertEqual(self.balance(self.other_godown), 10)
+        self.assertEqual(
+            list(StockJournalEntry.objects.order_by("auto_id").values_list("auto_id", flat=True)),
+            [1, 2],
+        )
+
+    def test_adjustment_sign_picks_the_direction(self):
+        payload = {
+            "transaction_type": 1,
+            "organization_id": str(self.organization_id),
+            "adjustment_godown": str(self.godown.id),
+            "entries": [{"item": str(self.item.id), "quantity": -3}],
+        }
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.balance(), 17)
+
+    def test_update_reposts_and_delete_reverses(self):
+        response = self.client.post(self.url, self.transfer([5]), format="json")
+        journal = StockJournal.objects.get()
+
+        response = self.client.put(
+            f"{self.url}{journal.id}/", self.transfer([8]), format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balance(), 12)
+        self.assertEqual(self.balance(self.other_godown), 8)
+
+        response = self.client.delete(f"{self.url}{journal.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balance(), 20)
+        self.assertEqual(self.balance(self.other_godown), 0)
+        self.assertEqual(InventoryTransaction.objects.count(), 1)
+
+    def test_patch_reposts_and_keeps_the_voucher_number(self):
+        self.client.post(self.url, self.transfer([5]), format="json")
+        journal = StockJournal.objects.get()
+        third = Godown.objects.create(
+            auto_id=3, name="Annex", organization_id=self.organization_id
+        )
+
+        response = self.client.patch(
+            f"{self.url}{journal.id}/",
+            {"destination_godown": str(third.id), "voucher_number": "HACK"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balance(), 15)
+        self.assertEqual(self.balance(self.other_godown), 0)
+        self.assertEqual(self.balance(third), 5)
+        journal.refresh_from_db()
+        self.assertNotEqual(journal.voucher_number, "HACK")
+
+    def test_journals_only_post_into_the_users_organization(self):
+        other = uuid.uuid4()
+        their_godown = Godown.objects.create(auto_id=4, name="Theirs", organization_id=other)
+        their_item = StockItem.objects.create(
+            auto_id=2, name="Their pen", organization_id=other, unit=self.unit
+        )
+        foreign_godown = {**self.transfer([1]), "destination_godown": str(their_godown.id)}
+        foreign_item = self.transfer([1])
+        foreign_item["entries"][0]["item"] = str(their_item.id)
+
+        responses = [
+            self.client.post(self.url, payload, format="json")
+            for payload in (foreign_godown, foreign_item)
+        ]
+        own = self.client.post(
+            self.url, {**self.transfer([1]), "organization_id": str(other)}, format="json"
+        )
+
+        self.assertEqual([response.status_code for response in responses], [400, 400])
+        self.assertEqual(own.status_code, 201)
+        self.assertEqual(StockJournal.objects.get().organization_id, self.organization_id)
+        self.assertFalse(StockReport.objects.filter(organization_id=other).exists())
+
+    def test_invalid_journal_posts_nothing(self):
+        payload = self.transfer([2.5])
+
+        response = self.client.post(self.url, payload, format="json")
+        infinite = self.client.post(self.url, self.transfer(["Infinity"]), format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["StatusCode"], 6001)
+        self.assertEqual(infinite.status_code, 400)
+        self.assertFalse(StockJournal.objects.exists())
+        self.assertEqual(self.balance(), 20)
+
+    def test_query_count_does_not_grow_with_entries(self):
+        def non_insert_queries(quantities):
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(self.url, self.transfer(quantities), format="json")
+            return [
+                query["sql"]
+                for query in context.captured_queries
+                if not query["sql"].startswith("INSERT")
+            ]
+
+        non_insert_queries([1])
+        small = non_insert_queries([1] * 3)
+        large = non_insert_queries([1] * 15)
+
+        self.assertEqual(len(small), len(large))
@@ -0,0 +1,113 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import InventoryTransaction
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.item.models import StockItem
+from apps.main.utils import UserProxy
+
+
+class StockSummaryTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/stock-report/summary/"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.items = [self.item] + [
+            StockItem.objects.create(
+                auto_id=index + 2, name=f"Item {index:02}", organization_id=self.organization_id
+            )
+            for index in range(4)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for quantity, item in enumerate(self.items, start=1):
+                self.post_item(item, quantity)
+            # Another organization's stock must never show up.
+            InventoryTransaction.objects.create(
+                organization_id=uuid.uuid4(),
+                item=self.item,
+                unit=self.unit,
+                quantity=100,
+                transaction_type="Inbound",
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def post_item(self, item, quantity):
+        return InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            item=item,
+            unit=self.unit,
+            godown=self.godown,
+            quantity=quantity,
+            transaction_type="Inbound",
+        )
+
+    def test_keyset_pages_cover_every_item_once(self):
+        names = []
+        params = {"page_size": 2}
+        while True:
+            body = self.client.get(self.url, params).json()
+            names += [row["name"] for row in body["data"]]
+            if not body["next_cursor"]:
+                break
+            params["cursor"] = body["next_cursor"]
+
+        self.assertEqual(names, sorted(item.name for item in self.items))
+
+    def test_group_by_godown_is_tenant_scoped(self):
+        body = self.client.get(self.url, {"group_by": "godown"}).json()
+
+        self.assertEqual(
+            [(row["name"], row["total_closing_balance"]) for row in body["data"]],
+            [("Main", 15)],
+        )
+
+    def test_repeated_polls_are_served_from_cache(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        # Only the ATOMIC_REQUESTS savepoint remains.
+        self.assertFalse(
+            [query for query in context.captured_queries if "SAVEPOINT" not in query["sql"]]
+        )
+
+    def test_posting_invalidates_the_cached_summary(self):
+        self.client.get(self.url, {"group_by": "godown"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_item(self.item, 5)
+
+        body = self.client.get(self.url, {"group_by": "godown"}).json()
+        self.assertEqual(body["data"][0]["total_closing_balance"], 20)
+
+    def test_renames_invalidate_the_cached_summary(self):
+        self.client.get(self.url, {"group_by": "godown"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.godown.name = "Warehouse"
+            self.godown.save()
+
+        body = self.client.get(self.url, {"group_by": "godown"}).json()
+        self.assertEqual(body["data"][0]["name"], "Warehouse")
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["StatusCode"], 6001)
+
+    def test_unknown_grouping_is_rejected(self):
+        response = self.client.get(self.url, {"group_by": "colour"})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,143 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.inventory.models import CostConsumption, CostLayer, InventoryTransaction
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.inventory.valuation import stock_valuation
+from apps.main.utils import UserProxy
+
+
+class ValuationFixtureMixin(StockFixtureMixin):
+    def receive(self, quantity, rate):
+        return InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            item=self.item,
+            unit=self.unit,
+            godown=self.godown,
+            quantity=quantity,
+            rate=rate,
+            transaction_type="Inbound",
+        )
+
+    def issue(self, quantity, method):
+        return InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            item=self.item,
+            unit=self.unit,
+            godown=self.godown,
+            quantity=quantity,
+            transaction_type="Outbound",
+            evaluation_method=method,
+        )
+
+
+
+class ValuationTest(ValuationFixtureMixin, TestCase):
+    def cogs(self, transaction):
+        return sum(
+            consumption.value
+            for consumption in CostConsumption.objects.filter(transaction=transaction)
+        )
+
+    def on_hand(self):
+        row = stock_valuation(self.organization_id).get()
+        return row["quantity"], row["value"]
+
+    def test_fifo_consumes_oldest_layers(self):
+        self.receive(10, 2)
+        self.receive(10, 3)
+        outbound = self.issue(15, "10")
+
+        self.assertEqual(self.cogs(outbound), Decimal("35"))
+        self.assertEqual(self.on_hand(), (5, Decimal("15")))
+
+    def test_lifo_consumes_newest_layers(self):
+        self.receive(10, 2)
+        self.receive(10, 3)
+        outbound = self.issue(15, "20")
+
+        self.assertEqual(self.cogs(outbound), Decimal("40"))
+        self.assertEqual(self.on_hand(), (5, Decimal("10")))
+
+    def test_average_charges_the_moving_average(self):
+        self.receive(10, 2)
+        self.receive(10, 3)
+        outbound = self.issue(15, "30")
+
+        self.assertEqual(self.cogs(outbound), Decimal("37.5"))
+        self.assertEqual(self.on_hand(), (5, Decimal("12.5")))
+
+    def test_shortfall_is_costed_at_the_last_unit_cost(self):
+        self.receive(4, 5)
+        outbound = self.issue(6, "10")
+
+        self.assertEqual(self.cogs(outbound), Decimal("30"))
+        self.assertFalse(stock_valuation(self.organization_id).exists())
+
+    def test_deleting_a_receipt_revalues_later_issues(self):
+        first = self.receive(10, 2)
+        self.receive(10, 3)
+        outbound = self.issue(15, "10")
+
+        first.delete()
+
+        # Only the 10 @ 3 layer remains; the 5 short are costed at 3 as well.
+        self.assertEqual(self.cogs(outbound), Decimal("45"))
+        self.assertEqual(CostLayer.objects.count(), 1)
+
+    def test_incremental_posting_reads_only_open_layers(self):
+        self.receive(10, 2)
+        self.issue(10, "10")
+        self.receive(10, 3)
+
+        # Load + lock open layers, one UPDATE via bulk_update, one INSERT of
+        # the consumption, on top of the transaction, balance and daily
+        # movement writes.
+        with self.assertNumQueries(8):
+            self.issue(5, "10")
+
+
+class ValuationViewTest(ValuationFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def test_valuation_and_cogs_endpoints(self):
+        self.receive(10, 2)
+        self.issue(4, "10")
+        today = timezone.localdate()
+
+        valuation = self.client.get("/api/v1/inventory/stock-report/valuation/")
+        cogs = self.client.get(
+            "/api/v1/inventory/stock-report/cogs/",
+            {"from_date": str(today - timedelta(days=1)), "to_date": str(today)},
+        )
+
+        self.assertEqual(valuation.status_code, 200)
+        self.assertEqual(Decimal(str(valuation.json()["total_value"])), Decimal("12"))
+        self.assertEqual(cogs.status_code, 200)
+        self.assertEqual(Decimal(str(cogs.json()["data"][0]["value"])), Decimal("8"))
+
+    def test_malformed_ids_are_rejected(self):
+        today = str(timezone.localdate())
+
+        valuation = self.client.get(
+            "/api/v1/inventory/stock-report/valuation/", {"stock_group": "12"}
+        )
+        cogs = self.client.get(
+            "/api/v1/inventory/stock-report/cogs/",
+            {"from_date": today, "to_date": today, "item": "pen"},
+        )
+
+        self.assertEqual(valuation.status_code, 400)
+        self.assertIn("stock_group", valuation.json()["error"])
+        self.assertEqual(cogs.status_code, 400)
+        self.assertIn("item", cogs.json()["error"])
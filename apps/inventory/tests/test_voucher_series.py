@@ -0,0 +1,160 @@
+import uuid
+from datetime import date
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.functions import (
+    STOCK_ADJUSTMENT,
+    STOCK_TRANSFER,
+    allocate_voucher_numbers,
+)
+from apps.inventory.models import FinancialYear, StockJournal, VoucherSeries
+from apps.inventory.tests.test_posting import StockFixtureMixin
+from apps.main.utils import UserProxy
+
+
+class VoucherAllocationTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+
+    def allocate(self, count=1, on_date=date(2024, 5, 1), transaction_type=STOCK_TRANSFER):
+        return allocate_voucher_numbers(
+            self.organization_id, transaction_type, count, on_date
+        )
+
+    def test_numbers_follow_the_default_series(self):
+        self.assertEqual(self.allocate(), ["ST/24-25/0001"])
+        self.assertEqual(self.allocate(2), ["ST/24-25/0002", "ST/24-25/0003"])
+        self.assertEqual(
+            self.allocate(transaction_type=STOCK_ADJUSTMENT), ["SA/24-25/0001"]
+        )
+
+    def test_numbering_restarts_each_financial_year(self):
+        self.allocate(3)
+        self.assertEqual(self.allocate(on_date=date(2025, 4, 1)), ["ST/25-26/0001"])
+        self.assertEqual(self.allocate(on_date=date(2025, 3, 31)), ["ST/24-25/0004"])
+
+    def test_configured_financial_years_and_series(self):
+        FinancialYear.objects.create(
+            auto_id=1,
+            organization_id=self.organization_id,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+        )
+        VoucherSeries.objects.create(
+            auto_id=1,
+            organization_id=self.organization_id,
+            transaction_type=STOCK_TRANSFER,
+            prefix="TR",
+            padding=6,
+        )
+
+        self.assertEqual(self.allocate(), ["TR/24/000001"])
+
+    def test_series_without_reset_has_no_year(self):
+        VoucherSeries.objects.create(
+            auto_id=1,
+            organization_id=self.organization_id,
+            transaction_type=STOCK_TRANSFER,
+            prefix="TR",
+            reset_every_financial_year=False,
+        )
+        self.allocate()
+
+        self.assertEqual(self.allocate(on_date=date(2030, 1, 1)), ["TR/0002"])
+
+    def test_rolled_back_numbers_are_handed_out_again(self):
+        self.allocate()
+        try:
+            with transaction.atomic():
+                self.assertEqual(self.allocate(5)[0], "ST/24-25/0002")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(self.allocate(), ["ST/24-25/0002"])
+
+    def test_reserving_a_range_costs_the_same_as_one_number(self):
+        self.allocate()
+        with CaptureQueriesContext(connection) as one:
+            self.allocate()
+        with CaptureQueriesContext(connection) as many:
+            numbers = self.allocate(5000)
+
+        self.assertEqual(len(one.captured_queries), len(many.captured_queries))
+        self.assertEqual(numbers[-1], "ST/24-25/5002")
+
+
+class StockJournalVoucherTest(StockFixtureMixin, TestCase):
+    url = "/api/v1/inventory/stock-journal/"
+    series_url = "/api/v1/inventory/voucher-series/"
+
+    def setUp(self):
+        super().setUp()
+        self.item.unit = self.unit
+        self.item.save()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def transfer(self, **extra):
+        return {
+            "transaction_type": STOCK_TRANSFER,
+            "organization_id": str(self.organization_id),
+            "source_godown": str(self.godown.id),
+            "destination_godown": str(self.other_godown.id),
+            "entries": [{"item": str(self.item.id), "quantity": 1}],
+            **extra,
+        }
+
+    def create_series(self, **data):
+        return self.client.post(self.series_url, data, format="json")
+
+    def test_journals_get_consecutive_numbers(self):
+        self.create_series(transaction_type=0, prefix="TR")
+        for _ in range(2):
+            self.client.post(self.url, self.transfer(voucher_number="X1"), format="json")
+
+        numbers = sorted(StockJournal.objects.values_list("voucher_number", flat=True))
+        self.assertEqual(len(numbers), 2)
+        self.assertTrue(numbers[0].startswith("TR/") and numbers[0].endswith("/0001"))
+        self.assertTrue(numbers[1].endswith("/0002"))
+
+    def test_number_is_taken_after_the_posting(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, self.transfer(), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        writes = [
+            query["sql"]
+            for query in context
+            if query["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        counter = next(
+            index for index, sql in enumerate(writes) if '"voucher_counter"' in sql
+        )
+        posting = max(
+            index
+            for index, sql in enumerate(writes)
+            if '"inventory_transaction"' in sql or '"stock_report"' in sql
+        )
+        self.assertGreater(counter, posting)
+        self.assertTrue(
+            StockJournal.objects.get().voucher_number.endswith("/0001")
+        )
+
+    def test_series_must_fit_the_voucher_number(self):
+        response = self.create_series(transaction_type=0, prefix="LONGER", padding=8)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(VoucherSeries.objects.exists())
+
+    def test_one_series_per_transaction_type(self):
+        self.create_series(transaction_type=0, prefix="TR")
+        response = self.create_series(transaction_type=0)
+
+        self.assertEqual(response.status_code, 400)
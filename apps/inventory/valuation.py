@@ -0,0 +1,217 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from apps.inventory.models import (
+    CostConsumption,
+    CostLayer,
+    InventoryTransaction,
+)
+from apps.item.models import StockGroup
+
+
+FIFO = "10"
+LIFO = "20"
+AVERAGE = "30"
+
+VALUE_PRECISION = Decimal("0.0001")
+
+
+def _open_layers(keys):
+    """Load and lock the open layers of the given stock keys, oldest first."""
+    layers = defaultdict(list)
+    for organization_id, item_id, godown_id in keys:
+        queryset = CostLayer.objects.select_for_update().filter(
+            organization_id=organization_id,
+            item_id=item_id,
+            godown_id=godown_id,
+            remaining_quantity__gt=0,
+        )
+        for layer in queryset.order_by("received_at", "date_added"):
+            layers[(organization_id, item_id, godown_id)].append(layer)
+    return layers
+
+
+def _consume(transaction, layers, changed, consumptions):
+    """Take ``transaction.quantity`` out of ``layers`` (mutated in place)."""
+    remaining = transaction.quantity
+    open_layers = [layer for layer in layers if layer.remaining_quantity > 0]
+    if transaction.evaluation_method == LIFO:
+        open_layers.reverse()
+
+    average_cost = None
+    if transaction.evaluation_method == AVERAGE:
+        quantity = sum(layer.remaining_quantity for layer in open_layers)
+        value = sum((layer.remaining_value for layer in open_layers), Decimal(0))
+        if quantity:
+            average_cost = value / quantity
+
+    last_layer = None
+    for layer in open_layers:
+        if not remaining:
+            break
+        taken = min(remaining, layer.remaining_quantity)
+        if average_cost is not None:
+            value = (average_cost * taken).quantize(VALUE_PRECISION)
+        elif taken == layer.remaining_quantity:
+            value = layer.remaining_value
+        else:
+            value = (layer.remaining_value * taken / layer.remaining_quantity).quantize(
+                VALUE_PRECISION
+            )
+        layer.remaining_quantity -= taken
+        layer.remaining_value -= value
+        changed[id(layer)] = layer
+        consumptions.append(_consumption(transaction, layer, taken, value))
+        remaining -= taken
+        last_layer = layer
+
+    if average_cost is not None:
+        # Moving average: what is left is carried at the average cost.
+        for layer in open_layers:
+            if layer.remaining_quantity:
+                layer.remaining_value = (average_cost * layer.remaining_quantity).quantize(
+                    VALUE_PRECISION
+                )
+                changed[id(layer)] = layer
+
+    if remaining:
+        # Stock ran short: cost the shortfall at the last known unit cost.
+        reference = last_layer or (layers[-1] if layers else None)
+        unit_cost = reference.unit_cost if reference is not None else Decimal(0)
+        consumptions.append(
+            _consumption(transaction, None, remaining, (unit_cost * remaining).quantize(VALUE_PRECISION))
+        )
+
+
+def _consumption(transaction, layer, quantity, value):
+    return CostConsumption(
+        organization_id=transaction.organization_id,
+        item_id=transaction.item_id,
+        godown_id=transaction.godown_id,
+        transaction=transaction,
+        layer=layer,
+        consumed_at=transaction.transaction_date,
+        quantity=quantity,
+        value=value,
+    )
+
+
+def _layer(transaction):
+    # The rate is per unit entered, the layer per base unit.
+    value = Decimal(transaction.rate or 0) * transaction.priced_quantity
+    return CostLayer(
+        organization_id=transaction.organization_id,
+        item_id=transaction.item_id,
+        godown_id=transaction.godown_id,
+        source=transaction,
+        received_at=transaction.transaction_date,
+        quantity=transaction.quantity,
+        remaining_quantity=transaction.quantity,
+        unit_cost=(value / transaction.quantity).quantize(VALUE_PRECISION),
+        remaining_value=value.quantize(VALUE_PRECISION),
+    )
+
+
+def apply_valuation(transactions, load_layers=True):
+    """
+    Post saved transactions, in order, to the cost layers of their stock.
+
+    Inbound lines open a layer at their rate; outbound lines consume open
+    layers by their ``evaluation_method``. Existing layers are only read for
+    stock that has outbound lines, and every write is batched, so a posting
+    costs a handful of queries however many lines it carries. Must run
+    inside a transaction.
+    """
+    consuming = {
+        transaction._stock_key()
+        for transaction in transactions
+        if transaction.transaction_type == "Outbound"
+    }
+    layers = _open_layers(consuming) if load_layers else defaultdict(list)
+
+    new_layers = []
+    changed = {}
+    consumptions = []
+    for transaction in transactions:
+        key = transaction._stock_key()
+        if transaction.transaction_type == "Inbound":
+            layer = _layer(transaction)
+            layers[key].append(layer)
+            new_layers.append(layer)
+        elif transaction.transaction_type == "Outbound":
+            _consume(transaction, layers[key], changed, consumptions)
+
+    # New layers are inserted in their final state, so only layers that
+    # existed before this posting need an UPDATE.
+    new_ids = {id(layer) for layer in new_layers}
+    CostLayer.objects.bulk_create(new_layers, batch_size=1000)
+    existing = [layer for key, layer in changed.items() if key not in new_ids]
+    if existing:
+        CostLayer.objects.bulk_update(
+            existing, ["remaining_quantity", "remaining_value"], batch_size=1000
+        )
+    CostConsumption.objects.bulk_create(consumptions, batch_size=1000)
+
+
+def revalue_stock(organization_id, item_id, godown_id):
+    """
+    Rebuild the cost layers of one item/godown from its transactions.
+
+    Used when a posted transaction is edited or deleted, which changes the
+    cost flow of everything posted after it.
+    """
+    CostConsumption.objects.filter(
+        organization_id=organization_id, item_id=item_id, godown_id=godown_id
+    ).delete()
+    CostLayer.objects.filter(
+        organization_id=organization_id, item_id=item_id, godown_id=godown_id
+    ).delete()
+    transactions = InventoryTransaction.objects.filter(
+        organization_id=organization_id,
+        item_id=item_id,
+        godown_id=godown_id,
+        transaction_type__in=["Inbound", "Outbound"],
+    ).order_by("transaction_date", "date_added")
+    apply_valuation(list(transactions), load_layers=False)
+
+
+def stock_valuation(
+    organization_id, item_id=None, godown_id=None, stock_group_id=None
+):
+    """
+    Quantity and value still in stock per item/godown, from open layers.
+
+    ``stock_group_id`` keeps the items of that group and its subgroups.
+    """
+    layers = CostLayer.objects.filter(
+        organization_id=organization_id, remaining_quantity__gt=0
+    )
+    if item_id:
+        layers = layers.filter(item_id=item_id)
+    if godown_id:
+        layers = layers.filter(godown_id=godown_id)
+    if stock_group_id:
+        layers = layers.filter(
+            StockGroup.subtree_q("item__stock_group", stock_group_id)
+        )
+    return (
+        layers.order_by("item__name", "godown__name")
+        .values("item", "item__name", "godown", "godown__name")
+        .annotate(quantity=Sum("remaining_quantity"), value=Sum("remaining_value"))
+    )
+
+
+def cost_of_goods_sold(organization_id, start, end, item_id=None):
+    """Cost of the stock consumed per item between ``start`` and ``end``."""
+    consumptions = CostConsumption.objects.filter(
+        organization_id=organization_id, consumed_at__gte=start, consumed_at__lt=end
+    )
+    if item_id:
+        consumptions = consumptions.filter(item_id=item_id)
+    return (
+        consumptions.order_by("item__name")
+        .values("item", "item__name")
+        .annotate(quantity=Sum("quantity"), value=Sum("value"))
+    )
@@ -38,6 +38,10 @@ from apps.item.api_v1.views import (
     unit_detailed_stockitem_list,
     godowns_for_the_branch,
     godown_stock_items,
+    convert_quantities,
+    stock_in_units,
+    barcode_lookup,
+    autocomplete_names,
     StockItemUnitsListView,
     # stock_jurnal_stock_report,
     CreatePrimaryEntitiesView,
@@ -107,6 +111,10 @@ urlpatterns = [
     ),
     path("branch-godown-list/", godowns_for_the_branch, name="brand-godown-list"),
     path("godown-items/", godown_stock_items, name="godown-stock-items"),
+    path("lookup/barcode/<str:code>/", barcode_lookup, name="barcode-lookup"),
+    path("autocomplete/", autocomplete_names, name="autocomplete"),
+    path("units/convert/", convert_quantities, name="convert-quantities"),
+    path("units/stock/", stock_in_units, name="stock-in-units"),
     path(
         "stock-items-units/",
         StockItemUnitsListView.as_view(),
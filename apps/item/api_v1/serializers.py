@@ -1,9 +1,14 @@
+from collections import defaultdict
 from apps.main.serializers import BaseModelSerializer
+from apps.main.fastpath import ValuesSerializer
+from apps.main.fieldsets import SparseFieldsSerializerMixin
+from apps.main.functions import get_auto_id, get_auto_ids
 from rest_framework import serializers
 from django.db import transaction, models
 from django.utils import timezone
 from datetime import datetime, date
-from django.db.models import Max
+from decimal import Decimal
+from django.db.models import Max, Prefetch
 from django.core.exceptions import ValidationError
 from apps.item.models import (
     Brand,
@@ -28,8 +33,10 @@ from apps.item.models import (
 )
 from apps.inventory.models import (
     Openingstock,
-    StockReport,
 )
+from apps.inventory.functions import stock_quantities
+from apps.item.pricing import ALTERNATE_UNIT_PRICE_FIELDS, PRICE_FIELDS, PRICE_METHODS
+from apps.item.units import ConversionError, ConversionGraph
 
 
 class UQCSerializer(BaseModelSerializer):
@@ -182,6 +189,24 @@ class MeasurementUnitSerializer(BaseModelSerializer):
 #         return StockGroupTreeSerializer(children, many=True).data
 
 
+def tree_children(serializer, obj, related_name):
+    # The tree views link the nodes in memory (see apps.item.trees).
+    if "children" in serializer.context:
+        children = serializer.context["children"].get(obj.pk, [])
+    else:
+        children = getattr(obj, related_name).all()
+    return type(serializer)(children, many=True, context=serializer.context).data
+
+
+def tree_parent(serializer, obj, parent_field):
+    parent_id = getattr(obj, f"{parent_field}_id")
+    if parent_id is None:
+        return None
+    if "nodes" in serializer.context:
+        return serializer.context["nodes"].get(parent_id)
+    return getattr(obj, parent_field)
+
+
 class StockGroupTreeSerializer(BaseModelSerializer):
     children = serializers.SerializerMethodField()
     parent_group_name = serializers.SerializerMethodField()
@@ -200,11 +225,11 @@ class StockGroupTreeSerializer(BaseModelSerializer):
         ]
 
     def get_children(self, obj):
-        children = obj.child_stock_groups.all()
-        return StockGroupTreeSerializer(children, many=True).data
+        return tree_children(self, obj, "child_stock_groups")
 
     def get_parent_group_name(self, obj):
-        return obj.parent_group.name if obj.parent_group else None
+        parent = tree_parent(self, obj, "parent_group")
+        return parent.name if parent else None
 
 
 class StockGroupSerializer(BaseModelSerializer):
@@ -235,13 +260,10 @@ class StockGroupSerializer(BaseModelSerializer):
         if value and self.instance and value.id == self.instance.id:
             raise serializers.ValidationError("A group cannot be its own parent.")
 
-        current = value
-        while current:
-            if current == self.instance:
-                raise serializers.ValidationError(
-                    "Circular reference detected in parent group."
-                )
-            current = current.parent_group
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent group."
+            )
         return value
 
 
@@ -354,6 +376,13 @@ class BrandSerializer(BaseModelSerializer):
             raise serializers.ValidationError("Organization ID is required.")
         return value
 
+    def validate_parent_brand(self, value):
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent brand."
+            )
+        return value
+
     def update(self, instance, validated_data):
         instance.name = validated_data.get("name", instance.name)
         instance.organization_id = validated_data.get(
@@ -404,13 +433,10 @@ class StockCategorySerializer(BaseModelSerializer):
         if value and self.instance and value.id == self.instance.id:
             raise serializers.ValidationError("A category cannot be its own parent.")
 
-        current = value
-        while current:
-            if current == self.instance:
-                raise serializers.ValidationError(
-                    "Circular reference detected in parent category."
-                )
-            current = current.parent_category
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent category."
+            )
         return value
 
     def validate(self, data):
@@ -429,15 +455,12 @@ class StockCategorySerializer(BaseModelSerializer):
                     {"parent_category": "A category cannot be its own parent."}
                 )
 
-            parent = new_parent
-            while parent:
-                if parent.id == instance.id:
-                    raise serializers.ValidationError(
-                        {
-                            "parent_category": "Circular reference detected in parent category."
-                        }
-                    )
-                parent = parent.parent_category
+            if instance.creates_cycle(new_parent):
+                raise serializers.ValidationError(
+                    {
+                        "parent_category": "Circular reference detected in parent category."
+                    }
+                )
 
         for field in [
             "name",
@@ -504,13 +527,11 @@ class StockCategoryTreeSerializer(BaseModelSerializer):
         ]
 
     def get_children(self, obj):
-        children = obj.child_categories.all()
-        return StockCategoryTreeSerializer(children, many=True).data
+        return tree_children(self, obj, "child_categories")
 
     def get_parent_category_name(self, obj):
-        if obj.parent_category:
-            return obj.parent_category.name
-        return None
+        parent = tree_parent(self, obj, "parent_category")
+        return parent.name if parent else None
 
 
 class BranchSerializer(BaseModelSerializer):
@@ -554,6 +575,13 @@ class BranchSerializer(BaseModelSerializer):
             raise serializers.ValidationError("Pincode cannot exceed 10 characters.")
         return value
 
+    def validate_parent_branch(self, value):
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent branch."
+            )
+        return value
+
     def update(self, instance, validated_data):
         BranchHistory.objects.create(
             branch=instance,
@@ -626,6 +654,13 @@ class GodownSerializer(BaseModelSerializer):
             raise serializers.ValidationError("Pincode cannot exceed 10 characters.")
         return value
 
+    def validate_parent_godown(self, value):
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent godown."
+            )
+        return value
+
     def update(self, instance, validated_data):
         instance.name = validated_data.get("name", instance.name)
         instance.organization_id = validated_data.get(
@@ -675,8 +710,7 @@ class RackTreeSerializer(BaseModelSerializer):
         ]
 
     def get_children(self, obj):
-        children = obj.child_racks.all()
-        return RackTreeSerializer(children, many=True).data
+        return tree_children(self, obj, "child_racks")
 
 
 class RackSerializer(BaseModelSerializer):
@@ -719,13 +753,10 @@ class RackSerializer(BaseModelSerializer):
         if value and self.instance and value.id == self.instance.id:
             raise serializers.ValidationError("A rack cannot be its own parent.")
 
-        current = value
-        while current:
-            if current == self.instance:
-                raise serializers.ValidationError(
-                    "Circular reference detected in parent rack."
-                )
-            current = current.parent_rack
+        if self.instance and self.instance.creates_cycle(value):
+            raise serializers.ValidationError(
+                "Circular reference detected in parent rack."
+            )
         return value
 
 
@@ -735,6 +766,10 @@ class RackNameListSerializer(BaseModelSerializer):
         fields = ["id", "name", "is_primary_rack"]
 
 
+class RackNameListValues(ValuesSerializer):
+    serializer_class = RackNameListSerializer
+
+
 class ItemGroupSerializer(BaseModelSerializer):
     class Meta:
         model = ItemGroup
@@ -898,47 +933,29 @@ class CreateStockItemSerializer(BaseModelSerializer):
         print(f"Validated Data: {validated_data}")
         print(f"Opening Stock Data: {opening_stock_data}")
 
-        validated_data["auto_id"] = self._generate_auto_id()
+        validated_data["auto_id"] = get_auto_id(StockItem)
         stock_item = StockItem.objects.create(**validated_data)
 
         if alternative_units_data:
-            alternative_units = []
-            for unit_data in alternative_units_data:
-                unit_data["auto_id"] = self._generate_auto_id_for_alternate_units()
-                alternative_unit = AlternateUnits.objects.create(**unit_data)
-                alternative_units.append(alternative_unit)
+            auto_ids = get_auto_ids(AlternateUnits, len(alternative_units_data))
+            alternative_units = AlternateUnits.objects.bulk_create(
+                [
+                    AlternateUnits(auto_id=auto_id, **unit_data)
+                    for auto_id, unit_data in zip(auto_ids, alternative_units_data)
+                ]
+            )
             stock_item.alternative_units.add(*alternative_units)
 
         if opening_stock_data:
             print("Creating Opening Stock....")
             try:
-                opening_stock_data["auto_id"] = (
-                    self._generate_auto_id_for_opening_stock()
-                )
+                opening_stock_data["auto_id"] = get_auto_id(Openingstock)
                 Openingstock.objects.create(stock_item=stock_item, **opening_stock_data)
             except Exception as e:
                 raise serializers.ValidationError({"opening_stock": f"Error: {str(e)}"})
 
         return stock_item
 
-    def _generate_auto_id(self):
-        last_auto_id = StockItem.objects.aggregate(max_id=models.Max("auto_id"))[
-            "max_id"
-        ]
-        return (last_auto_id or 0) + 1
-
-    def _generate_auto_id_for_alternate_units(self):
-        last_auto_id = AlternateUnits.objects.aggregate(max_id=models.Max("auto_id"))[
-            "max_id"
-        ]
-        return (last_auto_id or 0) + 1
-
-    def _generate_auto_id_for_opening_stock(self):
-        last_auto_id = Openingstock.objects.aggregate(max_id=models.Max("auto_id"))[
-            "max_id"
-        ]
-        return (last_auto_id or 0) + 1
-
 
 class UpdateStockItemSerializer(BaseModelSerializer):
     alternative_units = AlternateUnitsSerializer(many=True, required=False)
@@ -1010,36 +1027,27 @@ class UpdateStockItemSerializer(BaseModelSerializer):
         if alternative_units_data:
             instance.alternative_units.clear()
 
-            alternative_units = []
-            for unit_data in alternative_units_data:
-                unit_data["auto_id"] = self._generate_auto_id_for_alternate_units()
-                alternative_unit = AlternateUnits.objects.create(**unit_data)
-                alternative_units.append(alternative_unit)
+            auto_ids = get_auto_ids(AlternateUnits, len(alternative_units_data))
+            alternative_units = AlternateUnits.objects.bulk_create(
+                [
+                    AlternateUnits(auto_id=auto_id, **unit_data)
+                    for auto_id, unit_data in zip(auto_ids, alternative_units_data)
+                ]
+            )
             instance.alternative_units.add(*alternative_units)
 
         if opening_stock_data:
-            opening_stock, created = Openingstock.objects.get_or_create(
-                stock_item=instance
-            )
+            opening_stock = Openingstock.objects.filter(stock_item=instance).first()
+            if opening_stock is None:
+                opening_stock = Openingstock(
+                    stock_item=instance, auto_id=get_auto_id(Openingstock)
+                )
             for attr, value in opening_stock_data.items():
                 setattr(opening_stock, attr, value)
-            opening_stock.auto_id = self._generate_auto_id_for_opening_stock()
             opening_stock.save()
 
         return instance
 
-    def _generate_auto_id_for_alternate_units(self):
-        last_auto_id = AlternateUnits.objects.aggregate(max_id=models.Max("auto_id"))[
-            "max_id"
-        ]
-        return (last_auto_id or 0) + 1
-
-    def _generate_auto_id_for_opening_stock(self):
-        last_auto_id = Openingstock.objects.aggregate(max_id=models.Max("auto_id"))[
-            "max_id"
-        ]
-        return (last_auto_id or 0) + 1
-
     # def _save_stock_item_history(self, instance):
     #     StockItemHistory.objects.create(
     #         item=instance,
@@ -1172,7 +1180,7 @@ class SingleViewListViewProductSerializer(BaseModelSerializer):
         ]
 
 
-class SingleViewStockItemSerializer(BaseModelSerializer):
+class SingleViewStockItemSerializer(SparseFieldsSerializerMixin, BaseModelSerializer):
     stock_category_name = serializers.CharField(
         source="stock_category.name", read_only=True
     )
@@ -1189,6 +1197,24 @@ class SingleViewStockItemSerializer(BaseModelSerializer):
     alternative_units = serializers.SerializerMethodField()
     opening_balance = serializers.SerializerMethodField()
 
+    field_requirements = {
+        "alternative_units": {
+            "prefetch_related": [
+                Prefetch(
+                    "alternative_units",
+                    queryset=AlternateUnits.objects.select_related(
+                        "unit_value", "related_unit"
+                    ),
+                )
+            ]
+        },
+        "opening_balance": {
+            "prefetch_related": [
+                Prefetch("opening_balances", queryset=Openingstock.objects.order_by("pk"))
+            ]
+        },
+    }
+
     class Meta:
         model = StockItem
         fields = [
@@ -1265,7 +1291,8 @@ class SingleViewStockItemSerializer(BaseModelSerializer):
         ]
 
     def get_opening_balance(self, obj):
-        opening_balance = obj.opening_balances.first()
+        # all() rather than first(), which would bypass a prefetch.
+        opening_balance = next(iter(obj.opening_balances.all()), None)
         if opening_balance:
             return {
                 "quantity": opening_balance.quantity,
@@ -1339,7 +1366,7 @@ class SingleViewStockItemSerializer(BaseModelSerializer):
 #         ]
 
 
-class ListViewIteamSerializer(BaseModelSerializer):
+class ListViewIteamSerializer(SparseFieldsSerializerMixin, BaseModelSerializer):
     class Meta:
         model = StockItem
         fields = "__all__"
@@ -1381,6 +1408,10 @@ class GodownNameSerializer(BaseModelSerializer):
         ]
 
 
+class GodownNameValues(ValuesSerializer):
+    serializer_class = GodownNameSerializer
+
+
 class StockClassificationNameSerializer(BaseModelSerializer):
     class Meta:
         model = StockClassification
@@ -1431,9 +1462,11 @@ class KitchenSerializer(BaseModelSerializer):
         ]
 
 
-class BaseStockItemSerializer(BaseModelSerializer):
+class BaseStockItemSerializer(SparseFieldsSerializerMixin, BaseModelSerializer):
     tax_amount = serializers.SerializerMethodField()
 
+    field_requirements = {"tax_amount": {"select_related": ["tax"]}}
+
     class Meta:
         model = StockItem
         fields = ["id", "name", "tax", "tax_amount"]
@@ -1445,13 +1478,47 @@ class BaseStockItemSerializer(BaseModelSerializer):
         return 0
 
 
-class StockJurnalItemReportSerializer(BaseModelSerializer):
+class StockQuantityListSerializer(serializers.ListSerializer):
+    """
+    Loads the stock of all the items being serialized in one query and
+    hands it to them as ``context["quantities"]``. Only the stock of
+    ``context["organization"]`` is read; ``context["godown"]`` narrows it to
+    one godown.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        self._context = {
+            **self._context,
+            "quantities": stock_quantities(
+                self._context.get("organization"),
+                [item.pk for item in items],
+                self._context.get("godown"),
+            ),
+        }
+        return super().to_representation(items)
+
+
+class StockQuantityMixin:
+    """``quantity`` of a stock item serializer; see StockQuantityListSerializer."""
+
+    def get_quantity(self, obj):
+        quantities = self.context.get("quantities")
+        if quantities is None:
+            quantities = stock_quantities(
+                self.context.get("organization"), [obj.pk], self.context.get("godown")
+            )
+        return quantities.get(obj.pk, 0.0)
+
+
+class StockJurnalItemReportSerializer(StockQuantityMixin, BaseModelSerializer):
     unit_name = serializers.CharField(source="unit.name", read_only=True)
     tax_amount = serializers.CharField(source="tax.tax", read_only=True)
     quantity = serializers.SerializerMethodField()
 
     class Meta:
         model = StockItem
+        list_serializer_class = StockQuantityListSerializer
         fields = [
             "id",
             "name",
@@ -1466,12 +1533,6 @@ class StockJurnalItemReportSerializer(BaseModelSerializer):
             "quantity",
         ]
 
-    def get_quantity(self, obj):
-        stock_report = StockReport.objects.filter(item=obj).first()
-        if stock_report:
-            return stock_report.closing_balance
-        return 0.0
-
 
 class StockItemSalesListSerializer(BaseStockItemSerializer):
     class Meta(BaseStockItemSerializer.Meta):
@@ -1489,6 +1550,14 @@ class KitchenNameSerializer(BaseModelSerializer):
         fields = ["id", "name"]
 
 
+def unit_conversion(graph, unit_value_id):
+    """Base units in one ``unit_value`` of an alternate unit, if it converts."""
+    try:
+        return float(graph.factor(unit_value_id)) if unit_value_id else None
+    except ConversionError:
+        return None
+
+
 class UnitDetailedStockItemSerializer(BaseModelSerializer):
     stock_category_name = serializers.CharField(
         source="stock_category.name", read_only=True
@@ -1553,6 +1622,7 @@ class UnitDetailedStockItemSerializer(BaseModelSerializer):
 
     def get_alternative_units(self, obj):
         alt_units = obj.alternative_units.all()
+        graph = ConversionGraph.for_item(obj)
         return [
             {
                 "organization_id": unit.organization_id,
@@ -1568,6 +1638,7 @@ class UnitDetailedStockItemSerializer(BaseModelSerializer):
                 "cost_price": unit.cost_price,
                 "selling_price": unit.selling_price,
                 "barcode": unit.barcode,
+                "conversion": unit_conversion(graph, unit.unit_value_id),
             }
             for unit in alt_units
         ]
@@ -1591,6 +1662,94 @@ class UnitDetailedStockItemSerializer(BaseModelSerializer):
         return [{"id": unit.id, "name": unit.name} for unit in obj.unit.items.all()]
 
 
+class UnitDetailedStockItemValues(ValuesSerializer):
+    """UnitDetailedStockItemSerializer's output, in three queries."""
+
+    serializer_class = UnitDetailedStockItemSerializer
+
+    def load_alternative_units(self, rows):
+        units = defaultdict(list)
+        links = (
+            StockItem.alternative_units.through.objects.filter(
+                stockitem__in=self.queryset.values("pk")
+            )
+            # The order the through table's (item, unit) index gives .all().
+            .order_by("stockitem_id", "alternateunits_id")
+            .values_list(
+                "stockitem_id",
+                "alternateunits__organization_id",
+                "alternateunits_id",
+                "alternateunits__alternative_unit",
+                "alternateunits__unit_value_id",
+                "alternateunits__unit_value__name",
+                "alternateunits__related_unit_id",
+                "alternateunits__related_unit__name",
+                "alternateunits__related_unit_values",
+                "alternateunits__cost_price",
+                "alternateunits__selling_price",
+                "alternateunits__barcode",
+            )
+        )
+        for item_id, *unit in links:
+            units[item_id].append(unit)
+
+        def alternative_units(row):
+            item_units = units.get(row["id"], [])
+            graph = ConversionGraph.build(
+                row["unit"], ((unit[3], unit[5], unit[7]) for unit in item_units)
+            )
+            return [
+                {
+                    "organization_id": organization_id,
+                    "unit_id": unit_id,
+                    "alternative_unit_name": alternative_unit,
+                    "unit_value_id": unit_value_id,
+                    "unit_value_name": unit_value_name,
+                    "related_unit_id": related_unit_id,
+                    "related_unit_name": related_unit_name,
+                    "related_unit_values": related_unit_values,
+                    "cost_price": cost_price,
+                    "selling_price": selling_price,
+                    "barcode": barcode,
+                    "conversion": unit_conversion(graph, unit_value_id),
+                }
+                for (
+                    organization_id,
+                    unit_id,
+                    alternative_unit,
+                    unit_value_id,
+                    unit_value_name,
+                    related_unit_id,
+                    related_unit_name,
+                    related_unit_values,
+                    cost_price,
+                    selling_price,
+                    barcode,
+                ) in item_units
+            ]
+
+        return alternative_units
+
+    def load_opening_balance(self, rows):
+        balances = {}
+        openings = (
+            Openingstock.objects.filter(stock_item__in=self.queryset.values("pk"))
+            .order_by("pk")
+            .values_list("stock_item_id", "quantity", "rate", "amount")
+        )
+        for item_id, quantity, rate, amount in openings:
+            # first(), as the serializer reads it.
+            balances.setdefault(
+                item_id, {"quantity": quantity, "rate": rate, "amount": amount}
+            )
+        return lambda row: balances.get(row["id"])
+
+    def load_unit_ids(self, rows):
+        # MeasurementUnit has no ``items`` relation, so the serializer's
+        # unit_ids is always empty.
+        return lambda row: []
+
+
 # class UnitAlternativeUnitSerializer(BaseModelSerializer):
 #     class Meta:
 #         model = AlternateUnits
@@ -1647,7 +1806,7 @@ class UnitAlternateUnitsUnitSerializer(BaseModelSerializer):
         ]
 
 
-class StockItemUnitsListSerializer(BaseModelSerializer):
+class StockItemUnitsListSerializer(StockQuantityMixin, BaseModelSerializer):
     unit_name = serializers.CharField(source="unit.name", read_only=True)
     tax_amount = serializers.CharField(source="tax.tax", read_only=True)
     unit_details = serializers.SerializerMethodField()
@@ -1655,6 +1814,7 @@ class StockItemUnitsListSerializer(BaseModelSerializer):
 
     class Meta:
         model = StockItem
+        list_serializer_class = StockQuantityListSerializer
         fields = [
             "id",
             "name",
@@ -1671,12 +1831,14 @@ class StockItemUnitsListSerializer(BaseModelSerializer):
 
     def get_unit_details(self, obj):
         alternative_units = obj.alternative_units.all()
+        graph = ConversionGraph.for_item(obj)
         alternative_units_data = [
             {
                 "unit_id": unit.id,
                 "unit_name": unit.alternative_unit,
                 "selling_price": unit.selling_price,
                 "cost_price": unit.cost_price,
+                "conversion": unit_conversion(graph, unit.unit_value_id),
                 "main_unit": False,
             }
             for unit in alternative_units
@@ -1687,16 +1849,12 @@ class StockItemUnitsListSerializer(BaseModelSerializer):
             "standard_rate": float(obj.standard_rate) if obj.standard_rate else None,
             "selling_price": float(obj.selling_price) if obj.selling_price else None,
             "cost_price": float(obj.cost_price) if obj.cost_price else None,
+            "conversion": 1.0 if obj.unit_id else None,
             "main_unit": True,
         }
         alternative_units_data.append(main_unit)
         return {"alternative_units": alternative_units_data}
 
-    def get_quantity(self, obj):
-        stock_report = StockReport.objects.filter(item=obj).first()
-        if stock_report:
-            return stock_report.closing_balance
-        return 0.0
 
 # class StockItemUnitsListSerializer(BaseModelSerializer):
 #     unit_id = serializers.PrimaryKeyRelatedField(source="unit", read_only=True)
@@ -1754,11 +1912,17 @@ class BrandNameList(BaseModelSerializer):
         ]
 
 
-class SalesPurchaseItemSerializer(BaseModelSerializer):
+class SalesPurchaseItemSerializer(
+    SparseFieldsSerializerMixin, StockQuantityMixin, BaseModelSerializer
+):
     quantity = serializers.SerializerMethodField()
 
+    # Read from StockQuantityListSerializer's query, not the item's row.
+    field_requirements = {"quantity": {}}
+
     class Meta:
         model = StockItem
+        list_serializer_class = StockQuantityListSerializer
         fields = [
             "id",
             # "organization_id",
@@ -1766,8 +1930,85 @@ class SalesPurchaseItemSerializer(BaseModelSerializer):
             "quantity",
         ]
 
-    def get_quantity(self, obj):
-        stock_report = StockReport.objects.filter(item=obj).first()
-        if stock_report:
-            return stock_report.closing_balance
-        return 0.0
+
+class PriceRuleSerializer(serializers.Serializer):
+    field = serializers.ChoiceField(choices=list(PRICE_FIELDS))
+    method = serializers.ChoiceField(choices=PRICE_METHODS)
+    value = serializers.DecimalField(max_digits=14, decimal_places=4)
+    stock_group = serializers.UUIDField(required=False)
+    stock_category = serializers.UUIDField(required=False)
+    brand = serializers.UUIDField(required=False)
+    items = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False
+    )
+    alternate_units = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if attrs["method"] == "fixed" and attrs["value"] < 0:
+            raise serializers.ValidationError({"value": "A price cannot be negative."})
+        if attrs["method"] == "percentage" and attrs["value"] <= -100:
+            raise serializers.ValidationError(
+                {"value": "A percentage must be above -100."}
+            )
+        return attrs
+
+
+class ExplicitPriceSerializer(serializers.Serializer):
+    item = serializers.UUIDField(required=False)
+    alternate_unit = serializers.UUIDField(required=False)
+    selling_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    cost_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    standard_rate = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+
+    def validate(self, attrs):
+        if bool(attrs.get("item")) == bool(attrs.get("alternate_unit")):
+            raise serializers.ValidationError(
+                "Give either an item or an alternate unit."
+            )
+        fields = PRICE_FIELDS if attrs.get("item") else ALTERNATE_UNIT_PRICE_FIELDS
+        unknown = [field for field in PRICE_FIELDS if field in attrs and field not in fields]
+        if unknown:
+            raise serializers.ValidationError(
+                {field: "Alternate units have no such price." for field in unknown}
+            )
+        if not any(field in attrs for field in fields):
+            raise serializers.ValidationError("Give at least one price.")
+        return attrs
+
+
+class BulkPriceUpdateSerializer(serializers.Serializer):
+    effective_date = serializers.DateField(required=False)
+    rules = PriceRuleSerializer(many=True, required=False)
+    prices = ExplicitPriceSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("rules") and not attrs.get("prices"):
+            raise serializers.ValidationError("Give at least one rule or price.")
+        return attrs
+
+
+class QuantityConversionSerializer(serializers.Serializer):
+    item = serializers.UUIDField()
+    quantity = serializers.DecimalField(max_digits=18, decimal_places=6)
+    from_unit = serializers.UUIDField(required=False, allow_null=True)
+    to_unit = serializers.UUIDField(required=False, allow_null=True)
+
+
+class ConvertQuantitiesSerializer(serializers.Serializer):
+    conversions = QuantityConversionSerializer(many=True, allow_empty=False)
+
+
+class StockInUnitSerializer(serializers.Serializer):
+    item = serializers.UUIDField()
+    unit = serializers.UUIDField(required=False, allow_null=True)
+
+
+class StockInUnitsSerializer(serializers.Serializer):
+    items = StockInUnitSerializer(many=True, allow_empty=False)
+    godown = serializers.UUIDField(required=False, allow_null=True)
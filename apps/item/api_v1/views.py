@@ -3,11 +3,19 @@ from rest_framework import viewsets, status, pagination
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import SearchFilter
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from django.conf import settings
+from django.http import Http404
 from apps.main.viewsets import BaseModelViewSet
+from apps.main.conditional import conditional_by_organization
+from apps.main.exports import EXPORT_FORMATS, ExportError, export_response
+from apps.main.fieldsets import SPARSE_FIELD_PARAMETERS, SparseFieldsMixin
+from apps.main.functions import get_auto_id
+from apps.main.pagination import KeysetPagination
 from rest_framework import serializers
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import PageNumberPagination
@@ -15,7 +23,8 @@ from barcode import Code128
 from barcode.writer import SVGWriter
 from io import BytesIO
 from django.core.files.base import ContentFile
-from django.db.models import Max
+from django.db.models import Max, Prefetch, Value
+from django.db.models.functions import Coalesce
 
 # from rest_framework.response import Response
 import base64
@@ -45,6 +54,12 @@ from apps.item.models import (
 )
 
 from apps.item.api_v1.serializers import (
+    BulkPriceUpdateSerializer,
+    GodownNameValues,
+    RackNameListValues,
+    UnitDetailedStockItemValues,
+    ConvertQuantitiesSerializer,
+    StockInUnitsSerializer,
     BrandSerializer,
     UQCSerializer,
     HsnSacSerializer,
@@ -88,19 +103,106 @@ from apps.item.api_v1.serializers import (
     StockCategoryListSerializer,
     SalesPurchaseItemSerializer,
 )
-
-
-class StockItemViewSet(BaseModelViewSet):
+from apps.inventory.models import Openingstock
+from apps.inventory.functions import stock_quantities
+from apps.item.autocomplete import AUTOCOMPLETE_SOURCES, autocomplete
+from apps.item.imports import ImportFileError, import_stock_items, read_rows
+from apps.item.lookup import lookup_barcode
+from apps.item.pricing import revise_prices
+from apps.item.search import search_stock_items
+from apps.item.trees import cached_tree
+from apps.item.units import ConversionError, conversion_graphs, round_quantity
+
+
+class StockItemViewSet(SparseFieldsMixin, BaseModelViewSet):
     queryset = StockItem.objects.all()
     # serializer_class = ItemSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["name", "item_code"]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("sort_name", "id")
+    # List filters matching the given node and everything below it.
+    subtree_filters = {
+        "stock_group": StockGroup,
+        "stock_category": StockCategory,
+        "brand": Brand,
+    }
+    # column -> (header, lookup); the headers are the ones the import reads.
+    export_columns = {
+        "id": ("Id", "id"),
+        "name": ("Name", "name"),
+        "alias": ("Alias", "alias"),
+        "item_code": ("Item Code", "item_code"),
+        "barcode": ("Barcode", "barcode"),
+        "item_type": ("Item Type", "item_type"),
+        "stock_group": ("Stock Group", "stock_group__name"),
+        "stock_category": ("Stock Category", "stock_category__name"),
+        "brand": ("Brand", "brand__name"),
+        "unit": ("Unit", "unit__name"),
+        "godown": ("Godown", "godown__name"),
+        "hsn_sac": ("HSN SAC", "hsn_sac__hsnsac_code"),
+        "tax": ("Tax", "tax__tax"),
+        "gst_applicable": ("GST Applicable", "gst_applicable"),
+        "standard_rate": ("Standard Rate", "standard_rate"),
+        "selling_price": ("Selling Price", "selling_price"),
+        "cost_price": ("Cost Price", "cost_price"),
+        "min_order_quantity": ("Min Order Quantity", "min_order_quantity"),
+        "reorder_level": ("Reorder Level", "reorder_level"),
+        "description": ("Description", "description"),
+    }
+    # ?projection= field sets of the item grid and the POS screens.
+    field_projections = {
+        "grid": ["id", "name", "item_code", "unit", "selling_price", "cost_price"],
+        "pos": ["id", "name", "barcode", "unit", "tax", "selling_price", "standard_rate"],
+    }
 
     def get_queryset(self):
         queryset = StockItem.objects.all()
         organization = self.request.user.fk_organization
-        return queryset.filter(organization_id=organization)
+        queryset = queryset.filter(organization_id=organization)
+        if self.action in ("list", "export"):
+            for lookup, model in self.subtree_filters.items():
+                node_id = self.request.query_params.get(lookup)
+                if not node_id:
+                    continue
+                try:
+                    node_id = uuid.UUID(node_id)
+                except ValueError:
+                    raise ValidationError({lookup: ["Must be a valid UUID."]})
+                queryset = queryset.filter(model.subtree_q(lookup, node_id))
+        if self.action in ("list", "search"):
+            # ListViewIteamSerializer only reads the alternative unit ids.
+            queryset = queryset.annotate(
+                sort_name=Coalesce("name", Value(""))
+            ).prefetch_related("alternative_units")
+            if self.action == "list":
+                queryset = self.sparse_queryset(queryset, ListViewIteamSerializer)
+            return queryset
+        if self.action == "retrieve":
+            # Everything SingleViewStockItemSerializer reads, in three queries.
+            queryset = queryset.select_related(
+                "stock_category",
+                "stock_group",
+                "brand",
+                "unit",
+                "stock_nature",
+                "hsn_sac",
+                "tax",
+                "kitchen",
+            ).prefetch_related(
+                Prefetch(
+                    "alternative_units",
+                    queryset=AlternateUnits.objects.select_related(
+                        "unit_value", "related_unit"
+                    ),
+                ),
+                Prefetch(
+                    "opening_balances", queryset=Openingstock.objects.order_by("pk")
+                ),
+            )
+            return self.sparse_queryset(queryset, SingleViewStockItemSerializer)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -167,23 +269,47 @@ class StockItemViewSet(BaseModelViewSet):
             )
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of items.",
+        operation_description=(
+            "Retrieve a page of items, ordered by name. The stock group, "
+            "category and brand filters include their descendants."
+        ),
+        manual_parameters=[
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter("stock_group", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("stock_category", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("brand", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            *SPARSE_FIELD_PARAMETERS,
+        ],
         responses={200: ListViewIteamSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
         try:
-            queryset = self.filter_queryset(
-                StockItem.objects.filter(organization_id=request.user.fk_organization)
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            serializer = ListViewIteamSerializer(
+                page,
+                many=True,
+                context={"fields": self.get_sparse_fields(ListViewIteamSerializer)},
             )
-            serializer = ListViewIteamSerializer(queryset, many=True)
             return Response(
                 {
                     "StatusCode": 6000,
                     "message": "Items retrieved successfully.",
+                    "next": self.paginator.get_next_link(),
+                    "next_cursor": self.paginator.next_cursor,
                     "data": serializer.data,
                 },
                 status=status.HTTP_200_OK,
             )
+        except ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {
@@ -193,6 +319,223 @@ class StockItemViewSet(BaseModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="search")
+    @swagger_auto_schema(
+        operation_description=(
+            "Search items by name, alias, item code, barcode or secondary "
+            "language name, best match first. Tolerates typos."
+        ),
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: ListViewIteamSerializer(many=True)},
+    )
+    def search(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+        except ValueError:
+            limit = 0
+        if not query or limit <= 0:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": "q and a positive limit are required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            item_ids = search_stock_items(request.user.fk_organization, query, limit)
+            items = self.get_queryset().in_bulk(item_ids)
+            serializer = ListViewIteamSerializer(
+                [items[item_id] for item_id in item_ids if item_id in items],
+                many=True,
+            )
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": "Items retrieved successfully.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error searching items: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    @swagger_auto_schema(
+        operation_description=(
+            "Import items from a CSV or XLSX sheet whose first row names the "
+            "columns. Brands, groups, categories, units, HSN/SAC codes, taxes, "
+            "godowns, kitchens and stock natures are given by name; with "
+            "`create_missing` unknown names are created instead of rejecting "
+            "the row. Returns the number of items created and the errors per "
+            "row. Very large files are better loaded with the "
+            "`import_stock_items` management command."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file", openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter("create_missing", openapi.IN_FORM, type=openapi.TYPE_BOOLEAN),
+        ],
+    )
+    def import_items(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": "A CSV or XLSX file is required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            report = import_stock_items(
+                read_rows(upload, upload.name),
+                request.user.fk_organization,
+                creator=request.user.id,
+                create_missing=str(request.data.get("create_missing", "")).lower()
+                in ("1", "true", "yes"),
+            )
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": f"{report['created']} items imported.",
+                    "data": report,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except ImportFileError as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error importing items: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="export")
+    @swagger_auto_schema(
+        operation_description=(
+            "Download the items as a CSV or XLSX sheet the import accepts back. "
+            "`columns` is a comma separated subset of: "
+            f"{', '.join(export_columns)}. Takes the filters of the list."
+        ),
+        manual_parameters=[
+            openapi.Parameter("file_format", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[*EXPORT_FORMATS], default="csv"),
+            openapi.Parameter("columns", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("search", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("stock_group", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("stock_category", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+            openapi.Parameter("brand", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+        ],
+    )
+    def export(self, request, *args, **kwargs):
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).order_by("name", "id")
+            return export_response(
+                queryset,
+                self.export_columns,
+                "stock-items",
+                file_format=request.query_params.get("file_format"),
+                requested=request.query_params.get("columns"),
+            )
+        except ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ExportError as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error exporting items: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["post"], url_path="bulk-price-update")
+    @swagger_auto_schema(
+        operation_description=(
+            "Reprice many items at once. Each rule changes one price by a "
+            "`percentage`, by an `amount` or to a `fixed` price for the items "
+            "of a stock group, stock category or brand (subtrees included) "
+            "and/or listed `items`; alternate unit prices follow unless "
+            "`alternate_units` is false, amounts scaled by their conversion. "
+            "`prices` sets explicit prices per item or alternate unit. "
+            "`effective_date` (default today) becomes the applicable date of "
+            "the changed prices."
+        ),
+        request_body=BulkPriceUpdateSerializer,
+    )
+    def bulk_price_update(self, request, *args, **kwargs):
+        serializer = BulkPriceUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            summary = revise_prices(
+                request.user.fk_organization,
+                rules=serializer.validated_data.get("rules", []),
+                prices=serializer.validated_data.get("prices", []),
+                effective_date=serializer.validated_data.get("effective_date"),
+                updated_by=request.user.id,
+            )
+            return Response(
+                {
+                    "StatusCode": 6000,
+                    "message": f"{summary['items_updated']} item prices updated.",
+                    "data": summary,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": f"Error updating prices: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
     @swagger_auto_schema(
         operation_description="Update a specific item by ID.",
         responses={200: UpdateStockItemSerializer},
@@ -234,14 +577,18 @@ class StockItemViewSet(BaseModelViewSet):
 
     @swagger_auto_schema(
         operation_description="Retrieve a specific item by ID.",
+        manual_parameters=SPARSE_FIELD_PARAMETERS,
         responses={200: SingleViewStockItemSerializer},
     )
     def retrieve(self, request, *args, **kwargs):
         try:
-            instance = StockItem.objects.get(id=kwargs["pk"])
-            # instance = self.get_object()
-            instance = StockItem.objects.get(id=kwargs["pk"])
-            serializer = SingleViewStockItemSerializer(instance)
+            instance = self.get_object()
+            serializer = SingleViewStockItemSerializer(
+                instance,
+                context={
+                    "fields": self.get_sparse_fields(SingleViewStockItemSerializer)
+                },
+            )
             return Response(
                 {
                     "StatusCode": 6000,
@@ -250,6 +597,16 @@ class StockItemViewSet(BaseModelViewSet):
                 },
                 status=status.HTTP_200_OK,
             )
+        except (Http404, NotFound):
+            raise
+        except ValidationError as ve:
+            return Response(
+                {
+                    "StatusCode": 6001,
+                    "error": ve.detail,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             print(e)
             return Response(
@@ -286,10 +643,6 @@ class StockItemViewSet(BaseModelViewSet):
 
 
 class CreatePrimaryEntitiesView(APIView):
-    def get_next_auto_id(self, model):
-        max_auto_id = model.objects.aggregate(Max("auto_id"))["auto_id__max"] or 0
-        return max_auto_id + 1
-
     def post(self, request, *args, **kwargs):
         organization_id = request.data.get("organization_id")
 
@@ -312,7 +665,7 @@ class CreatePrimaryEntitiesView(APIView):
                     "name": "Primary Stock Category",
                     "alias": "primary_stock_category",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(StockCategory),
+                    "auto_id": get_auto_id(StockCategory),
                 },
             )
             response_data["stock_category"] = {
@@ -327,7 +680,7 @@ class CreatePrimaryEntitiesView(APIView):
                     "name": "Primary Stock Group",
                     "alias": "primary_stock_group",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(StockGroup),
+                    "auto_id": get_auto_id(StockGroup),
                 },
             )
             response_data["stock_group"] = {
@@ -342,7 +695,7 @@ class CreatePrimaryEntitiesView(APIView):
                     "name": "Primary Measurement Unit",
                     "unit_type": "simple",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(MeasurementUnit),
+                    "auto_id": get_auto_id(MeasurementUnit),
                 },
             )
             response_data["measurement_unit"] = {
@@ -356,7 +709,7 @@ class CreatePrimaryEntitiesView(APIView):
                 defaults={
                     "name": "Primary Godown",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(Godown),
+                    "auto_id": get_auto_id(Godown),
                 },
             )
             response_data["godown"] = {
@@ -370,7 +723,7 @@ class CreatePrimaryEntitiesView(APIView):
                 defaults={
                     "name": "Primary Rack",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(Rack),
+                    "auto_id": get_auto_id(Rack),
                 },
             )
             response_data["rack"] = {
@@ -384,7 +737,7 @@ class CreatePrimaryEntitiesView(APIView):
                 defaults={
                     "name": "Primary Stock Classification",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(StockClassification),
+                    "auto_id": get_auto_id(StockClassification),
                 },
             )
             response_data["stock_classification"] = {
@@ -399,7 +752,7 @@ class CreatePrimaryEntitiesView(APIView):
                     "name": "Primary Stock Nature",
                     "category": stock_classification,
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(Product),
+                    "auto_id": get_auto_id(Product),
                 },
             )
             response_data["product"] = {
@@ -413,7 +766,7 @@ class CreatePrimaryEntitiesView(APIView):
                 defaults={
                     "name": "Primary Brand",
                     "is_active": True,
-                    "auto_id": self.get_next_auto_id(Brand),
+                    "auto_id": get_auto_id(Brand),
                 },
             )
             response_data["brand"] = {
@@ -449,6 +802,7 @@ class CustomPagination(pagination.PageNumberPagination):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(StockItem)
 def stock_item_name_list(request):
     organization = request.user.fk_organization
     queryset = StockItem.objects.filter(organization_id=organization)
@@ -1102,13 +1456,17 @@ class StockGroupViewSet(BaseModelViewSet):
     @action(detail=False, methods=["get"], url_path="tree")
     def tree(self, request, *args, **kwargs):
         try:
-            queryset = self.get_queryset().filter(parent_group__isnull=True)
-            serializer = StockGroupTreeSerializer(queryset, many=True)
+            tree = cached_tree(
+                request.user.fk_organization,
+                self.get_queryset(),
+                "parent_group",
+                StockGroupTreeSerializer,
+            )
             return Response(
                 {
                     "StatusCode": 6000,
                     "message": "Stock groups retrieved successfully in tree structure.",
-                    "data": serializer.data,
+                    "data": tree,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -1173,6 +1531,7 @@ class StockGroupViewSet(BaseModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(StockGroup)
 def stock_group_name_list(request):
     organization = request.user.fk_organization
     queryset = StockGroup.objects.filter(organization_id=organization)
@@ -1183,6 +1542,7 @@ def stock_group_name_list(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Product)
 def stock_nature_name_list(request):
     organization = request.user.fk_organization
     queryset = Product.objects.filter(organization_id=organization)
@@ -1193,6 +1553,7 @@ def stock_nature_name_list(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Brand)
 def brand_name_list(request):
     organization = request.user.fk_organization
     queryset = Brand.objects.filter(organization_id=organization)
@@ -1202,6 +1563,7 @@ def brand_name_list(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Kitchen)
 def kitchen_name_list(request):
     organization = request.user.fk_organization
     queryset = Kitchen.objects.filter(organization_id=organization)
@@ -1354,6 +1716,7 @@ class TaxViewSet(BaseModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(StockClassification)
 def stock_classification_name_list(request):
     organization = request.user.fk_organization
     queryset = StockClassification.objects.filter(organization_id=organization)
@@ -1768,14 +2131,18 @@ class StockCategoryViewSet(BaseModelViewSet):
     @action(detail=False, methods=["get"], url_path="tree")
     def tree(self, request, *args, **kwargs):
         try:
-            # Get top-level categories
-            queryset = self.get_queryset().filter(parent_category__isnull=True)
-            serializer = StockCategoryTreeSerializer(queryset, many=True)
+            # The whole hierarchy in one query, linked in memory.
+            tree = cached_tree(
+                request.user.fk_organization,
+                self.get_queryset(),
+                "parent_category",
+                StockCategoryTreeSerializer,
+            )
             return Response(
                 {
                     "StatusCode": 6000,
                     "message": "Stock categories retrieved successfully in tree structure.",
-                    "data": serializer.data,
+                    "data": tree,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -1837,6 +2204,7 @@ class StockCategoryViewSet(BaseModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(StockCategory)
 def stock_category_name_list(request):
     queryset = StockCategory.objects.filter(
         organization_id=request.user.fk_organization
@@ -2135,11 +2503,11 @@ class GodownViewSet(BaseModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Godown)
 def godown_name_list(request):
     queryset = Godown.objects.filter(organization_id=request.user.fk_organization)
     # queryset = Godown.objects.all()
-    serializer = GodownNameSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return Response(GodownNameValues(queryset).data)
 
 
 class RackViewSet(BaseModelViewSet):
@@ -2225,13 +2593,17 @@ class RackViewSet(BaseModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="tree")
     def tree(self, request):
-        queryset = self.get_queryset().filter(parent_rack__isnull=True)
-        serializer = self.get_serializer(queryset, many=True)
+        tree = cached_tree(
+            request.user.fk_organization,
+            self.get_queryset(),
+            "parent_rack",
+            RackTreeSerializer,
+        )
         return Response(
             {
                 "StatusCode": 6000,
                 "message": "Racks retrieved in tree structure.",
-                "data": serializer.data,
+                "data": tree,
             },
             status=status.HTTP_200_OK,
         )
@@ -2239,11 +2611,11 @@ class RackViewSet(BaseModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Rack)
 def rack_name_list(request):
     queryset = Rack.objects.filter(organization_id=request.user.fk_organization)
     # queryset = Rack.objects.all()
-    serializer = RackNameListSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return Response(RackNameListValues(queryset).data)
 
 
 class AlternateUnitsViewSet(BaseModelViewSet):
@@ -2695,31 +3067,43 @@ class KitchenModelViewset(BaseModelViewSet):
             )
 
 
-class StockItemSalesListView(ListAPIView):
+class StockItemSalesListView(SparseFieldsMixin, ListAPIView):
     serializer_class = StockItemSalesListSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["name"]
     pagination_class = CustomPagination
 
+    @swagger_auto_schema(manual_parameters=SPARSE_FIELD_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return StockItem.objects.filter(
-            organization_id=self.request.user.fk_organization
+        return self.sparse_queryset(
+            StockItem.objects.filter(
+                organization_id=self.request.user.fk_organization
+            ).select_related("tax")
         )
 
         # return StockItem.objects.all()
 
 
-class StockItemPurchaseListView(ListAPIView):
+class StockItemPurchaseListView(SparseFieldsMixin, ListAPIView):
     serializer_class = StockItemPurchaseListSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["name"]
     pagination_class = CustomPagination
 
+    @swagger_auto_schema(manual_parameters=SPARSE_FIELD_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return StockItem.objects.filter(
-            organization_id=self.request.user.fk_organization
+        return self.sparse_queryset(
+            StockItem.objects.filter(
+                organization_id=self.request.user.fk_organization
+            ).select_related("tax")
         )
 
 
@@ -2728,8 +3112,7 @@ class StockItemPurchaseListView(ListAPIView):
 def unit_detailed_stockitem_list(request):
     queryset = StockItem.objects.filter(organization_id=request.user.fk_organization)
     # queryset = StockItem.objects.all()
-    serializer = UnitDetailedStockItemSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return Response(UnitDetailedStockItemValues(queryset).data)
 
 
 @api_view(["POST"])
@@ -2825,16 +3208,278 @@ def godown_stock_items(request):
             {"error": "godown ID is required."}, status=status.HTTP_400_BAD_REQUEST
         )
     try:
-        stocks = StockItem.objects.filter(godown=godown_id)
-        serializer = StockJurnalItemReportSerializer(stocks, many=True)
+        stocks = StockItem.objects.filter(godown=godown_id).select_related(
+            "unit", "tax"
+        )
+        # The quantity shown is the one held in this godown.
+        serializer = StockJurnalItemReportSerializer(
+            stocks,
+            many=True,
+            context={
+                "organization": request.user.fk_organization,
+                "godown": godown_id,
+            },
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class StockItemUnitsListView(ListAPIView):
+@swagger_auto_schema(
+    method="get",
+    operation_description=(
+        "Names starting with the query across items (name, code, alias) and "
+        "masters, best match first."
+    ),
+    manual_parameters=[
+        openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter(
+            "kinds",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description=f"Comma separated subset of: {', '.join(AUTOCOMPLETE_SOURCES)}.",
+        ),
+        openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+    ],
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def autocomplete_names(request):
+    query = request.query_params.get("q", "")
+    kinds = {kind for kind in request.query_params.get("kinds", "").split(",") if kind}
+    try:
+        limit = min(int(request.query_params.get("limit", 10)), 50)
+    except ValueError:
+        limit = 0
+    if not query.strip() or limit <= 0 or kinds - set(AUTOCOMPLETE_SOURCES):
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": (
+                    "q and a positive limit are required; kinds must be among: "
+                    f"{', '.join(AUTOCOMPLETE_SOURCES)}."
+                ),
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        matches = autocomplete(request.user.fk_organization, query, kinds, limit)
+        return Response(
+            {
+                "StatusCode": 6000,
+                "message": "Matches retrieved successfully.",
+                "data": matches,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": f"Error retrieving matches: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_description=(
+        "Resolve a scanned item or alternate unit barcode to the item, unit, "
+        "price, tax and current stock."
+    ),
+    manual_parameters=[
+        openapi.Parameter("godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"),
+    ],
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def barcode_lookup(request, code):
+    try:
+        entry = lookup_barcode(
+            request.user.fk_organization, code, request.query_params.get("godown")
+        )
+    except Exception as e:
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": f"Error looking up barcode: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    if entry is None:
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": "No item found for this barcode.",
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(
+        {
+            "StatusCode": 6000,
+            "message": "Item retrieved successfully.",
+            "data": entry,
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_description=(
+        "Convert quantities between the units of their items. A missing "
+        "`from_unit` or `to_unit` is the item's own unit. Rows that cannot be "
+        "converted carry an `error` instead of `converted`."
+    ),
+    request_body=ConvertQuantitiesSerializer,
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def convert_quantities(request):
+    serializer = ConvertQuantitiesSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        conversions = serializer.validated_data["conversions"]
+        graphs = conversion_graphs(
+            request.user.fk_organization, [row["item"] for row in conversions]
+        )
+        data = []
+        for row in conversions:
+            result = {
+                "item": row["item"],
+                "quantity": row["quantity"],
+                "from_unit": row.get("from_unit"),
+                "to_unit": row.get("to_unit"),
+            }
+            graph = graphs.get(str(row["item"]))
+            try:
+                if graph is None:
+                    raise ConversionError("Unknown item.")
+                result["converted"] = round_quantity(
+                    graph.convert(row["quantity"], row.get("from_unit"), row.get("to_unit"))
+                )
+            except ConversionError as e:
+                result["error"] = str(e)
+            data.append(result)
+        return Response(
+            {
+                "StatusCode": 6000,
+                "message": "Quantities converted successfully.",
+                "data": data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": f"Error converting quantities: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_description=(
+        "Stock of items in the unit asked for each, summed across godowns or "
+        "of `godown`. A missing `unit` is the item's own unit."
+    ),
+    request_body=StockInUnitsSerializer,
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def stock_in_units(request):
+    serializer = StockInUnitsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        rows = serializer.validated_data["items"]
+        item_ids = [row["item"] for row in rows]
+        graphs = conversion_graphs(request.user.fk_organization, item_ids)
+        quantities = stock_quantities(
+            request.user.fk_organization,
+            [item_id for item_id in item_ids if str(item_id) in graphs],
+            serializer.validated_data.get("godown"),
+        )
+        data = []
+        for row in rows:
+            result = {"item": row["item"], "unit": row.get("unit")}
+            graph = graphs.get(str(row["item"]))
+            try:
+                if graph is None:
+                    raise ConversionError("Unknown item.")
+                base_quantity = quantities.get(row["item"], 0)
+                result["base_quantity"] = base_quantity
+                result["quantity"] = round_quantity(
+                    graph.convert(base_quantity, None, row.get("unit"))
+                )
+            except ConversionError as e:
+                result["error"] = str(e)
+            data.append(result)
+        return Response(
+            {
+                "StatusCode": 6000,
+                "message": "Stock retrieved successfully.",
+                "data": data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "StatusCode": 6001,
+                "error": f"Error retrieving stock: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+class GodownQuantityMixin:
+    """
+    Item lists whose quantities are summed across godowns, or of the one
+    given as ``?godown=``.
+    """
+
+    godown_parameter = openapi.Parameter(
+        "godown", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="uuid"
+    )
+
+    @swagger_auto_schema(manual_parameters=[godown_parameter])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["organization"] = self.request.user.fk_organization
+        godown_id = self.request.query_params.get("godown")
+        if godown_id:
+            try:
+                context["godown"] = uuid.UUID(godown_id)
+            except ValueError:
+                raise ValidationError({"godown": ["Must be a valid UUID."]})
+        return context
+
+
+class StockItemUnitsListView(GodownQuantityMixin, ListAPIView):
     # queryset = StockItem.objects.prefetch_related("alternative_units", "unit").all()
-    queryset = StockItem.objects.all()
+    queryset = StockItem.objects.select_related("unit", "tax").prefetch_related(
+        "alternative_units"
+    )
     serializer_class = StockItemUnitsListSerializer
     # permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
@@ -2852,10 +3497,14 @@ class StockItemUnitsListView(ListAPIView):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_by_organization(Godown)
 def godown_location_wise_list_view(request, branch_id=None):
     try:
+        organization_godowns = Godown.objects.filter(
+            organization_id=request.user.fk_organization
+        )
         if branch_id:
-            godowns = Godown.objects.filter(branch=branch_id)
+            godowns = organization_godowns.filter(branch=branch_id)
 
             if not godowns.exists():
                 return Response(
@@ -2866,7 +3515,7 @@ def godown_location_wise_list_view(request, branch_id=None):
                     status=status.HTTP_404_NOT_FOUND,
                 )
         else:
-            godowns = Godown.objects.filter(is_primary_godown=True)
+            godowns = organization_godowns.filter(is_primary_godown=True)
 
             if not godowns.exists():
                 return Response(
@@ -2898,16 +3547,29 @@ def godown_location_wise_list_view(request, branch_id=None):
         )
 
 
-class SalesPurchaseStockItemsDetailedViews(ListAPIView):
+class SalesPurchaseStockItemsDetailedViews(
+    SparseFieldsMixin, GodownQuantityMixin, ListAPIView
+):
     serializer_class = SalesPurchaseItemSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ["name"]
     pagination_class = CustomPagination
 
+    @swagger_auto_schema(
+        manual_parameters=[
+            GodownQuantityMixin.godown_parameter,
+            *SPARSE_FIELD_PARAMETERS,
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return StockItem.objects.filter(
-            organization_id=self.request.user.fk_organization
+        return self.sparse_queryset(
+            StockItem.objects.filter(
+                organization_id=self.request.user.fk_organization
+            )
         )
 
 
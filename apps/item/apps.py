@@ -1,8 +1,32 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate, pre_migrate
 from django.utils.translation import gettext_lazy as _
 
 
+def _enable_trigram_extension(app_config, using, **kwargs):
+    # Before migrating, as the StockItem search index needs gin_trgm_ops.
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.operations import TrigramExtension
+
+    with connection.schema_editor() as schema_editor:
+        TrigramExtension().database_forwards(app_config.label, schema_editor, None, None)
+
+
+def _ensure_search_index(using, **kwargs):
+    from apps.item.search import ensure_search_index
+
+    ensure_search_index(using)
+
+
 class ItemConfig(AppConfig):
     name = "apps.item"
     verbose_name = _("item")
 
+    def ready(self):
+        import apps.item.signals  # noqa: F401
+
+        pre_migrate.connect(_enable_trigram_extension, sender=self)
+        post_migrate.connect(_ensure_search_index, sender=self)
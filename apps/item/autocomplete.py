@@ -0,0 +1,235 @@
+"""
+In-memory prefix autocomplete over item and master names.
+
+Each process keeps, per organization, a sorted list of lower-cased terms
+(every searchable field, and every tail of it starting at a word) which is
+searched with ``bisect``. Indexes are built on first use, patched in place
+after the writes made by this process, and rebuilt when another process
+bumped the organization's version in the shared cache. At most
+``MAX_ORGANIZATIONS`` indexes are held; the least recently used and those
+idle for ``IDLE_TIMEOUT`` seconds are dropped.
+"""
+import bisect
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+
+from apps.item.models import Brand, Godown, Kitchen, StockCategory, StockGroup, StockItem
+from apps.main.functions import bump_cache_version, get_cache_version
+
+
+AUTOCOMPLETE_SOURCES = {
+    "item": (StockItem, ("name", "item_code", "alias")),
+    "stock_group": (StockGroup, ("name", "alias")),
+    "stock_category": (StockCategory, ("name", "alias")),
+    "brand": (Brand, ("name",)),
+    "kitchen": (Kitchen, ("name",)),
+    "godown": (Godown, ("name",)),
+}
+AUTOCOMPLETE_MODELS = {model: kind for kind, (model, _) in AUTOCOMPLETE_SOURCES.items()}
+
+AUTOCOMPLETE_CACHE = "autocomplete"
+MAX_ORGANIZATIONS = 64
+IDLE_TIMEOUT = 30 * 60
+# How often an index compares its version with the shared cache.
+VERSION_CHECK_INTERVAL = 30
+# Backstop for changes missed between two checks.
+MAX_INDEX_AGE = 10 * 60
+# Whole-field terms are always kept; word tails only up to this many terms.
+MAX_TERMS_PER_ORGANIZATION = 500_000
+# Matching terms examined per query before ranking.
+MAX_SCAN = 200
+
+WHOLE_FIELD = 0
+WORD_TAIL = 1
+
+
+def _terms(values):
+    for value in values:
+        value = " ".join((value or "").casefold().split())
+        if not value:
+            continue
+        yield value, WHOLE_FIELD
+        words = value.split(" ")
+        for start in range(1, len(words)):
+            yield " ".join(words[start:]), WORD_TAIL
+
+
+def _label(values):
+    return next((value for value in values if value), "")
+
+
+class PrefixIndex:
+    def __init__(self, version):
+        self.version = version
+        self.built_at = self.checked_at = self.used_at = time.monotonic()
+        self.terms = []
+        # (rank, kind, id, label), in the order of ``terms``.
+        self.entries = []
+        # (kind, id) -> the terms indexed for that record.
+        self.records = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls, organization_id, version):
+        index = cls(version)
+        rows = []
+        for kind, (model, fields) in AUTOCOMPLETE_SOURCES.items():
+            records = (
+                model.objects.filter(organization_id=organization_id)
+                .values_list("pk", *fields)
+                .order_by()
+            )
+            for pk, *values in records.iterator():
+                entry_terms = list(_terms(values))
+                index.records[(kind, str(pk))] = [term for term, _ in entry_terms]
+                label = _label(values)
+                rows.extend(
+                    (term, (rank, kind, str(pk), label)) for term, rank in entry_terms
+                )
+        if len(rows) > MAX_TERMS_PER_ORGANIZATION:
+            rows.sort(key=lambda row: row[1][0])
+            rows = rows[:MAX_TERMS_PER_ORGANIZATION]
+        rows.sort(key=lambda row: row[0])
+        index.terms = [term for term, _ in rows]
+        index.entries = [entry for _, entry in rows]
+        return index
+
+    def add(self, kind, pk, values):
+        with self.lock:
+            self._remove(kind, pk)
+            label = _label(values)
+            indexed = []
+            for term, rank in _terms(values):
+                if rank == WORD_TAIL and len(self.terms) >= MAX_TERMS_PER_ORGANIZATION:
+                    continue
+                position = bisect.bisect_right(self.terms, term)
+                self.terms.insert(position, term)
+                self.entries.insert(position, (rank, kind, pk, label))
+                indexed.append(term)
+            self.records[(kind, pk)] = indexed
+
+    def remove(self, kind, pk):
+        with self.lock:
+            self._remove(kind, pk)
+
+    def _remove(self, kind, pk):
+        for term in self.records.pop((kind, pk), ()):
+            position = bisect.bisect_left(self.terms, term)
+            while position < len(self.terms) and self.terms[position] == term:
+                if self.entries[position][1:3] == (kind, pk):
+                    del self.terms[position]
+                    del self.entries[position]
+                    break
+                position += 1
+
+    def search(self, prefix, kinds=None, limit=10):
+        """Best ``limit`` records with a term starting with ``prefix``."""
+        prefix = " ".join(prefix.casefold().split())
+        found = {}
+        with self.lock:
+            start = bisect.bisect_left(self.terms, prefix)
+            for position in range(start, min(start + MAX_SCAN, len(self.terms))):
+                if not self.terms[position].startswith(prefix):
+                    break
+                rank, kind, pk, label = self.entries[position]
+                if kinds and kind not in kinds:
+                    continue
+                best = found.get((kind, pk))
+                if best is None or rank < best[0]:
+                    found[(kind, pk)] = (rank, kind, pk, label)
+        ranked = sorted(found.values(), key=lambda entry: (entry[0], len(entry[3]), entry[3]))
+        return [
+            {"kind": kind, "id": pk, "label": label}
+            for _, kind, pk, label in ranked[:limit]
+        ]
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def autocomplete(organization_id, prefix, kinds=None, limit=10):
+    if not prefix.strip() or limit <= 0:
+        return []
+    return get_index(organization_id).search(prefix, kinds, limit)
+
+
+def get_index(organization_id):
+    organization_id = str(organization_id)
+    now = time.monotonic()
+    with _indexes_lock:
+        for idle in [
+            key for key, index in _indexes.items() if now - index.used_at > IDLE_TIMEOUT
+        ]:
+            del _indexes[idle]
+        index = _indexes.get(organization_id)
+        if index is not None:
+            _indexes.move_to_end(organization_id)
+
+    if index is not None and now - index.checked_at > VERSION_CHECK_INTERVAL:
+        index.checked_at = now
+        if (
+            now - index.built_at > MAX_INDEX_AGE
+            or get_cache_version(AUTOCOMPLETE_CACHE, organization_id) != index.version
+        ):
+            index = None
+    if index is None:
+        # Read before building, so writes made meanwhile force another build.
+        version = get_cache_version(AUTOCOMPLETE_CACHE, organization_id)
+        index = PrefixIndex.build(organization_id, version)
+        with _indexes_lock:
+            _indexes[organization_id] = index
+            _indexes.move_to_end(organization_id)
+            while len(_indexes) > MAX_ORGANIZATIONS:
+                _indexes.popitem(last=False)
+    index.used_at = now
+    return index
+
+
+def update_autocomplete_on_commit(instance, deleted=False):
+    """Patch this process's index and invalidate the others' after commit."""
+    kind = AUTOCOMPLETE_MODELS[type(instance)]
+    organization_id = str(instance.organization_id) if instance.organization_id else None
+    if organization_id is None:
+        return
+    _, fields = AUTOCOMPLETE_SOURCES[kind]
+    pk = str(instance.pk)
+    values = [getattr(instance, field) for field in fields]
+
+    def apply():
+        version = bump_cache_version(AUTOCOMPLETE_CACHE, organization_id)
+        index = _indexes.get(organization_id)
+        if index is None:
+            return
+        if version is None or version != index.version + 1:
+            # Someone else bumped the version since the index was read, so
+            # patching would hide their write; rebuild on next use instead.
+            with _indexes_lock:
+                if _indexes.get(organization_id) is index:
+                    del _indexes[organization_id]
+            return
+        if deleted:
+            index.remove(kind, pk)
+        else:
+            index.add(kind, pk, values)
+        index.version = version
+
+    transaction.on_commit(apply)
+
+
+def forget_autocomplete_on_commit(organization_ids):
+    """Rebuild the indexes of organizations written without signals."""
+    organization_ids = {
+        str(organization_id) for organization_id in organization_ids if organization_id
+    }
+
+    def apply():
+        for organization_id in organization_ids:
+            bump_cache_version(AUTOCOMPLETE_CACHE, organization_id)
+            with _indexes_lock:
+                _indexes.pop(organization_id, None)
+
+    transaction.on_commit(apply)
@@ -0,0 +1,504 @@
+"""
+Bulk import of stock items from CSV or XLSX.
+
+Rows are streamed from the file and handled in chunks: each chunk is
+validated, its brand/group/category/unit/HSN/tax/... names are resolved
+through lookup maps loaded once per import, and the items, their alternate
+units and opening stock are written with one ``bulk_create`` per model.
+Memory use depends on the chunk size, not on the file size.
+
+``bulk_create`` skips the model signals, so the search index, autocomplete,
+barcode, tree and name-list caches are refreshed here instead.
+"""
+import csv
+import io
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.inventory.models import Openingstock
+from apps.item.autocomplete import forget_autocomplete_on_commit
+from apps.item.lookup import forget_barcodes_on_commit
+from apps.item.models import (
+    AlternateUnits,
+    Brand,
+    Godown,
+    HsnSac,
+    Kitchen,
+    MeasurementUnit,
+    Product,
+    StockCategory,
+    StockGroup,
+    StockItem,
+    Tax,
+)
+from apps.item.search import index_stock_items
+from apps.item.trees import forget_trees_on_commit
+from apps.main.conditional import forget_master_data_on_commit
+from apps.main.functions import get_auto_ids
+from apps.main.models import HierarchyMixin
+
+
+CHUNK_SIZE = 1000
+# Errors past this many are only counted.
+MAX_REPORTED_ERRORS = 1000
+
+TEXT_COLUMNS = {
+    "name": 255,
+    "alias": 120,
+    "item_code": 120,
+    "barcode": 300,
+    "secondary_language_name": 125,
+    "description": None,
+    "notes": None,
+}
+CHOICE_COLUMNS = {
+    "item_type": StockItem.ITEM_TYPE_CHOICES,
+    "gst_type": StockItem.GST_TYPE_CHOICES,
+    "supply_type": StockItem.SUPPLY_TYPE_CHOICES,
+    "mrp_type": StockItem.MRP_TYPE_CHOICES,
+}
+PRICE_COLUMNS = ["standard_rate", "selling_price", "cost_price"]
+COUNT_COLUMNS = ["min_order_quantity", "reorder_level"]
+BOOLEAN_COLUMNS = ["gst_applicable", "batch_number_enabled"]
+
+# column -> (model, field holding the name, field of StockItem or None)
+MASTER_COLUMNS = {
+    "stock_group": (StockGroup, "name", "stock_group"),
+    "stock_category": (StockCategory, "name", "stock_category"),
+    "brand": (Brand, "name", "brand"),
+    "unit": (MeasurementUnit, "name", "unit"),
+    "hsn_sac": (HsnSac, "hsnsac_code", "hsn_sac"),
+    "tax": (Tax, "tax", "tax"),
+    "godown": (Godown, "name", "godown"),
+    "kitchen": (Kitchen, "name", "kitchen"),
+    "stock_nature": (Product, "name", "stock_nature"),
+    "alternate_unit": (MeasurementUnit, "name", None),
+}
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n", ""}
+PRICE_LIMIT = Decimal(10) ** 10
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read as an item sheet."""
+
+
+def _header(value):
+    return re.sub(r"[\s\-]+", "_", str(value or "").strip().casefold())
+
+
+def read_rows(file, file_name):
+    """
+    Yield ``(line, {column: value})`` for the rows of a CSV or XLSX file,
+    ``line`` being the row number shown by a spreadsheet. Blank rows are
+    skipped.
+    """
+    extension = file_name.rsplit(".", 1)[-1].casefold() if "." in file_name else ""
+    if extension == "csv":
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        reader = csv.reader(text)
+    elif extension == "xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("XLSX import needs the openpyxl package.")
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"Not a readable XLSX file: {e}")
+        reader = workbook.active.iter_rows(values_only=True)
+    else:
+        raise ImportFileError("Only .csv and .xlsx files can be imported.")
+
+    headers = [_header(value) for value in next(reader, [])]
+    if "name" not in headers:
+        raise ImportFileError("The first row must name the columns, including 'name'.")
+    for line, values in enumerate(reader, start=2):
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield line, dict(zip(headers, values))
+
+
+def _key(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return " ".join(str(value).split()).casefold()
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _price(value):
+    if _text(value) == "":
+        return None
+    try:
+        price = Decimal(_text(value))
+    except InvalidOperation:
+        raise ValueError("Must be a number.")
+    if not price.is_finite() or price < 0 or price >= PRICE_LIMIT:
+        raise ValueError("Must be a non-negative amount below 10,000,000,000.")
+    return price.quantize(Decimal("0.01"))
+
+
+def _count(value):
+    if _text(value) == "":
+        return None
+    try:
+        count = Decimal(_text(value))
+    except InvalidOperation:
+        raise ValueError("Must be a whole number.")
+    if not count.is_finite() or count != count.to_integral_value() or count < 0:
+        raise ValueError("Must be a whole number.")
+    return int(count)
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).casefold()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError("Must be yes or no.")
+
+
+def _choice(value, choices):
+    text = _key(value)
+    for stored, label in choices:
+        if text in (stored.casefold(), label.casefold()):
+            return stored
+    raise ValueError(f"Must be one of: {', '.join(stored for stored, _ in choices)}.")
+
+
+class StockItemImport:
+    """
+    One import into an organization; ``run`` consumes the rows.
+
+    Masters named in the file are matched case-insensitively against the
+    organization's (and shared) records. With ``create_missing`` unknown
+    names are created, otherwise the row is rejected.
+    """
+
+    def __init__(self, organization_id, creator=None, create_missing=False):
+        self.organization_id = organization_id
+        self.creator = creator
+        self.create_missing = create_missing
+        self.lookups = {}
+        self.created = 0
+        self.masters_created = 0
+        self.created_master_models = set()
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows, chunk_size=CHUNK_SIZE, atomic_chunks=False):
+        """
+        Import ``(line, row)`` pairs as yielded by ``read_rows``. With
+        ``atomic_chunks`` every chunk commits on its own, so an interrupted
+        import keeps the chunks written so far.
+        """
+        chunk = []
+        for line, row in rows:
+            chunk.append((line, row))
+            if len(chunk) == chunk_size:
+                self._import_chunk(chunk, atomic_chunks)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, atomic_chunks)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "masters_created": self.masters_created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def _import_chunk(self, chunk, atomic):
+        if atomic:
+            with transaction.atomic():
+                self._write_chunk(chunk)
+        else:
+            self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk):
+        created = self.created
+        self.created_master_models = set()
+        self._write_items(chunk)
+        self._refresh_caches(self.created > created, self.created_master_models)
+
+    def _lookup(self, column):
+        if column not in self.lookups:
+            model, field, _ = MASTER_COLUMNS[column]
+            organization = Q(organization_id=self.organization_id)
+            records = model.objects.filter(
+                organization | Q(organization_id__isnull=True)
+            ).values_list("id", field, "organization_id")
+            lookup = {}
+            # Shared records first, so the organization's own win.
+            for pk, name, organization_id in sorted(
+                records, key=lambda record: record[2] is not None
+            ):
+                if name not in (None, ""):
+                    lookup[_key(name)] = pk
+            self.lookups[column] = lookup
+        return self.lookups[column]
+
+    def _parse(self, row):
+        values = {}
+        masters = {}
+        errors = {}
+
+        for column, max_length in TEXT_COLUMNS.items():
+            text = _text(row.get(column))
+            if max_length and len(text) > max_length:
+                errors[column] = [f"At most {max_length} characters."]
+            values[column] = text or None
+        if not values["name"]:
+            errors["name"] = ["Name is required."]
+
+        for column, choices in CHOICE_COLUMNS.items():
+            if _text(row.get(column)):
+                try:
+                    values[column] = _choice(row[column], choices)
+                except ValueError as e:
+                    errors[column] = [str(e)]
+        for columns, parse in (
+            (PRICE_COLUMNS, _price),
+            (COUNT_COLUMNS, _count),
+            (BOOLEAN_COLUMNS, _boolean),
+        ):
+            for column in columns:
+                if column not in row:
+                    continue
+                try:
+                    value = parse(row[column])
+                except ValueError as e:
+                    errors[column] = [str(e)]
+                    continue
+                if value is not None:
+                    values[column] = value
+
+        for column in MASTER_COLUMNS:
+            name = _text(row.get(column))
+            if not name:
+                continue
+            if column == "tax":
+                try:
+                    rate = _count(name.rstrip("%").strip())
+                except ValueError:
+                    rate = None
+                if rate is None:
+                    errors[column] = ["Must be a whole percentage."]
+                    continue
+                name = str(rate)
+            masters[column] = name
+
+        alternate = None
+        if "alternate_unit" in masters:
+            conversion = _text(row.get("alternate_unit_conversion"))
+            alternate = {"related_unit_values": conversion}
+            try:
+                if not conversion or Decimal(conversion) <= 0:
+                    raise InvalidOperation
+            except InvalidOperation:
+                errors["alternate_unit_conversion"] = [
+                    "A positive number of base units is required."
+                ]
+            if "unit" not in masters:
+                errors["unit"] = ["A base unit is required with an alternate unit."]
+            for column in ("selling_price", "cost_price"):
+                try:
+                    alternate[column] = _price(row.get(f"alternate_unit_{column}"))
+                except ValueError as e:
+                    errors[f"alternate_unit_{column}"] = [str(e)]
+            alternate["barcode"] = _text(row.get("alternate_unit_barcode")) or None
+
+        opening = None
+        try:
+            quantity = _count(row.get("opening_quantity"))
+            rate = _price(row.get("opening_rate")) or Decimal(0)
+            if quantity:
+                opening = {
+                    "quantity": quantity,
+                    "rate": rate,
+                    "amount": (rate * quantity).quantize(Decimal("0.01")),
+                }
+        except ValueError as e:
+            errors["opening_stock"] = [str(e)]
+
+        return values, masters, alternate, opening, errors
+
+    def _resolve_masters(self, parsed):
+        """Map master names to ids, creating the missing ones if allowed."""
+        missing = {}
+        for _, _, masters, _, _, errors in parsed:
+            if errors:
+                continue
+            for column, name in masters.items():
+                if _key(name) not in self._lookup(column):
+                    model = MASTER_COLUMNS[column][0]
+                    missing.setdefault(model, {}).setdefault(_key(name), name)
+
+        if self.create_missing:
+            for model, names in missing.items():
+                self._create_masters(model, list(names.values()))
+            return
+
+        for _, _, masters, _, _, errors in parsed:
+            if errors:
+                continue
+            for column, name in masters.items():
+                if _key(name) not in self._lookup(column):
+                    errors[column] = [f"Unknown {column.replace('_', ' ')} '{name}'."]
+
+    def _create_masters(self, model, names):
+        field = next(
+            field for master, field, _ in MASTER_COLUMNS.values() if master is model
+        )
+        records = []
+        for auto_id, name in zip(get_auto_ids(model, len(names)), names):
+            record = model(
+                auto_id=auto_id,
+                organization_id=self.organization_id,
+                creator=self.creator,
+                updated_by=self.creator,
+                **{field: int(name) if model is Tax else name},
+            )
+            if isinstance(record, HierarchyMixin):
+                record.path = record.path_segment
+            records.append(record)
+        model.objects.bulk_create(records)
+        for column, (master, _, _) in MASTER_COLUMNS.items():
+            if master is model:
+                self._lookup(column).update(
+                    {_key(name): record.pk for name, record in zip(names, records)}
+                )
+        self.masters_created += len(records)
+        self.created_master_models.add(model)
+
+    def _write_items(self, chunk):
+        parsed = [(line, *self._parse(row)) for line, row in chunk]
+        self._resolve_masters(parsed)
+
+        valid = []
+        for line, values, masters, alternate, opening, errors in parsed:
+            if errors:
+                self.error_count += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({"row": line, "errors": errors})
+                continue
+            for column, name in masters.items():
+                field = MASTER_COLUMNS[column][2]
+                if field:
+                    values[f"{field}_id"] = self._lookup(column)[_key(name)]
+            if alternate:
+                alternate["unit_value_id"] = self._lookup("alternate_unit")[
+                    _key(masters["alternate_unit"])
+                ]
+                alternate["related_unit_id"] = values["unit_id"]
+            valid.append((values, alternate, opening))
+        if not valid:
+            return
+
+        items = [
+            StockItem(
+                auto_id=auto_id,
+                organization_id=self.organization_id,
+                creator=self.creator,
+                updated_by=self.creator,
+                alternative_unit=alternate is not None,
+                **values,
+            )
+            for auto_id, (values, alternate, _) in zip(
+                get_auto_ids(StockItem, len(valid)), valid
+            )
+        ]
+        StockItem.objects.bulk_create(items)
+
+        alternates = [
+            (item, alternate)
+            for item, (_, alternate, _) in zip(items, valid)
+            if alternate
+        ]
+        if alternates:
+            units = [
+                AlternateUnits(
+                    auto_id=auto_id,
+                    organization_id=self.organization_id,
+                    creator=self.creator,
+                    updated_by=self.creator,
+                    **alternate,
+                )
+                for auto_id, (_, alternate) in zip(
+                    get_auto_ids(AlternateUnits, len(alternates)), alternates
+                )
+            ]
+            AlternateUnits.objects.bulk_create(units)
+            StockItem.alternative_units.through.objects.bulk_create(
+                [
+                    StockItem.alternative_units.through(
+                        stockitem_id=item.pk, alternateunits_id=unit.pk
+                    )
+                    for (item, _), unit in zip(alternates, units)
+                ]
+            )
+
+        openings = [
+            (item, opening) for item, (_, _, opening) in zip(items, valid) if opening
+        ]
+        if openings:
+            Openingstock.objects.bulk_create(
+                [
+                    Openingstock(
+                        auto_id=auto_id,
+                        organization_id=self.organization_id,
+                        stock_item=item,
+                        creator=self.creator,
+                        updated_by=self.creator,
+                        **opening,
+                    )
+                    for auto_id, (item, opening) in zip(
+                        get_auto_ids(Openingstock, len(openings)), openings
+                    )
+                ]
+            )
+
+        index_stock_items(items)
+        self.created += len(items)
+
+    def _refresh_caches(self, items_created, master_models):
+        organizations = [self.organization_id]
+        if items_created or master_models:
+            forget_autocomplete_on_commit(organizations)
+        if items_created:
+            forget_barcodes_on_commit(organizations)
+            forget_master_data_on_commit(StockItem, organizations)
+        for model in master_models:
+            forget_master_data_on_commit(model, organizations)
+            if model in (StockGroup, StockCategory):
+                forget_trees_on_commit(model, organizations)
+
+
+def import_stock_items(
+    rows,
+    organization_id,
+    creator=None,
+    create_missing=False,
+    chunk_size=CHUNK_SIZE,
+    atomic_chunks=False,
+):
+    """Import ``rows`` (see ``read_rows``) and return the report."""
+    return StockItemImport(organization_id, creator, create_missing).run(
+        rows, chunk_size, atomic_chunks
+    )
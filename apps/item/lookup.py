@@ -0,0 +1,188 @@
+"""
+Barcode lookup for point-of-sale scanning.
+
+A barcode resolves to the item, the unit it sells in, its price and tax,
+from either ``StockItem.barcode`` or ``AlternateUnits.barcode``. Resolved
+barcodes are cached in two levels: a small LRU in the process, so a repeat
+scan needs no network round trip, in front of the shared cache, which is
+versioned per organization and bumped on every item or alternate unit
+write. Balances change with every sale, so they are cached per item in the
+shared cache only and dropped by the stock postings.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.inventory.models import StockReport, stock_level_cache_key
+from apps.item.models import AlternateUnits, StockItem
+from apps.item.units import ConversionError, conversion_graphs
+from apps.main.functions import bump_cache_version_on_commit, versioned_cache_key
+
+
+BARCODE_CACHE = "barcode-lookup"
+BARCODE_CACHE_TIMEOUT = 60 * 60
+STOCK_LEVEL_CACHE_TIMEOUT = 60
+# Other processes only learn about an item change through the shared cache,
+# so their in-process copies must expire quickly.
+LOCAL_CACHE_TTL = 5
+LOCAL_CACHE_SIZE = 10000
+
+_NOT_FOUND = "not-found"
+
+
+class _LocalCache:
+    """Thread-safe LRU of ``(organization_id, barcode) -> entry`` with a TTL."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            found = self._entries.get(key)
+            if found is None:
+                return None
+            expires, value = found
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget_organization(self, organization_id):
+        organization_id = str(organization_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == organization_id]:
+                del self._entries[key]
+
+
+_local_cache = _LocalCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL)
+
+
+def lookup_barcode(organization_id, code, godown_id=None):
+    """
+    Item, unit, price, tax and balance scanned by ``code``, or ``None``.
+
+    The balance is the item's total, or the one of ``godown_id`` if given,
+    in the item's base unit.
+    """
+    entry = _barcode_entry(str(organization_id), code)
+    if entry is None:
+        return None
+    levels = _stock_levels(organization_id, entry["item_id"])
+    if godown_id:
+        stock = levels.get(str(godown_id), 0)
+    else:
+        stock = sum(levels.values())
+    return {**entry, "stock": stock}
+
+
+def forget_barcodes_on_commit(organization_ids):
+    """Invalidate the cached barcodes of organizations after a write."""
+    organization_ids = {
+        str(organization_id) for organization_id in organization_ids if organization_id
+    }
+    for organization_id in organization_ids:
+        _local_cache.forget_organization(organization_id)
+    bump_cache_version_on_commit(BARCODE_CACHE, organization_ids)
+    # Again after commit, in case a lookup cached the old row meanwhile.
+    transaction.on_commit(
+        lambda: [
+            _local_cache.forget_organization(organization_id)
+            for organization_id in organization_ids
+        ]
+    )
+
+
+def _barcode_entry(organization_id, code):
+    local_key = (organization_id, code)
+    entry = _local_cache.get(local_key)
+    if entry is None:
+        shared_key = versioned_cache_key(BARCODE_CACHE, organization_id, code)
+        entry = cache.get(shared_key)
+        if entry is None:
+            entry = _resolve_barcode(organization_id, code) or _NOT_FOUND
+            cache.set(shared_key, entry, BARCODE_CACHE_TIMEOUT)
+        _local_cache.set(local_key, entry)
+    return None if entry == _NOT_FOUND else entry
+
+
+def _resolve_barcode(organization_id, code):
+    item = (
+        StockItem.objects.select_related("unit", "tax")
+        .filter(organization_id=organization_id, barcode=code)
+        .first()
+    )
+    if item is not None:
+        return _entry(item, item.unit, 1, item.selling_price, item.cost_price)
+
+    alternate = (
+        AlternateUnits.objects.select_related("unit_value")
+        .filter(barcode=code, stock_items_units__organization_id=organization_id)
+        .first()
+    )
+    if alternate is None:
+        return None
+    item = (
+        alternate.stock_items_units.select_related("unit", "tax")
+        .filter(organization_id=organization_id)
+        .first()
+    )
+    graph = conversion_graphs(organization_id, [item.id]).get(str(item.id))
+    try:
+        # Base units per scanned unit, whatever unit the factor was entered in.
+        conversion = graph.factor(alternate.unit_value_id) if graph else None
+    except ConversionError:
+        conversion = None
+    return _entry(
+        item,
+        alternate.unit_value,
+        conversion,
+        alternate.selling_price,
+        alternate.cost_price,
+        alternate_unit_id=str(alternate.id),
+    )
+
+
+def _entry(item, unit, conversion, selling_price, cost_price, alternate_unit_id=None):
+    return {
+        "item_id": str(item.id),
+        "item_name": item.name,
+        "item_code": item.item_code,
+        "alternate_unit_id": alternate_unit_id,
+        "unit_id": str(unit.id) if unit else None,
+        "unit_name": unit.name if unit else None,
+        "conversion": conversion,
+        "selling_price": selling_price,
+        "cost_price": cost_price,
+        "mrp": item.standard_rate,
+        "tax_id": str(item.tax_id) if item.tax_id else None,
+        "tax_rate": item.tax.tax if item.tax else None,
+        "gst_type": item.gst_type,
+    }
+
+
+def _stock_levels(organization_id, item_id):
+    key = stock_level_cache_key(organization_id, item_id)
+    levels = cache.get(key)
+    if levels is None:
+        levels = {
+            str(godown_id): balance
+            for godown_id, balance in StockReport.objects.filter(
+                organization_id=organization_id, item_id=item_id
+            ).values_list("godown_id", "closing_balance")
+        }
+        cache.set(key, levels, STOCK_LEVEL_CACHE_TIMEOUT)
+    return levels
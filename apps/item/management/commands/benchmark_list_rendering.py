@@ -0,0 +1,175 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.inventory.api_v1.serializers import (
+    ListInventoryTransactionSerializer,
+    ListInventoryTransactionValues,
+)
+from apps.inventory.models import InventoryTransaction, Openingstock
+from apps.item.api_v1.serializers import (
+    GodownNameSerializer,
+    GodownNameValues,
+    RackNameListSerializer,
+    RackNameListValues,
+    UnitDetailedStockItemSerializer,
+    UnitDetailedStockItemValues,
+)
+from apps.item.models import AlternateUnits, Godown, MeasurementUnit, Rack, StockItem
+from apps.main.functions import get_auto_ids
+
+
+BATCH_SIZE = 2000
+LISTS = ["godowns", "racks", "items", "transactions"]
+
+
+def _create(model, rows, **fields):
+    """``rows`` saved instances of ``model``, each with ``fields``."""
+    objects = [
+        model(auto_id=auto_id, **fields) for auto_id in get_auto_ids(model, rows)
+    ]
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the ModelSerializer and values() renderings of the large read "
+        "lists on generated rows, checking both give the same JSON. The rows "
+        "are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=50000,
+            help="Rows generated for each list.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs of each rendering; the fastest is reported.",
+        )
+        parser.add_argument(
+            "--lists",
+            default=",".join(LISTS),
+            help=f"Comma separated lists to time, of: {', '.join(LISTS)}.",
+        )
+
+    def handle(self, *args, **options):
+        lists = [name.strip() for name in options["lists"].split(",") if name.strip()]
+        unknown = [name for name in lists if name not in LISTS]
+        if unknown:
+            raise CommandError(f"Unknown lists: {', '.join(unknown)}.")
+        if options["rows"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--rows and --repeat must be positive.")
+
+        with transaction.atomic():
+            querysets = self.populate(uuid.uuid4(), options["rows"], lists)
+            benchmarks = {
+                "godowns": (GodownNameSerializer, GodownNameValues),
+                "racks": (RackNameListSerializer, RackNameListValues),
+                "items": (UnitDetailedStockItemSerializer, UnitDetailedStockItemValues),
+                "transactions": (
+                    ListInventoryTransactionSerializer,
+                    ListInventoryTransactionValues,
+                ),
+            }
+            for name in lists:
+                serializer_class, values_class = benchmarks[name]
+                queryset = querysets[name]
+                slow, expected = self.time(
+                    lambda: serializer_class(queryset, many=True).data,
+                    options["repeat"],
+                )
+                fast, actual = self.time(
+                    lambda: values_class(queryset).data, options["repeat"]
+                )
+                if actual != expected:
+                    raise CommandError(f"{name}: the renderings differ.")
+                self.stdout.write(
+                    f"{name}: {options['rows']} rows, serializer {slow:.3f}s, "
+                    f"values {fast:.3f}s, {slow / fast:.1f}x faster"
+                )
+            transaction.set_rollback(True)
+
+    def time(self, render, repeat):
+        """The fastest of ``repeat`` runs and the JSON rendered."""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = JSONRenderer().render(render())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def populate(self, organization_id, rows, lists):
+        self.stdout.write(f"Generating {rows} rows per list...")
+        nos, box = _create(MeasurementUnit, 2, organization_id=organization_id)
+        godowns = _create(Godown, rows, organization_id=organization_id, name="Godown")
+        querysets = {
+            "godowns": Godown.objects.filter(organization_id=organization_id),
+            "racks": Rack.objects.filter(organization_id=organization_id),
+            "items": StockItem.objects.filter(organization_id=organization_id),
+            "transactions": InventoryTransaction.objects.filter(
+                organization_id=organization_id
+            ),
+        }
+        if "racks" in lists:
+            _create(Rack, rows, organization_id=organization_id, name="Rack", godown=godowns[0])
+        if "items" not in lists and "transactions" not in lists:
+            return querysets
+
+        items = _create(
+            StockItem,
+            rows,
+            organization_id=organization_id,
+            name="Item",
+            unit=nos,
+            selling_price=10,
+        )
+        if "items" in lists:
+            units = _create(
+                AlternateUnits,
+                rows,
+                organization_id=organization_id,
+                alternative_unit="Box",
+                unit_value=box,
+                related_unit=nos,
+                related_unit_values="12",
+            )
+            Through = StockItem.alternative_units.through
+            Through.objects.bulk_create(
+                [
+                    Through(stockitem_id=item.pk, alternateunits_id=unit.pk)
+                    for item, unit in zip(items, units)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            Openingstock.objects.bulk_create(
+                [
+                    Openingstock(auto_id=auto_id, stock_item=item, quantity=1, rate=10)
+                    for auto_id, item in zip(get_auto_ids(Openingstock, rows), items)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        if "transactions" in lists:
+            InventoryTransaction.objects.bulk_create(
+                [
+                    InventoryTransaction(
+                        organization_id=organization_id,
+                        item=item,
+                        unit=nos,
+                        godown=godowns[0],
+                        quantity=1,
+                        transaction_type="Inbound",
+                    )
+                    for item in items
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        return querysets
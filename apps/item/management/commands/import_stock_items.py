@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.item.imports import CHUNK_SIZE, ImportFileError, import_stock_items, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import stock items from a CSV or XLSX file. Each chunk commits on its "
+        "own, so an interrupted import keeps the rows written so far."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The .csv or .xlsx file.")
+        parser.add_argument(
+            "--organization",
+            required=True,
+            help="Organization ID the items belong to.",
+        )
+        parser.add_argument(
+            "--create-missing",
+            action="store_true",
+            help="Create unknown brands, groups, units, ... instead of rejecting rows.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows validated and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["path"], "rb") as file:
+            try:
+                report = import_stock_items(
+                    read_rows(file, options["path"]),
+                    options["organization"],
+                    create_missing=options["create_missing"],
+                    chunk_size=options["chunk_size"],
+                    atomic_chunks=True,
+                )
+            except ImportFileError as e:
+                raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} items "
+                f"({report['masters_created']} masters created, "
+                f"{report['error_count']} rows rejected)."
+            )
+        )
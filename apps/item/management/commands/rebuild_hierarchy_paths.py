@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.main.models import HierarchyMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the materialized paths of the master hierarchies, e.g. for "
+        "existing rows or after QuerySet.update on a parent field."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            help="Only rebuild this organization ID.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows updated per batch.",
+        )
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, HierarchyMixin):
+                continue
+            changed = model.rebuild_paths(
+                options["organization"], batch_size=options["batch_size"]
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"{model.__name__}: updated {changed} paths.")
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.item.search import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the stock item search index, e.g. after items were written "
+        "with bulk_create or QuerySet.update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            help="Only re-index this organization ID.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Items written to the index per batch.",
+        )
+
+    def handle(self, *args, **options):
+        ensure_search_index()
+        indexed = rebuild_search_index(
+            options["organization"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} items."))
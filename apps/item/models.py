@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
-from apps.main.models import BaseModel
+from django.db.models import F, Func, Value
+from django.db.models.functions import Coalesce, Lower
+from apps.main.models import BaseModel, HierarchyMixin
 from django.utils import timezone
 
 # apps.inventory.
@@ -64,7 +67,9 @@ class MeasurementUnit(BaseModel):
         db_table = "measurement_unit"
 
 
-class StockGroup(BaseModel):
+class StockGroup(HierarchyMixin, BaseModel):
+    parent_field = "parent_group"
+
     name = models.CharField(max_length=120, null=True, blank=True)
     alias = models.CharField(max_length=120, null=True, blank=True)
     organization_id = models.CharField(max_length=255, null=True, blank=True)
@@ -90,6 +95,12 @@ class StockGroup(BaseModel):
 
     class Meta:
         db_table = "stock_group"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "name"],
+                name="stock_group_org_name_idx",
+            ),
+        ]
 
 
 class ItemGroup(BaseModel):
@@ -162,7 +173,9 @@ class Product(BaseModel):
         db_table = "product"
 
 
-class Brand(BaseModel):
+class Brand(HierarchyMixin, BaseModel):
+    parent_field = "parent_brand"
+
     name = models.CharField(max_length=120, null=True, blank=True)
     organization_id = models.CharField(max_length=255, null=True, blank=True)
     parent_brand = models.ForeignKey(
@@ -179,9 +192,17 @@ class Brand(BaseModel):
 
     class Meta:
         db_table = "brand"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "name"],
+                name="brand_org_name_idx",
+            ),
+        ]
+
 
+class StockCategory(HierarchyMixin, BaseModel):
+    parent_field = "parent_category"
 
-class StockCategory(BaseModel):
     name = models.CharField(max_length=120, null=True, blank=True)
     alias = models.CharField(max_length=120, null=True, blank=True)
     # code = models.CharField(max_length=120, null=True, blank=True)
@@ -210,9 +231,17 @@ class StockCategory(BaseModel):
 
     class Meta:
         db_table = "stock_category"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "name"],
+                name="stock_category_org_name_idx",
+            ),
+        ]
 
 
-class Branch(BaseModel):
+class Branch(HierarchyMixin, BaseModel):
+    parent_field = "parent_branch"
+
     name = models.CharField(max_length=255, null=True, blank=True)
     organization_id = models.UUIDField(null=True, blank=True)
     email = models.EmailField(max_length=255, null=True, blank=True)
@@ -289,7 +318,9 @@ class BranchHistory(BaseModel):
         ordering = ["-modified_at"]
 
 
-class Godown(BaseModel):
+class Godown(HierarchyMixin, BaseModel):
+    parent_field = "parent_godown"
+
     name = models.CharField(max_length=255, null=True, blank=True)
     organization_id = models.UUIDField(null=True, blank=True)
     email = models.EmailField(max_length=255, null=True, blank=True)
@@ -329,9 +360,17 @@ class Godown(BaseModel):
 
     class Meta:
         db_table = "godown"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "branch"],
+                name="godown_org_branch_idx",
+            ),
+        ]
 
 
-class Rack(BaseModel):
+class Rack(HierarchyMixin, BaseModel):
+    parent_field = "parent_rack"
+
     organization_id = models.UUIDField(null=True, blank=True)
     name = models.CharField(max_length=120, null=True, blank=True)
     godown = models.ForeignKey(
@@ -359,6 +398,12 @@ class Rack(BaseModel):
 
     class Meta:
         db_table = "rack"
+        indexes = [
+            models.Index(
+                fields=["organization_id", "godown"],
+                name="rack_org_godown_idx",
+            ),
+        ]
 
 
 class AlternateUnits(BaseModel):
@@ -429,6 +474,52 @@ class Kitchen(BaseModel):
         return f"{self.name}"
 
 
+# The item fields apps.item.search matches a query against.
+SEARCH_FIELDS = ("name", "alias", "item_code", "barcode", "secondary_language_name")
+
+
+def search_text():
+    """SEARCH_FIELDS lowercased and joined by spaces, as PostgreSQL searches them."""
+    parts = []
+    for field in SEARCH_FIELDS:
+        if parts:
+            parts.append(Value(" "))
+        parts.append(Coalesce(field, Value("")))
+    # Joined with || since CONCAT() is not immutable and cannot be indexed.
+    joined = Func(
+        *parts,
+        template="(%(expressions)s)",
+        arg_joiner=" || ",
+        output_field=models.TextField(),
+    )
+    return Lower(joined)
+
+
+class TrigramSearchIndex(GinIndex):
+    """
+    GIN index over ``search_text()`` for pg_trgm. Declared for every database
+    so the model state is the same everywhere; only PostgreSQL builds it, as
+    SQLite keeps its own FTS5 table instead.
+    """
+
+    def __init__(self, *, name):
+        super().__init__(OpClass(search_text(), name="gin_trgm_ops"), name=name)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        return path, (), {"name": self.name}
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return f"-- {self.name}: PostgreSQL only"
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return f"-- {self.name}: PostgreSQL only"
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
 class StockItem(BaseModel):
     ITEM_TYPE_CHOICES = [
         ("Asset", "Asset"),
@@ -633,6 +724,20 @@ class StockItem(BaseModel):
     class Meta:
         db_table = "stock_item"
         ordering = ["name"]
+        indexes = [
+            models.Index(
+                fields=["organization_id", "name"],
+                name="stock_item_org_name_idx",
+            ),
+            # The keyset order of the item list.
+            models.Index(
+                F("organization_id"),
+                Coalesce("name", Value("")),
+                F("id"),
+                name="stock_item_org_sort_name_idx",
+            ),
+            TrigramSearchIndex(name="stock_item_search_trgm"),
+        ]
 
 
 # class StockItemHistory(models.Model):
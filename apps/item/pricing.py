@@ -0,0 +1,217 @@
+"""
+Bulk repricing of stock items.
+
+A revision is a list of rules, each changing one price of the items of a
+group, category or brand subtree (or of listed items) by a percentage, by
+an amount or to a fixed price, and a list of explicit prices per item or
+alternate unit. Every rule costs one UPDATE of the items and a few of
+their alternate units and explicit prices one UPDATE per batch, however
+many items they touch. ``QuerySet.update`` sends no signals, so the
+barcode lookups are forgotten here.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+from django.db.models.lookups import LessThan
+from django.utils import timezone
+
+from apps.item.lookup import forget_barcodes_on_commit
+from apps.item.models import AlternateUnits, Brand, StockCategory, StockGroup, StockItem
+from apps.item.units import parse_factor
+
+
+# price -> the date it applies from
+PRICE_FIELDS = {
+    "selling_price": "selling_price_applicable_date",
+    "cost_price": "cost_price_applicable_date",
+    "standard_rate": "mrp_applicable_date",
+}
+# Prices an alternate unit carries for its own quantity.
+ALTERNATE_UNIT_PRICE_FIELDS = ["selling_price", "cost_price"]
+PRICE_METHODS = ["percentage", "amount", "fixed"]
+RULE_FILTERS = {
+    "stock_group": StockGroup,
+    "stock_category": StockCategory,
+    "brand": Brand,
+}
+PRICE_BATCH_SIZE = 1000
+
+_PRICE = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _decimal(value):
+    return Value(Decimal(value), output_field=_PRICE)
+
+
+class PriceRevision:
+    """
+    One repricing of an organization's items; ``apply`` runs it.
+
+    ``effective_date`` is written to the applicable date of every price
+    changed. Relative rules leave items without the price alone and never
+    take a price below zero.
+    """
+
+    def __init__(self, organization_id, effective_date=None, updated_by=None):
+        self.organization_id = organization_id
+        self.effective_date = effective_date or timezone.localdate()
+        self.updated_by = updated_by
+        self.updated_at = timezone.now()
+
+    def _items(self):
+        return StockItem.objects.filter(organization_id=self.organization_id)
+
+    def _alternate_units(self, items=None):
+        if items is None:
+            return AlternateUnits.objects.filter(
+                stock_items_units__organization_id=self.organization_id
+            )
+        return AlternateUnits.objects.filter(stock_items_units__in=items.values("pk"))
+
+    def _stamp(self):
+        return {"updated_at": self.updated_at, "updated_by": self.updated_by}
+
+    def apply(self, rules=(), prices=()):
+        with transaction.atomic():
+            summary = {
+                "rules": [self.apply_rule(**rule) for rule in rules],
+                "prices": self.apply_prices(prices),
+            }
+        forget_barcodes_on_commit([self.organization_id])
+        summary["items_updated"] = sum(
+            rule["items"] for rule in summary["rules"]
+        ) + summary["prices"]["items"]
+        summary["alternate_units_updated"] = sum(
+            rule["alternate_units"] for rule in summary["rules"]
+        ) + summary["prices"]["alternate_units"]
+        return summary
+
+    def apply_rule(self, field, method, value, items=None, alternate_units=True, **filters):
+        value = Decimal(value)
+        queryset = self._items()
+        for lookup, model in RULE_FILTERS.items():
+            if filters.get(lookup):
+                queryset = queryset.filter(model.subtree_q(lookup, filters[lookup]))
+        if items:
+            queryset = queryset.filter(pk__in=items)
+
+        updated_units = 0
+        if alternate_units and field in ALTERNATE_UNIT_PRICE_FIELDS:
+            updated_units = self._reprice_alternate_units(
+                self._alternate_units(queryset), field, method, value
+            )
+
+        changes = {field: self._repriced(field, method, value), **self._stamp()}
+        if method != "fixed":
+            queryset = queryset.filter(**{f"{field}__isnull": False})
+        changes[PRICE_FIELDS[field]] = self.effective_date
+        return {
+            "field": field,
+            "method": method,
+            "items": queryset.update(**changes),
+            "alternate_units": updated_units,
+        }
+
+    def _repriced(self, field, method, value, conversion=1):
+        if method == "fixed":
+            return _decimal(value * conversion)
+        if method == "percentage":
+            price = F(field) * _decimal(1 + value / 100)
+        else:
+            price = F(field) + _decimal(value * conversion)
+        # Not Greatest(), which turns a NULL price into zero on PostgreSQL.
+        return Case(
+            When(LessThan(price, _decimal(0)), then=_decimal(0)),
+            default=Round(price, 2),
+            output_field=_PRICE,
+        )
+
+    def _reprice_alternate_units(self, queryset, field, method, value):
+        if method != "fixed":
+            queryset = queryset.filter(**{f"{field}__isnull": False})
+        if method == "percentage":
+            return queryset.update(
+                **{field: self._repriced(field, method, value)}, **self._stamp()
+            )
+
+        # Amounts are per base unit: one UPDATE per distinct conversion.
+        updated = 0
+        conversions = {}
+        for stored in queryset.values_list("related_unit_values", flat=True).distinct():
+            conversion = parse_factor(stored)
+            if conversion is not None:
+                conversions.setdefault(conversion, []).append(stored)
+        for conversion, stored in conversions.items():
+            updated += queryset.filter(related_unit_values__in=stored).update(
+                **{field: self._repriced(field, method, value, conversion)},
+                **self._stamp(),
+            )
+        return updated
+
+    def apply_prices(self, prices):
+        """
+        Set explicit prices, ``prices`` being dicts with an ``item`` or an
+        ``alternate_unit`` id and the prices to set. Ids the organization
+        does not own are returned as not found.
+        """
+        item_prices = [price for price in prices if price.get("item")]
+        unit_prices = [price for price in prices if price.get("alternate_unit")]
+        items, items_missing = self._set_prices(
+            self._items(), item_prices, "item", list(PRICE_FIELDS)
+        )
+        units, units_missing = self._set_prices(
+            self._alternate_units(),
+            unit_prices,
+            "alternate_unit",
+            ALTERNATE_UNIT_PRICE_FIELDS,
+        )
+        return {
+            "items": items,
+            "alternate_units": units,
+            "not_found": [str(pk) for pk in items_missing + units_missing],
+        }
+
+    def _set_prices(self, queryset, prices, key, fields):
+        dated = queryset.model is StockItem
+        updated = 0
+        missing = []
+        for start in range(0, len(prices), PRICE_BATCH_SIZE):
+            batch = prices[start : start + PRICE_BATCH_SIZE]
+            ids = [price[key] for price in batch]
+            found = set(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+            missing.extend(pk for pk in ids if pk not in found)
+            changes = {}
+            for field in fields:
+                changed = [price for price in batch if price.get(field) is not None]
+                if not changed:
+                    continue
+                changes[field] = Case(
+                    *(
+                        When(pk=price[key], then=_decimal(price[field]))
+                        for price in changed
+                    ),
+                    default=F(field),
+                    output_field=_PRICE,
+                )
+                if dated:
+                    date_field = PRICE_FIELDS[field]
+                    changes[date_field] = Case(
+                        When(
+                            pk__in=[price[key] for price in changed],
+                            then=Value(self.effective_date),
+                        ),
+                        default=F(date_field),
+                    )
+            if changes and found:
+                updated += queryset.filter(pk__in=found).update(
+                    **changes, **self._stamp()
+                )
+        return updated, missing
+
+
+def revise_prices(organization_id, rules=(), prices=(), effective_date=None, updated_by=None):
+    """Apply a price revision; returns what it changed."""
+    revision = PriceRevision(organization_id, effective_date, updated_by)
+    return revision.apply(rules, prices)
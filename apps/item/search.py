@@ -0,0 +1,249 @@
+"""
+Indexed search over stock items.
+
+SQLite keeps a trigram FTS5 table next to ``stock_item``, maintained from
+the StockItem signals. PostgreSQL uses the pg_trgm GIN index declared on
+StockItem over ``search_text()``, which the database keeps current by
+itself. Other backends fall back to ``icontains`` lookups.
+"""
+import difflib
+import uuid
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F, Q
+from django.db.models.lookups import Contains
+
+from apps.item.models import SEARCH_FIELDS, StockItem, search_text
+
+
+# Relative weight of a match in each of SEARCH_FIELDS.
+FIELD_WEIGHTS = (1.0, 0.9, 1.0, 1.0, 0.8)
+
+SEARCH_TABLE = "stock_item_search"
+
+TRIGRAM = 3
+# Candidates fetched per requested result before re-ranking.
+CANDIDATE_FACTOR = 5
+# Fuzzy-only candidates scoring below this are dropped.
+MIN_SIMILARITY = 0.7
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS):
+    """
+    Create the SQLite search table if missing; run after ``migrate``. On
+    PostgreSQL the index is part of the StockItem model.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    tables = connection.introspection.table_names()
+    if SEARCH_TABLE in tables or StockItem._meta.db_table not in tables:
+        return
+    columns = ", ".join(SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            f"item_id UNINDEXED, organization_id, {columns}, tokenize='trigram')"
+        )
+    rebuild_search_index(using=using)
+
+
+def index_stock_items(items, using=DEFAULT_DB_ALIAS):
+    """Add or refresh ``items`` in the SQLite index (rowid is ``auto_id``)."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or not items:
+        return
+    rows = [
+        (
+            item.auto_id,
+            str(item.id),
+            str(item.organization_id or ""),
+            *(getattr(item, field) or "" for field in SEARCH_FIELDS),
+        )
+        for item in items
+    ]
+    columns = ", ".join(SEARCH_FIELDS)
+    placeholders = ", ".join(["%s"] * (3 + len(SEARCH_FIELDS)))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [row[:1] for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, item_id, organization_id, {columns}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+
+def remove_stock_items(items, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != "sqlite" or not items:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+            [(item.auto_id,) for item in items],
+        )
+
+
+def rebuild_search_index(organization_id=None, batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Re-index every item, or those of one organization. Needed after writes
+    that skip the model signals (``bulk_create``, ``QuerySet.update``).
+    Returns the number of items indexed, 0 where the database maintains the
+    index itself.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return 0
+    with connection.cursor() as cursor:
+        if organization_id:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE organization_id = %s",
+                [str(organization_id)],
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    items = StockItem.objects.using(using).only("id", "auto_id", "organization_id", *SEARCH_FIELDS)
+    if organization_id:
+        items = items.filter(organization_id=organization_id)
+    batch = []
+    indexed = 0
+    for item in items.order_by().iterator(chunk_size=batch_size):
+        batch.append(item)
+        if len(batch) == batch_size:
+            index_stock_items(batch, using)
+            indexed += len(batch)
+            batch = []
+    index_stock_items(batch, using)
+    return indexed + len(batch)
+
+
+def search_stock_items(organization_id, query, limit=20):
+    """
+    Ids of the organization's items best matching ``query``, best first.
+
+    Substring matches on any of SEARCH_FIELDS come first; when there are not
+    enough of them, items sharing most of the query's trigrams are added,
+    which tolerates typos. Candidates are re-ranked by how closely one of
+    their fields matches the query.
+    """
+    query = " ".join(query.split())
+    if not query or limit <= 0:
+        return []
+    if len(query) < TRIGRAM:
+        return _like_search(organization_id, query, limit, prefix=True)
+    if connection.vendor == "sqlite":
+        item_ids = _sqlite_search(organization_id, query, limit)
+    elif connection.vendor == "postgresql":
+        item_ids = _postgres_search(organization_id, query, limit)
+    else:
+        return _like_search(organization_id, query, limit)
+    return [uuid.UUID(item_id) for item_id in item_ids]
+
+
+def _like_search(organization_id, query, limit, prefix=False):
+    lookup = "istartswith" if prefix else "icontains"
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__{lookup}": query})
+    return list(
+        StockItem.objects.filter(condition, organization_id=organization_id)
+        .order_by("name", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def _phrase(text):
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def _sqlite_search(organization_id, query, limit):
+    scope = f"organization_id : {_phrase(str(organization_id))} AND {{{' '.join(SEARCH_FIELDS)}}} : "
+    candidates = _sqlite_candidates(scope + _phrase(query), limit * CANDIDATE_FACTOR)
+    ranked = _rank(query, candidates)
+    if len(ranked) < limit:
+        lowered = query.casefold()
+        trigrams = sorted(
+            {lowered[i:i + TRIGRAM] for i in range(len(lowered) - TRIGRAM + 1)}
+        )
+        fuzzy = _sqlite_candidates(
+            scope + "({})".format(" OR ".join(_phrase(trigram) for trigram in trigrams)),
+            limit * CANDIDATE_FACTOR,
+        )
+        seen = set(ranked)
+        ranked += [
+            item_id
+            for item_id in _rank(query, fuzzy, MIN_SIMILARITY)
+            if item_id not in seen
+        ]
+    return ranked[:limit]
+
+
+def _sqlite_candidates(match, limit):
+    columns = ", ".join(SEARCH_FIELDS)
+    # bm25 weights follow the table's columns: item_id, organization_id, fields.
+    weights = ", ".join(str(weight) for weight in (0, 0, *FIELD_WEIGHTS))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT item_id, {columns} FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s",
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+def _postgres_search(organization_id, query, limit):
+    lowered = query.lower()
+    text = F("search_text")
+    # Filtering on the indexed expression lets LIKE and %> (word similarity
+    # above pg_trgm's threshold) both use the trigram index.
+    candidates = (
+        StockItem.objects.filter(organization_id=organization_id)
+        .annotate(search_text=search_text())
+        .filter(Q(Contains(text, lowered)) | Q(TrigramWordSimilar(text, lowered)))
+        .annotate(similarity=TrigramWordSimilarity(lowered, text))
+        .order_by("-similarity")
+        .values_list("id", *SEARCH_FIELDS)[: limit * CANDIDATE_FACTOR]
+    )
+    rows = [(str(item_id), *values) for item_id, *values in candidates]
+    return _rank(query, rows)[:limit]
+
+
+def _score(query, values):
+    best = 0.0
+    for weight, value in zip(FIELD_WEIGHTS, values):
+        value = (value or "").casefold()
+        if not value:
+            continue
+        words = value.split()
+        if value == query:
+            score = 3.0
+        elif query in words:
+            score = 2.5
+        elif value.startswith(query):
+            score = 2.0
+        elif any(word.startswith(query) for word in words):
+            score = 1.75
+        elif query in value:
+            score = 1.5
+        else:
+            score = max(
+                difflib.SequenceMatcher(None, query, word).ratio()
+                for word in [value, *words]
+            )
+        best = max(best, score * weight)
+    return best
+
+
+def _rank(query, candidates, min_score=0.0):
+    """Order ``(item_id, *field values)`` rows by ``_score``, best first."""
+    query = query.casefold()
+    scored = [(_score(query, row[1:]), index, row[0]) for index, row in enumerate(candidates)]
+    scored = [entry for entry in scored if entry[0] >= min_score]
+    scored.sort(key=lambda entry: (-entry[0], entry[1]))
+    return [item_id for _, _, item_id in scored]
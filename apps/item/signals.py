@@ -0,0 +1,135 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.inventory.models import STOCK_SUMMARY_CACHE
+from apps.item.autocomplete import AUTOCOMPLETE_MODELS, update_autocomplete_on_commit
+from apps.item.lookup import forget_barcodes_on_commit
+from apps.item.models import (
+    AlternateUnits,
+    Brand,
+    Godown,
+    Kitchen,
+    Product,
+    Rack,
+    StockCategory,
+    StockClassification,
+    StockGroup,
+    StockItem,
+)
+from apps.item.search import index_stock_items, remove_stock_items
+from apps.item.trees import forget_trees_on_commit
+from apps.item.units import forget_unit_graphs_on_commit
+from apps.main.conditional import forget_master_data_on_commit
+from apps.main.functions import bump_cache_version_on_commit
+
+# Models whose name lists are served through conditional GET.
+MASTER_MODELS = [
+    StockItem,
+    StockGroup,
+    Product,
+    Brand,
+    Kitchen,
+    StockClassification,
+    StockCategory,
+    Godown,
+    Rack,
+]
+
+# Models whose names the cached stock summaries show.
+SUMMARY_MODELS = [StockItem, Godown, StockGroup, Brand]
+
+
+@receiver(post_save, sender=StockItem)
+def index_stock_item(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    # Written in the same transaction as the item, so a rollback undoes both.
+    if not raw:
+        index_stock_items([instance], using=using)
+    forget_barcodes_on_commit([instance.organization_id])
+    forget_unit_graphs_on_commit([instance.organization_id])
+
+
+@receiver(post_delete, sender=StockItem)
+def unindex_stock_item(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    remove_stock_items([instance], using=using)
+    forget_barcodes_on_commit([instance.organization_id])
+    forget_unit_graphs_on_commit([instance.organization_id])
+
+
+@receiver(m2m_changed, sender=StockItem.alternative_units.through)
+def alternative_units_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # ``instance`` is the alternate unit, ``pk_set`` the stock items.
+        items = (
+            StockItem.objects.filter(pk__in=pk_set)
+            if pk_set
+            else instance.stock_items_units.all()
+        )
+        organizations = {
+            instance.organization_id,
+            *items.values_list("organization_id", flat=True),
+        }
+    else:
+        organizations = [instance.organization_id]
+    forget_barcodes_on_commit(organizations)
+    forget_unit_graphs_on_commit(organizations)
+
+
+@receiver(post_save, sender=AlternateUnits)
+@receiver(post_delete, sender=AlternateUnits)
+def alternate_unit_changed(sender, instance, **kwargs):
+    if instance.organization_id:
+        organizations = [instance.organization_id]
+    else:
+        organizations = set(
+            StockItem.objects.filter(alternative_units=instance.pk).values_list(
+                "organization_id", flat=True
+            )
+        )
+    forget_barcodes_on_commit(organizations)
+    forget_unit_graphs_on_commit(organizations)
+
+
+def autocomplete_record_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_autocomplete_on_commit(instance)
+
+
+def autocomplete_record_deleted(sender, instance, **kwargs):
+    update_autocomplete_on_commit(instance, deleted=True)
+
+
+for model in AUTOCOMPLETE_MODELS:
+    post_save.connect(autocomplete_record_saved, sender=model)
+    post_delete.connect(autocomplete_record_deleted, sender=model)
+
+
+@receiver(post_save, sender=StockGroup)
+@receiver(post_delete, sender=StockGroup)
+@receiver(post_save, sender=StockCategory)
+@receiver(post_delete, sender=StockCategory)
+@receiver(post_save, sender=Rack)
+@receiver(post_delete, sender=Rack)
+def tree_node_changed(sender, instance, **kwargs):
+    forget_trees_on_commit(sender, [instance.organization_id])
+
+
+def master_record_changed(sender, instance, **kwargs):
+    forget_master_data_on_commit(sender, [instance.organization_id])
+
+
+for model in MASTER_MODELS:
+    post_save.connect(master_record_changed, sender=model)
+    post_delete.connect(master_record_changed, sender=model)
+
+
+def summary_master_changed(sender, instance, **kwargs):
+    if instance.organization_id:
+        bump_cache_version_on_commit(STOCK_SUMMARY_CACHE, [instance.organization_id])
+
+
+for model in SUMMARY_MODELS:
+    post_save.connect(summary_master_changed, sender=model)
+    post_delete.connect(summary_master_changed, sender=model)
@@ -0,0 +1,124 @@
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.item import autocomplete as autocomplete_module
+from apps.item.autocomplete import AUTOCOMPLETE_CACHE, autocomplete, get_index
+from apps.item.models import Brand, StockGroup, StockItem
+from apps.main.functions import bump_cache_version, get_auto_id
+from apps.main.utils import UserProxy
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.pen = self.create(StockItem, name="Pen", item_code="P-100")
+        self.ball_pen = self.create(StockItem, name="Ball Pen Blue", alias="Biro")
+        self.pencil = self.create(StockItem, name="Pencil")
+        self.brand = self.create(Brand, name="Penguin")
+        self.group = self.create(StockGroup, name="Stationery")
+
+    def create(self, model, organization_id=None, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return model.objects.create(
+                auto_id=get_auto_id(model),
+                organization_id=organization_id or self.organization_id,
+                **fields,
+            )
+
+    def labels(self, prefix, kinds=None, limit=10):
+        return [
+            match["label"]
+            for match in autocomplete(self.organization_id, prefix, kinds, limit)
+        ]
+
+    def test_whole_names_rank_before_inner_words(self):
+        self.assertEqual(
+            self.labels("pen"), ["Pen", "Pencil", "Penguin", "Ball Pen Blue"]
+        )
+        self.assertEqual(self.labels("pen b"), ["Ball Pen Blue"])
+
+    def test_codes_aliases_and_kinds(self):
+        self.assertEqual(self.labels("p-1"), ["Pen"])
+        self.assertEqual(self.labels("bir"), ["Ball Pen Blue"])
+        self.assertEqual(self.labels("pen", kinds={"brand"}), ["Penguin"])
+        self.assertEqual(self.labels("pen", limit=2), ["Pen", "Pencil"])
+
+    def test_writes_patch_the_loaded_index_without_rebuilding(self):
+        self.labels("pen")
+        self.create(StockItem, name="Pen Drive")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pencil.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.labels("pen"), ["Pen", "Penguin", "Pen Drive", "Ball Pen Blue"]
+            )
+
+    def test_other_processes_writes_trigger_a_rebuild(self):
+        index = get_index(self.organization_id)
+        # A write in another process: new row, version bumped elsewhere.
+        StockItem.objects.bulk_create(
+            [
+                StockItem(
+                    auto_id=get_auto_id(StockItem),
+                    name="Penny",
+                    organization_id=self.organization_id,
+                )
+            ]
+        )
+        bump_cache_version(AUTOCOMPLETE_CACHE, self.organization_id)
+        self.assertNotIn("Penny", self.labels("penn"))
+
+        index.checked_at -= autocomplete_module.VERSION_CHECK_INTERVAL + 1
+
+        self.assertEqual(self.labels("penn"), ["Penny"])
+
+    def test_local_write_after_another_process_bump_rebuilds(self):
+        self.labels("pen")
+        StockItem.objects.bulk_create(
+            [
+                StockItem(
+                    auto_id=get_auto_id(StockItem),
+                    name="Penny",
+                    organization_id=self.organization_id,
+                )
+            ]
+        )
+        bump_cache_version(AUTOCOMPLETE_CACHE, self.organization_id)
+
+        # Patching would adopt the other bump and keep missing "Penny".
+        self.create(StockItem, name="Pen Drive")
+
+        self.assertEqual(self.labels("penn"), ["Penny"])
+        self.assertIn("Pen Drive", self.labels("pen d"))
+
+    def test_least_recently_used_organizations_are_evicted(self):
+        other = uuid.uuid4()
+        self.create(StockItem, organization_id=other, name="Pad")
+
+        with mock.patch.object(autocomplete_module, "MAX_ORGANIZATIONS", 1):
+            first = get_index(self.organization_id)
+            get_index(other)
+            self.assertIsNot(get_index(self.organization_id), first)
+
+        self.assertEqual(autocomplete(other, "pa"), [mock.ANY])
+        self.assertEqual(self.labels("pa"), [])
+
+    def test_autocomplete_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+
+        response = client.get(
+            "/api/v1/item/autocomplete/", {"q": "sta", "kinds": "stock_group,item"}
+        )
+        invalid = client.get("/api/v1/item/autocomplete/", {"q": "pen", "kinds": "nope"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["data"],
+            [{"kind": "stock_group", "id": str(self.group.id), "label": "Stationery"}],
+        )
+        self.assertEqual(invalid.status_code, 400)
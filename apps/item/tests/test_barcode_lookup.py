@@ -0,0 +1,126 @@
+import uuid
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.inventory.models import InventoryTransaction
+from apps.item.lookup import lookup_barcode
+from apps.item.models import AlternateUnits, Godown, MeasurementUnit, StockItem, Tax
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class BarcodeLookupTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.unit = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.godown = self.create(Godown, name="Main", organization_id=self.organization_id)
+        self.item = self.create(
+            StockItem,
+            name="Pen",
+            organization_id=self.organization_id,
+            barcode=f"890{uuid.uuid4().int % 10**10}",
+            unit=self.unit,
+            tax=self.create(Tax, tax=18),
+            selling_price=Decimal("10.00"),
+        )
+        self.box_unit = self.create(
+            AlternateUnits,
+            unit_value=self.box,
+            related_unit=self.unit,
+            related_unit_values="10",
+            selling_price=Decimal("95.00"),
+            barcode=f"BOX-{self.item.barcode}",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.alternative_units.add(self.box_unit)
+            self.post(25)
+
+    def create(self, model, **fields):
+        return model.objects.create(auto_id=get_auto_id(model), **fields)
+
+    def post(self, quantity, transaction_type="Inbound"):
+        InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            item=self.item,
+            unit=self.unit,
+            godown=self.godown,
+            quantity=quantity,
+            transaction_type=transaction_type,
+        )
+
+    def lookup(self, code, godown=None):
+        return lookup_barcode(self.organization_id, code, godown)
+
+    def test_item_barcode_resolves_price_tax_and_stock(self):
+        entry = self.lookup(self.item.barcode)
+
+        self.assertEqual(entry["item_name"], "Pen")
+        self.assertEqual(entry["unit_name"], "Nos")
+        self.assertEqual(entry["selling_price"], Decimal("10.00"))
+        self.assertEqual(entry["tax_rate"], 18)
+        self.assertEqual(entry["stock"], 25)
+        self.assertEqual(self.lookup(self.item.barcode, self.godown.id)["stock"], 25)
+        self.assertEqual(self.lookup(self.item.barcode, uuid.uuid4())["stock"], 0)
+
+    def test_alternate_unit_barcode_resolves_its_unit(self):
+        entry = self.lookup(self.box_unit.barcode)
+
+        self.assertEqual(entry["item_id"], str(self.item.id))
+        self.assertEqual(entry["unit_name"], "Box")
+        self.assertEqual(entry["conversion"], Decimal(10))
+        self.assertEqual(entry["selling_price"], Decimal("95.00"))
+
+    def test_alternate_unit_conversion_is_in_base_units(self):
+        carton = self.create(
+            AlternateUnits,
+            unit_value=self.create(MeasurementUnit, name="Carton"),
+            related_unit=self.box,
+            related_unit_values="12",
+            barcode=f"CTN-{self.item.barcode}",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.alternative_units.add(carton)
+
+        self.assertEqual(self.lookup(carton.barcode)["conversion"], Decimal(120))
+
+    def test_repeat_scans_do_not_query(self):
+        self.lookup(self.item.barcode)
+        self.lookup("unknown")
+
+        with self.assertNumQueries(0):
+            self.lookup(self.item.barcode)
+            self.assertIsNone(self.lookup("unknown"))
+
+    def test_item_writes_invalidate_the_cache(self):
+        self.lookup(self.item.barcode)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.selling_price = Decimal("12.00")
+            self.item.save()
+
+        self.assertEqual(self.lookup(self.item.barcode)["selling_price"], Decimal("12.00"))
+
+    def test_stock_postings_invalidate_the_balance(self):
+        self.lookup(self.item.barcode)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(5, "Outbound")
+
+        self.assertEqual(self.lookup(self.item.barcode)["stock"], 20)
+
+    def test_other_organizations_cannot_scan_the_item(self):
+        self.assertIsNone(lookup_barcode(uuid.uuid4(), self.item.barcode))
+
+    def test_lookup_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+
+        found = client.get(f"/api/v1/item/lookup/barcode/{self.box_unit.barcode}/")
+        missing = client.get("/api/v1/item/lookup/barcode/nothing/")
+
+        self.assertEqual(found.status_code, 200)
+        self.assertEqual(found.json()["data"]["unit_name"], "Box")
+        self.assertEqual(missing.status_code, 404)
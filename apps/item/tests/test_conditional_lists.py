@@ -0,0 +1,87 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.item.models import Brand, Godown, StockItem
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class ConditionalNameListTest(TestCase):
+    url = "/api/v1/item/brand-names/"
+
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.brand = self.create(Brand, name="Acme")
+
+    def create(self, model, organization_id=None, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return model.objects.create(
+                auto_id=get_auto_id(model),
+                organization_id=organization_id or self.organization_id,
+                **fields,
+            )
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, headers=headers)
+        selects = [query for query in context if query["sql"].startswith("SELECT")]
+        return response, len(selects)
+
+    def names(self, response):
+        return [row["name"] for row in response.json()]
+
+    def test_unchanged_lists_are_answered_from_the_cache(self):
+        first, first_queries = self.get(self.url)
+        etag = first["ETag"]
+
+        not_modified, not_modified_queries = self.get(self.url, if_none_match=etag)
+        since, _ = self.get(self.url, if_modified_since=first["Last-Modified"])
+        cached, cached_queries = self.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first_queries, 1)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], etag)
+        self.assertEqual(since.status_code, 304)
+        self.assertEqual(not_modified_queries, 0)
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached_queries, 0)
+        self.assertEqual(self.names(cached), ["Acme"])
+
+    def test_writes_change_the_etag(self):
+        etag = self.get(self.url)[0]["ETag"]
+        self.create(Brand, name="Zenith")
+
+        response, _ = self.get(self.url, if_none_match=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.names(response), ["Acme", "Zenith"])
+
+    def test_other_models_and_organizations_keep_the_etag(self):
+        etag = self.get(self.url)[0]["ETag"]
+        self.create(StockItem, name="Pen")
+        self.create(Brand, name="Other", organization_id=uuid.uuid4())
+
+        self.assertEqual(self.get(self.url, if_none_match=etag)[0].status_code, 304)
+
+    def test_location_wise_godowns_are_scoped_to_the_organization(self):
+        self.create(Godown, name="Main", is_primary_godown=True)
+        self.create(
+            Godown,
+            name="Elsewhere",
+            is_primary_godown=True,
+            organization_id=uuid.uuid4(),
+        )
+
+        response, _ = self.get("/api/v1/item/godowns/location-wise/")
+
+        self.assertEqual([row["name"] for row in response.json()["data"]], ["Main"])
@@ -0,0 +1,111 @@
+import csv
+import io
+import uuid
+import zipfile
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.item.imports import read_rows
+from apps.item.models import Brand, StockGroup, StockItem
+from apps.main.exports import iter_rows
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class StockItemExportTest(TestCase):
+    url = "/api/v1/item/stock-item/export/"
+
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.brand = self.create(Brand, name="Acme")
+        self.group = self.create(StockGroup, name="Stationery")
+        self.create(
+            StockItem,
+            name="Pen",
+            item_code="P-1",
+            brand=self.brand,
+            stock_group=self.group,
+            selling_price=Decimal("10.50"),
+        )
+        self.create(StockItem, name="Rice", item_code="R-1")
+        self.create(StockItem, name="Other", organization_id=uuid.uuid4())
+
+    def create(self, model, organization_id=None, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model),
+            organization_id=organization_id or self.organization_id,
+            **fields,
+        )
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_streams_the_selected_columns(self):
+        response = self.client.get(self.url, {"columns": "name,brand,selling_price"})
+        # The items are only read while the body is being sent.
+        with CaptureQueriesContext(connection) as context:
+            content = b"".join(response.streaming_content)
+
+        self.assertEqual(len(context), 1)
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(
+            list(csv.reader(io.StringIO(content.decode()))),
+            [
+                ["Name", "Brand", "Selling Price"],
+                ["Pen", "Acme", "10.50"],
+                ["Rice", "", ""],
+            ],
+        )
+
+    def test_csv_can_be_imported_back(self):
+        _, content = self.export(stock_group=str(self.group.id))
+
+        rows = [row for _, row in read_rows(io.BytesIO(content), "items.csv")]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            (rows[0]["name"], rows[0]["item_code"], rows[0]["stock_group"]),
+            ("Pen", "P-1", "Stationery"),
+        )
+
+    def test_xlsx(self):
+        response, content = self.export(file_format="xlsx", columns="id,name")
+
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn("spreadsheetml", response["Content-Type"])
+        self.assertIn("Pen", sheet)
+        self.assertNotIn("Other", sheet)
+
+    def test_invalid_requests(self):
+        for params in (
+            {"columns": "name,secret"},
+            {"file_format": "pdf"},
+            {"brand": "x"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_batches_without_server_side_cursors(self):
+        queryset = StockItem.objects.filter(organization_id=self.organization_id)
+        expected = sorted(iter_rows(queryset, ["name"]))
+        settings = connection.settings_dict
+        settings["DISABLE_SERVER_SIDE_CURSORS"] = True
+        try:
+            with CaptureQueriesContext(connection) as context:
+                rows = sorted(iter_rows(queryset, ["name"], chunk_size=1))
+        finally:
+            del settings["DISABLE_SERVER_SIDE_CURSORS"]
+
+        self.assertEqual(rows, expected)
+        self.assertEqual(len(context), 3)
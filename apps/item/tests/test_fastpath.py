@@ -0,0 +1,137 @@
+import uuid
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.inventory.models import Openingstock
+from apps.item.api_v1.serializers import (
+    GodownNameSerializer,
+    GodownNameValues,
+    RackNameListSerializer,
+    RackNameListValues,
+    UnitDetailedStockItemSerializer,
+    UnitDetailedStockItemValues,
+)
+from apps.item.models import (
+    AlternateUnits,
+    Brand,
+    Godown,
+    MeasurementUnit,
+    Rack,
+    StockItem,
+    Tax,
+)
+from apps.main.fastpath import ValuesSerializer
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@override_settings(MEDIA_ROOT="/tmp/fastpath-media")
+class ValuesSerializerTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.nos = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.brand = self.create(Brand, name="Acme")
+        self.tax = self.create(Tax, tax=18)
+        self.godown = self.create(Godown, name="Main", is_primary_godown=True)
+        self.create(Godown)
+        self.create(Rack, name="A1", godown=self.godown)
+        self.create(Rack, godown=None)
+
+        self.pen = self.create(
+            StockItem,
+            name="Pen",
+            unit=self.nos,
+            brand=self.brand,
+            tax=self.tax,
+            item_type="Stock",
+            selling_price=Decimal("10.50"),
+            image=SimpleUploadedFile("pen.png", b"png"),
+        )
+        self.pen.alternative_units.add(
+            self.create(
+                AlternateUnits,
+                alternative_unit="Box",
+                unit_value=self.box,
+                related_unit=self.nos,
+                related_unit_values="12",
+                selling_price=Decimal("120"),
+            ),
+            self.create(AlternateUnits, alternative_unit="Loose"),
+        )
+        for quantity in (5, 7):
+            self.create(Openingstock, stock_item=self.pen, quantity=quantity, rate=2)
+        self.create(StockItem, name="Bare")
+        self.create(StockItem, name="Elsewhere", organization_id=uuid.uuid4())
+
+    def create(self, model, **fields):
+        fields.setdefault("organization_id", self.organization_id)
+        return model.objects.create(auto_id=get_auto_id(model), **fields)
+
+    def assertSameOutput(self, serializer_class, values_class, queryset, context=None):
+        expected = render(serializer_class(queryset, many=True, context=context or {}).data)
+        self.assertEqual(render(values_class(queryset, context).data), expected)
+
+    def test_name_lists_match_their_serializers(self):
+        self.assertSameOutput(GodownNameSerializer, GodownNameValues, Godown.objects.all())
+        self.assertSameOutput(RackNameListSerializer, RackNameListValues, Rack.objects.all())
+
+    def test_unit_detailed_items_match_the_serializer(self):
+        queryset = StockItem.objects.filter(organization_id=self.organization_id)
+
+        self.assertSameOutput(
+            UnitDetailedStockItemSerializer, UnitDetailedStockItemValues, queryset
+        )
+
+    def test_nulls_on_relations_follow_the_serializer(self):
+        # The brand name is left out for the item without a brand, as
+        # DRF skips a read-only field whose relation is null.
+        rows = UnitDetailedStockItemValues(StockItem.objects.order_by("name")).data
+
+        self.assertNotIn("brand_name", rows[0])
+        self.assertEqual(rows[2]["brand_name"], "Acme")
+        self.assertEqual(rows[2]["tax_name"], "18")
+
+    def test_file_urls_are_absolute_with_a_request(self):
+        request = APIRequestFactory().get("/")
+        queryset = StockItem.objects.filter(pk=self.pen.pk)
+
+        self.assertSameOutput(
+            UnitDetailedStockItemSerializer,
+            UnitDetailedStockItemValues,
+            queryset,
+            {"request": request},
+        )
+
+    def test_unit_detailed_endpoint_queries_do_not_grow(self):
+        url = "/api/v1/item/unit-detailed-stockitem-list/"
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for index in range(10):
+            self.create(StockItem, name=f"Item {index}", unit=self.nos)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.json()), 12)
+        self.assertEqual(len(many), len(few))
+
+    def test_fields_that_need_a_loader_are_reported(self):
+        class Incomplete(ValuesSerializer):
+            serializer_class = UnitDetailedStockItemSerializer
+
+        with self.assertRaises(TypeError):
+            Incomplete(StockItem.objects.all()).data
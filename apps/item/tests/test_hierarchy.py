@@ -0,0 +1,110 @@
+import io
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.item.api_v1.serializers import StockGroupSerializer
+from apps.item.models import Godown, StockGroup, StockItem
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class HierarchyTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.root = self.create(StockGroup, name="Primary")
+        self.stationery = self.create(
+            StockGroup, name="Stationery", parent_group=self.root
+        )
+        self.pens = self.create(StockGroup, name="Pens", parent_group=self.stationery)
+        self.food = self.create(StockGroup, name="Food", parent_group=self.root)
+
+    def create(self, model, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model), organization_id=self.organization_id, **fields
+        )
+
+    def refresh(self, *nodes):
+        for node in nodes:
+            node.refresh_from_db()
+
+    def names(self, queryset):
+        return sorted(queryset.values_list("name", flat=True))
+
+    def test_paths_follow_the_parents(self):
+        self.assertEqual(
+            self.pens.path,
+            f"{self.root.auto_id}/{self.stationery.auto_id}/{self.pens.auto_id}/",
+        )
+        self.assertEqual(
+            self.names(self.stationery.get_descendants()), ["Pens", "Stationery"]
+        )
+        self.assertEqual(
+            self.names(self.pens.get_ancestors()), ["Primary", "Stationery"]
+        )
+
+    def test_moving_a_node_moves_its_subtree(self):
+        self.stationery.parent_group = self.food
+        self.stationery.save()
+        self.refresh(self.pens)
+
+        self.assertTrue(self.pens.path.startswith(self.food.path))
+        self.assertEqual(
+            self.names(self.food.get_descendants(include_self=False)),
+            ["Pens", "Stationery"],
+        )
+
+    def test_cycles_are_rejected(self):
+        self.assertTrue(self.stationery.creates_cycle(self.pens))
+        self.assertTrue(self.stationery.creates_cycle(self.stationery))
+        self.assertFalse(self.stationery.creates_cycle(self.food))
+
+        self.stationery.parent_group = self.pens
+        with self.assertRaises(ValidationError):
+            self.stationery.save()
+
+        serializer = StockGroupSerializer(
+            self.root, data={"parent_group": self.pens.id}, partial=True
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("parent_group", serializer.errors)
+
+    def test_item_list_filters_include_subgroups(self):
+        self.create(StockItem, name="Ball Pen", stock_group=self.pens)
+        self.create(StockItem, name="Notebook", stock_group=self.stationery)
+        self.create(StockItem, name="Rice", stock_group=self.food)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                "/api/v1/item/stock-item/", {"stock_group": str(self.stationery.id)}
+            )
+        # The items and their alternative units; the path is a subquery.
+        selects = [query for query in context if query["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 2)
+        invalid = self.client.get("/api/v1/item/stock-item/", {"stock_group": "x"})
+
+        self.assertEqual(
+            [row["name"] for row in response.json()["data"]], ["Ball Pen", "Notebook"]
+        )
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_rebuild_repairs_unsaved_moves(self):
+        main = self.create(Godown, name="Main")
+        cold = self.create(Godown, name="Cold Room")
+        Godown.objects.filter(pk=cold.pk).update(parent_godown=main)
+        StockGroup.objects.filter(pk=self.pens.pk).update(path="")
+
+        call_command("rebuild_hierarchy_paths", stdout=io.StringIO())
+        self.refresh(cold, self.pens)
+
+        self.assertEqual(cold.path, f"{main.auto_id}/{cold.auto_id}/")
+        self.assertTrue(self.pens.path.startswith(self.stationery.path))
@@ -0,0 +1,141 @@
+import io
+import uuid
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import Openingstock
+from apps.item.imports import import_stock_items, read_rows
+from apps.item.models import Brand, MeasurementUnit, StockGroup, StockItem, Tax
+from apps.item.search import search_stock_items
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+HEADER = (
+    "Name,Item Code,Brand,Stock Group,Unit,Tax,Selling Price,"
+    "Alternate Unit,Alternate Unit Conversion,Opening Quantity,Opening Rate\n"
+)
+
+
+def sheet(*lines):
+    return io.BytesIO((HEADER + "".join(f"{line}\n" for line in lines)).encode())
+
+
+class StockItemImportTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.nos = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.brand = self.create(Brand, name="Acme")
+        self.create(Tax, tax=18)
+
+    def create(self, model, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model), organization_id=self.organization_id, **fields
+        )
+
+    def run_import(self, file, **options):
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_stock_items(
+                read_rows(file, "items.csv"), self.organization_id, **options
+            )
+
+    def test_rows_are_imported_with_masters_units_and_opening_stock(self):
+        report = self.run_import(
+            sheet(
+                "Ball Pen,P-1,acme,,Nos,18%,10.50,Box,10,25,8",
+                "Pencil,P-2,ACME,,nos,,5,,,,",
+            )
+        )
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["error_count"], 0)
+        pen = StockItem.objects.get(item_code="P-1")
+        self.assertEqual(pen.brand, self.brand)
+        self.assertEqual(pen.unit, self.nos)
+        self.assertEqual(pen.tax.tax, 18)
+        self.assertEqual(pen.selling_price, Decimal("10.50"))
+        box = pen.alternative_units.get()
+        self.assertEqual((box.unit_value, box.related_unit), (self.box, self.nos))
+        self.assertEqual(box.related_unit_values, "10")
+        opening = Openingstock.objects.get(stock_item=pen)
+        self.assertEqual((opening.quantity, opening.amount), (25, Decimal("200.00")))
+        pencil = StockItem.objects.get(item_code="P-2")
+        self.assertEqual(
+            search_stock_items(self.organization_id, "pencil"), [pencil.id]
+        )
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        report = self.run_import(
+            sheet(
+                ",P-1,,,,,,,,,",
+                "Pen,P-2,Nobody,,,,abc,,,,",
+                "Pen,P-3,,,,,,Box,,,",
+                "Eraser,P-4,,,,,,,,,",
+            )
+        )
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(
+            {error["row"]: sorted(error["errors"]) for error in report["errors"]},
+            {
+                2: ["name"],
+                3: ["selling_price"],
+                4: ["alternate_unit_conversion", "unit"],
+            },
+        )
+        # A row with unknown masters only fails once its fields are valid.
+        report = self.run_import(sheet("Pen,P-2,Nobody,,,,,,,,"))
+        self.assertEqual(
+            report["errors"],
+            [{"row": 2, "errors": {"brand": ["Unknown brand 'Nobody'."]}}],
+        )
+
+    def test_missing_masters_can_be_created(self):
+        report = self.run_import(
+            sheet("Pen,P-1,Zenith,Stationery,Nos,,,,,,", "Ink,P-2,zenith,,,,,,,,"),
+            create_missing=True,
+        )
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["masters_created"], 2)
+        zenith = Brand.objects.get(name="Zenith")
+        self.assertEqual(zenith.items.count(), 2)
+        group = StockGroup.objects.get(name="Stationery")
+        self.assertEqual(group.path, f"{group.auto_id}/")
+
+    def test_queries_do_not_grow_with_the_rows(self):
+        lines = [
+            f"Item {index},C-{index},Acme,,Nos,18,1,Box,2,1,1" for index in range(200)
+        ]
+
+        with CaptureQueriesContext(connection) as small:
+            self.run_import(sheet(*lines[:10]), chunk_size=200)
+        with CaptureQueriesContext(connection) as large:
+            self.run_import(sheet(*lines[10:]), chunk_size=200)
+
+        self.assertEqual(StockItem.objects.count(), 200)
+        self.assertLessEqual(len(large), len(small))
+
+    def test_import_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+        upload = SimpleUploadedFile("items.csv", sheet("Pen,P-1,,,,,,,,,").read())
+
+        response = client.post(
+            "/api/v1/item/stock-item/import/", {"file": upload}, format="multipart"
+        )
+        invalid = client.post(
+            "/api/v1/item/stock-item/import/",
+            {"file": SimpleUploadedFile("items.pdf", b"%PDF")},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["created"], 1)
+        self.assertEqual(invalid.status_code, 400)
@@ -0,0 +1,66 @@
+import uuid
+
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.test import TestCase
+
+from apps.item.models import Brand, Godown, Rack, StockCategory, StockGroup, StockItem
+from apps.main.tests.explain import IndexUsageMixin
+
+
+class ItemIndexTest(IndexUsageMixin, TestCase):
+    organization_id = uuid.uuid4()
+
+    def test_item_list_reads_the_organization_in_name_order(self):
+        items = StockItem.objects.filter(organization_id=self.organization_id)
+        keyset = (
+            items.annotate(sort_name=Coalesce("name", Value("")))
+            .order_by("sort_name", "id")
+            .filter(sort_name__gt="Pen")
+        )
+
+        self.assertUsesIndex(items, "stock_item_org_name_idx")
+        self.assertUsesIndex(keyset, "stock_item_org_sort_name_idx")
+
+    def test_name_lists_are_read_by_organization(self):
+        # Godowns and racks share the index of their branch or godown lookups.
+        indexes = {
+            StockGroup: "stock_group_org_name_idx",
+            StockCategory: "stock_category_org_name_idx",
+            Brand: "brand_org_name_idx",
+            Godown: "godown_org_branch_idx",
+            Rack: "rack_org_godown_idx",
+        }
+        for model, index_name in indexes.items():
+            with self.subTest(model=model.__name__):
+                names = model.objects.filter(
+                    organization_id=str(self.organization_id)
+                ).values_list("id", "name")
+                self.assertUsesIndex(names, index_name)
+
+    def test_godowns_of_a_branch_and_racks_of_a_godown(self):
+        godowns = Godown.objects.filter(
+            organization_id=self.organization_id, branch="Main"
+        )
+        racks = Rack.objects.filter(
+            organization_id=self.organization_id, godown=uuid.uuid4()
+        )
+
+        self.assertUsesIndex(godowns, "godown_org_branch_idx")
+        self.assertUsesIndex(racks, "rack_org_godown_idx")
+
+    def test_trigram_index_is_declared_everywhere_but_built_on_postgresql(self):
+        index = next(
+            index
+            for index in StockItem._meta.indexes
+            if index.name == "stock_item_search_trgm"
+        )
+        editor = connection.schema_editor(collect_sql=True)
+        sql = str(index.create_sql(StockItem, editor))
+
+        if connection.vendor == "postgresql":
+            self.assertIn("gin_trgm_ops", sql)
+        else:
+            self.assertTrue(sql.startswith("--"))
+        self.assertEqual(index.clone().deconstruct(), index.deconstruct())
@@ -0,0 +1,92 @@
+import io
+import uuid
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.item.models import StockItem
+from apps.item.search import SEARCH_TABLE, ensure_search_index, search_stock_items
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class StockItemSearchTest(TestCase):
+    url = "/api/v1/item/stock-item/search/"
+
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.pencil = self.item("Pencil HB", item_code="PC-01", barcode="8901234500011")
+        self.pen = self.item("Ball Pen", alias="Pen blue")
+        self.paper = self.item("A4 Paper", secondary_language_name="Kadalas")
+
+    def item(self, name, organization_id=None, **fields):
+        return StockItem.objects.create(
+            auto_id=get_auto_id(StockItem),
+            name=name,
+            organization_id=organization_id or self.organization_id,
+            **fields,
+        )
+
+    def search(self, query, limit=20):
+        return search_stock_items(self.organization_id, query, limit)
+
+    def test_substring_matches_rank_closest_first(self):
+        self.assertEqual(self.search("pen")[:2], [self.pen.id, self.pencil.id])
+        self.assertEqual(self.search("kadal"), [self.paper.id])
+
+    def test_codes_and_barcodes_are_searched(self):
+        self.assertEqual(self.search("pc-01"), [self.pencil.id])
+        self.assertEqual(self.search("8901234500011"), [self.pencil.id])
+
+    def test_typos_still_find_the_item(self):
+        self.assertEqual(self.search("pencl")[0], self.pencil.id)
+        self.assertEqual(self.search("papre")[0], self.paper.id)
+
+    def test_short_queries_match_prefixes(self):
+        self.assertEqual(self.search("a4"), [self.paper.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.pen.name = "Gel Marker"
+        self.pen.alias = None
+        self.pen.save()
+        self.paper.delete()
+
+        self.assertEqual(self.search("marker"), [self.pen.id])
+        self.assertEqual(self.search("paper"), [])
+
+    def test_other_organizations_are_not_searched(self):
+        self.item("Pencil HB", organization_id=uuid.uuid4())
+
+        self.assertEqual(self.search("pencil hb"), [self.pencil.id])
+
+    def test_rebuild_picks_up_unsignalled_writes(self):
+        StockItem.objects.filter(pk=self.paper.pk).update(name="Notebook")
+        self.assertEqual(self.search("notebook"), [])
+
+        call_command("rebuild_item_search_index", stdout=io.StringIO())
+
+        self.assertEqual(self.search("notebook"), [self.paper.id])
+
+    def test_missing_search_table_is_created_and_filled(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {SEARCH_TABLE}")
+
+        ensure_search_index("default")
+        ensure_search_index("default")
+
+        self.assertEqual(self.search("kadal"), [self.paper.id])
+
+    def test_search_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+
+        response = client.get(self.url, {"q": "pencil", "limit": 5})
+        missing = client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["name"] for row in response.json()["data"]], ["Pencil HB"]
+        )
+        self.assertEqual(missing.status_code, 400)
@@ -0,0 +1,175 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.item.lookup import lookup_barcode
+from apps.item.models import AlternateUnits, Brand, MeasurementUnit, StockGroup, StockItem
+from apps.item.pricing import revise_prices
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class BulkPriceUpdateTest(TestCase):
+    url = "/api/v1/item/stock-item/bulk-price-update/"
+
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.nos = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.stationery = self.create(StockGroup, name="Stationery")
+        self.pens = self.create(StockGroup, name="Pens", parent_group=self.stationery)
+        self.acme = self.create(Brand, name="Acme")
+        self.pen = self.create(
+            StockItem,
+            name="Pen",
+            barcode="111",
+            stock_group=self.pens,
+            brand=self.acme,
+            selling_price=Decimal("10.00"),
+            cost_price=Decimal("8.00"),
+        )
+        self.pen_box = self.create(
+            AlternateUnits,
+            unit_value=self.box,
+            related_unit=self.nos,
+            related_unit_values="10",
+            selling_price=Decimal("95.00"),
+        )
+        self.pen.alternative_units.add(self.pen_box)
+        self.book = self.create(
+            StockItem, name="Book", stock_group=self.stationery, selling_price=Decimal("50.00")
+        )
+        self.rice = self.create(StockItem, name="Rice", selling_price=Decimal("40.00"))
+        self.unpriced = self.create(StockItem, name="Sample", stock_group=self.pens)
+
+    def create(self, model, **fields):
+        fields.setdefault("organization_id", self.organization_id)
+        return model.objects.create(auto_id=get_auto_id(model), **fields)
+
+    def price(self, record, field="selling_price"):
+        record.refresh_from_db()
+        return getattr(record, field)
+
+    def revise(self, **revision):
+        with self.captureOnCommitCallbacks(execute=True):
+            return revise_prices(self.organization_id, **revision)
+
+    def test_percentage_rule_covers_subtree_and_alternate_units(self):
+        summary = self.revise(
+            rules=[
+                {
+                    "field": "selling_price",
+                    "method": "percentage",
+                    "value": Decimal("10"),
+                    "stock_group": self.stationery.id,
+                }
+            ],
+            effective_date=date(2026, 11, 1),
+        )
+
+        self.assertEqual(summary["items_updated"], 2)
+        self.assertEqual(summary["alternate_units_updated"], 1)
+        self.assertEqual(self.price(self.pen), Decimal("11.00"))
+        self.assertEqual(self.price(self.book), Decimal("55.00"))
+        self.assertEqual(self.price(self.pen_box), Decimal("104.50"))
+        self.assertEqual(self.price(self.rice), Decimal("40.00"))
+        self.assertIsNone(self.price(self.unpriced))
+        self.assertEqual(self.pen.selling_price_applicable_date, date(2026, 11, 1))
+
+    def test_amounts_scale_with_the_conversion_and_stop_at_zero(self):
+        self.revise(
+            rules=[
+                {
+                    "field": "selling_price",
+                    "method": "amount",
+                    "value": Decimal("-0.50"),
+                    "brand": self.acme.id,
+                },
+                {
+                    "field": "selling_price",
+                    "method": "amount",
+                    "value": Decimal("-100"),
+                    "items": [self.rice.id],
+                    "alternate_units": False,
+                },
+            ]
+        )
+
+        self.assertEqual(self.price(self.pen), Decimal("9.50"))
+        self.assertEqual(self.price(self.pen_box), Decimal("90.00"))
+        self.assertEqual(self.price(self.rice), Decimal("0.00"))
+
+    def test_explicit_prices(self):
+        stranger = StockItem.objects.create(
+            auto_id=get_auto_id(StockItem), name="Other", organization_id=uuid.uuid4()
+        )
+
+        summary = self.revise(
+            prices=[
+                {"item": self.pen.id, "cost_price": Decimal("7.25")},
+                {"item": self.book.id, "selling_price": Decimal("60")},
+                {"alternate_unit": self.pen_box.id, "cost_price": Decimal("70")},
+                {"item": stranger.id, "selling_price": Decimal("1")},
+            ]
+        )
+
+        self.assertEqual(summary["prices"]["items"], 2)
+        self.assertEqual(summary["prices"]["not_found"], [str(stranger.id)])
+        self.assertEqual(self.price(self.pen, "cost_price"), Decimal("7.25"))
+        self.assertEqual(self.price(self.pen), Decimal("10.00"))
+        self.assertEqual(self.pen.cost_price_applicable_date, timezone.localdate())
+        self.assertEqual(self.price(self.book), Decimal("60.00"))
+        self.assertIsNone(self.book.cost_price_applicable_date)
+        self.assertEqual(self.price(self.pen_box, "cost_price"), Decimal("70.00"))
+        self.assertIsNone(self.price(stranger))
+
+    def test_queries_do_not_grow_with_the_items(self):
+        rule = {"field": "cost_price", "method": "percentage", "value": Decimal("5")}
+        with CaptureQueriesContext(connection) as few:
+            self.revise(rules=[rule])
+        for index in range(50):
+            self.create(StockItem, name=f"Item {index}", cost_price=Decimal("1"))
+        with CaptureQueriesContext(connection) as many:
+            self.revise(rules=[rule])
+
+        self.assertEqual(len(many), len(few))
+
+    def test_barcode_lookups_see_the_new_price(self):
+        self.assertEqual(
+            lookup_barcode(self.organization_id, "111")["selling_price"], Decimal("10.00")
+        )
+
+        self.revise(prices=[{"item": self.pen.id, "selling_price": Decimal("12")}])
+
+        self.assertEqual(
+            lookup_barcode(self.organization_id, "111")["selling_price"], Decimal("12.00")
+        )
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=UserProxy(uuid.uuid4(), self.organization_id))
+
+        response = client.post(
+            self.url,
+            {"rules": [{"field": "selling_price", "method": "fixed", "value": "5"}]},
+            format="json",
+        )
+        invalid = client.post(
+            self.url,
+            {"prices": [{"alternate_unit": str(self.pen_box.id), "standard_rate": "1"}]},
+            format="json",
+        )
+        empty = client.post(self.url, {}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["items_updated"], 4)
+        self.assertEqual(self.price(self.unpriced), Decimal("5.00"))
+        self.assertEqual(self.price(self.pen_box), Decimal("50.00"))
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(empty.status_code, 400)
@@ -0,0 +1,116 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import Openingstock, StockReport
+from apps.item.models import AlternateUnits, Godown, MeasurementUnit, StockItem, Tax
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.unit = self.create(MeasurementUnit, name="Nos")
+        self.tax = self.create(Tax, tax=18)
+        self.godown = self.create(Godown, name="Main")
+        for index in range(5):
+            item = self.create(
+                StockItem,
+                name=f"Item {index}",
+                unit=self.unit,
+                tax=self.tax,
+                selling_price=10 + index,
+                description="A long description",
+            )
+            item.alternative_units.add(
+                self.create(AlternateUnits, alternative_unit="Box", unit_value=self.unit)
+            )
+            self.create(Openingstock, stock_item=item, quantity=1)
+            StockReport.objects.create(
+                organization_id=self.organization_id,
+                item=item,
+                godown=self.godown,
+                closing_balance=4,
+            )
+        self.item = item
+
+    def create(self, model, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model), organization_id=self.organization_id, **fields
+        )
+
+    def get(self, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data)
+        selects = [query["sql"] for query in context if query["sql"].startswith("SELECT")]
+        return response, selects
+
+    def test_list_loads_only_the_fields_asked_for(self):
+        response, selects = self.get("/api/v1/item/stock-item/", {"fields": "id,name"})
+        _, full = self.get("/api/v1/item/stock-item/")
+
+        rows = response.json()["data"]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(set(rows[0]), {"id", "name"})
+        self.assertEqual(len(selects), len(full) - 1)
+        self.assertNotIn("description", selects[-1])
+
+    def test_named_projection(self):
+        response, _ = self.get("/api/v1/item/stock-item/", {"projection": "pos"})
+
+        self.assertEqual(
+            set(response.json()["data"][0]),
+            {"id", "name", "barcode", "unit", "tax", "selling_price", "standard_rate"},
+        )
+
+    def test_unknown_fields_and_projections_are_rejected(self):
+        fields, _ = self.get("/api/v1/item/stock-item/", {"fields": "id,secret"})
+        projection, _ = self.get("/api/v1/item/stock-item/", {"projection": "nope"})
+        retrieve, _ = self.get(
+            f"/api/v1/item/stock-item/{self.item.id}/", {"fields": "secret"}
+        )
+
+        self.assertEqual(fields.status_code, 400)
+        self.assertIn("secret", fields.json()["error"]["fields"][0])
+        self.assertEqual(projection.status_code, 400)
+        self.assertEqual(retrieve.status_code, 400)
+
+    def test_retrieve_follows_related_fields(self):
+        url = f"/api/v1/item/stock-item/{self.item.id}/"
+        response, selects = self.get(url, {"fields": "name,unit_name,alternative_units"})
+        _, names = self.get(url, {"fields": "name"})
+
+        data = response.json()["data"]
+        self.assertEqual(set(data), {"name", "unit_name", "alternative_units"})
+        self.assertEqual(data["unit_name"], "Nos")
+        self.assertEqual(data["alternative_units"][0]["unit_value_name"], "Nos")
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(len(names), 1)
+
+    def test_sales_list_reads_tax_with_the_items(self):
+        response, selects = self.get(
+            "/api/v1/item/stock-items/sales/", {"fields": "name,tax_amount"}
+        )
+
+        rows = response.json()["results"]
+        self.assertEqual(set(rows[0]), {"name", "tax_amount"})
+        self.assertEqual({row["tax_amount"] for row in rows}, {18})
+        # The count and one page of items with their tax.
+        self.assertEqual(len(selects), 2)
+
+    def test_detailed_list_keeps_quantities(self):
+        response, _ = self.get(
+            "/api/v1/item/stock-items/detailed/", {"fields": "name,quantity"}
+        )
+
+        rows = response.json()["results"]
+        self.assertEqual(set(rows[0]), {"name", "quantity"})
+        self.assertEqual({row["quantity"] for row in rows}, {4})
@@ -0,0 +1,124 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import Openingstock
+from apps.item.models import (
+    AlternateUnits,
+    Brand,
+    Kitchen,
+    MeasurementUnit,
+    StockCategory,
+    StockGroup,
+    StockItem,
+    Tax,
+)
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class StockItemListQueryTest(TestCase):
+    url = "/api/v1/item/stock-item/"
+
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.unit = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.brand = self.create(Brand, name="Acme")
+        self.group = self.create(StockGroup, name="Stationery")
+        self.category = self.create(StockCategory, name="Office")
+        self.tax = self.create(Tax, tax=18)
+        self.kitchen = self.create(Kitchen, name="Main")
+
+    def create(self, model, **fields):
+        return model.objects.create(auto_id=get_auto_id(model), **fields)
+
+    def create_items(self, count):
+        for _ in range(count):
+            item = self.create(
+                StockItem,
+                name=f"Item {StockItem.objects.count():03d}",
+                organization_id=self.organization_id,
+                unit=self.unit,
+                brand=self.brand,
+                stock_group=self.group,
+                stock_category=self.category,
+                tax=self.tax,
+                kitchen=self.kitchen,
+            )
+            for _ in range(2):
+                item.alternative_units.add(
+                    self.create(
+                        AlternateUnits,
+                        alternative_unit="Box",
+                        unit_value=self.box,
+                        related_unit=self.unit,
+                    )
+                )
+            self.create(
+                Openingstock,
+                organization_id=self.organization_id,
+                stock_item=item,
+                quantity=5,
+            )
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_list_page_costs_the_same_for_any_page_size(self):
+        self.create_items(120)
+
+        small, _ = self.count_queries(self.url, {"page_size": 5})
+        large, body = self.count_queries(self.url, {"page_size": 100})
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(body["data"]), 100)
+        self.assertEqual(len(body["data"][0]["alternative_units"]), 2)
+
+    def test_cursor_walks_every_item_once(self):
+        self.create_items(7)
+        StockItem.objects.filter(name="Item 003").update(name=None)
+
+        seen = []
+        params = {"page_size": 3}
+        while True:
+            _, body = self.count_queries(self.url, params)
+            seen += [row["id"] for row in body["data"]]
+            if not body["next_cursor"]:
+                break
+            params["cursor"] = body["next_cursor"]
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_retrieve_does_not_query_per_relation(self):
+        self.create_items(1)
+        item = StockItem.objects.get()
+
+        queries, body = self.count_queries(f"{self.url}{item.id}/")
+
+        # SAVEPOINT/RELEASE of the request, the item with its foreign keys,
+        # and one query per prefetched relation.
+        self.assertEqual(queries, 5)
+        self.assertEqual(body["data"]["brand_name"], "Acme")
+        self.assertEqual(body["data"]["alternative_units"][0]["unit_value_name"], "Box")
+        self.assertEqual(body["data"]["opening_balance"]["quantity"], 5)
+
+    def test_items_of_other_organizations_are_hidden(self):
+        other = self.create(StockItem, name="Other", organization_id=uuid.uuid4())
+
+        _, body = self.count_queries(self.url)
+        response = self.client.get(f"{self.url}{other.id}/")
+
+        self.assertEqual(body["data"], [])
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,117 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import StockReport
+from apps.item.models import AlternateUnits, Godown, MeasurementUnit, StockItem, Tax
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class StockQuantityTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.main = self.create(Godown, name="Main")
+        self.store = self.create(Godown, name="Store")
+        self.unit = self.create(MeasurementUnit, name="Nos")
+        self.tax = self.create(Tax, tax=5)
+
+    def create(self, model, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model), organization_id=self.organization_id, **fields
+        )
+
+    def create_items(self, count, start=0):
+        for index in range(start, start + count):
+            item = self.create(
+                StockItem,
+                name=f"Item {index:03}",
+                godown=self.main,
+                unit=self.unit,
+                tax=self.tax,
+            )
+            item.alternative_units.add(self.create(AlternateUnits, alternative_unit="Box"))
+            for godown, balance in ((self.main, 10), (self.store, 5)):
+                StockReport.objects.create(
+                    organization_id=self.organization_id,
+                    item=item,
+                    godown=godown,
+                    closing_balance=balance,
+                )
+
+    def get(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data)
+        selects = [query for query in context if query["sql"].startswith("SELECT")]
+        return response, len(selects)
+
+    def assertConstantQueries(self, method, url, data=None, quantities=None):
+        self.create_items(2)
+        few, few_queries = self.get(method, url, data)
+        self.create_items(8, start=2)
+        many, many_queries = self.get(method, url, data)
+
+        self.assertEqual(few.status_code, 200)
+        self.assertEqual(many_queries, few_queries)
+        return many
+
+    def test_godown_items_show_the_godown_quantity(self):
+        response = self.assertConstantQueries(
+            "post", "/api/v1/item/godown-items/", {"godown": str(self.main.id)}
+        )
+
+        self.assertEqual(len(response.json()), 10)
+        self.assertEqual({row["quantity"] for row in response.json()}, {10})
+        self.assertEqual(response.json()[0]["unit_name"], "Nos")
+
+    def test_unit_list_sums_the_godowns(self):
+        response = self.assertConstantQueries(
+            "get", "/api/v1/item/stock-items-units/", {"page_size": 50}
+        )
+
+        rows = response.json()["results"]
+        self.assertEqual({row["quantity"] for row in rows}, {15})
+
+    def test_sales_purchase_list_per_godown(self):
+        url = "/api/v1/item/stock-items/detailed/"
+        response = self.assertConstantQueries(
+            "get", url, {"godown": str(self.store.id), "page_size": 50}
+        )
+        invalid, _ = self.get("get", url, {"godown": "x"})
+
+        self.assertEqual({row["quantity"] for row in response.json()["results"]}, {5})
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_items_without_stock_have_none(self):
+        self.create(StockItem, name="New")
+
+        response, _ = self.get("get", "/api/v1/item/stock-items/detailed/")
+
+        self.assertEqual(response.json()["results"][0]["quantity"], 0.0)
+
+    def test_stock_of_other_organizations_is_not_counted(self):
+        self.create_items(1)
+        item = StockItem.objects.get(name="Item 000")
+        foreign = Godown.objects.create(
+            auto_id=get_auto_id(Godown), organization_id=uuid.uuid4(), name="Theirs"
+        )
+        StockReport.objects.create(
+            organization_id=foreign.organization_id,
+            item=item,
+            godown=foreign,
+            closing_balance=100,
+        )
+        url = "/api/v1/item/stock-items/detailed/"
+
+        summed, _ = self.get("get", url)
+        theirs, _ = self.get("get", url, {"godown": str(foreign.id)})
+
+        self.assertEqual(summed.json()["results"][0]["quantity"], 15)
+        self.assertEqual(theirs.json()["results"][0]["quantity"], 0.0)
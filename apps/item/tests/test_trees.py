@@ -0,0 +1,107 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.item.models import Godown, Rack, StockCategory, StockGroup
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class TreeTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+
+    def create(self, model, organization_id=None, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return model.objects.create(
+                auto_id=get_auto_id(model),
+                organization_id=organization_id or self.organization_id,
+                **fields,
+            )
+
+    def tree(self, path):
+        response = self.client.get(f"/api/v1/item/{path}/tree/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def names(self, nodes):
+        return [(node["name"], self.names(node["children"])) for node in nodes]
+
+    def test_category_tree_is_read_in_one_query(self):
+        food = self.create(StockCategory, name="Food")
+        for name in ["Fruit", "Vegetables"]:
+            child = self.create(StockCategory, name=name, parent_category=food)
+            for index in range(3):
+                self.create(
+                    StockCategory, name=f"{name} {index}", parent_category=child
+                )
+        self.create(StockCategory, name="Drinks")
+        self.create(StockCategory, name="Other", organization_id=uuid.uuid4())
+
+        with CaptureQueriesContext(connection) as queries:
+            tree = self.tree("stock-category")
+
+        selects = [query for query in queries if query["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(
+            self.names(tree),
+            [
+                (
+                    "Food",
+                    [
+                        ("Fruit", [("Fruit 0", []), ("Fruit 1", []), ("Fruit 2", [])]),
+                        (
+                            "Vegetables",
+                            [
+                                ("Vegetables 0", []),
+                                ("Vegetables 1", []),
+                                ("Vegetables 2", []),
+                            ],
+                        ),
+                    ],
+                ),
+                ("Drinks", []),
+            ],
+        )
+        self.assertEqual(tree[0]["children"][0]["parent_category_name"], "Food")
+
+    def test_cached_tree_follows_node_writes(self):
+        root = self.create(StockGroup, name="Primary")
+        child = self.create(StockGroup, name="Stationery", parent_group=root)
+        self.assertEqual(
+            self.names(self.tree("stock-group")), [("Primary", [("Stationery", [])])]
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.tree("stock-group")
+        self.assertFalse(
+            [query for query in queries if query["sql"].startswith("SELECT")]
+        )
+
+        child.name = "Office"
+        with self.captureOnCommitCallbacks(execute=True):
+            child.save()
+        self.assertEqual(
+            self.names(self.tree("stock-group")), [("Primary", [("Office", [])])]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            root.delete()
+        self.assertEqual(self.tree("stock-group"), [])
+
+    def test_rack_tree(self):
+        godown = self.create(Godown, name="Main")
+        aisle = self.create(Rack, name="Aisle 1", godown=godown)
+        self.create(Rack, name="Shelf A", godown=godown, parent_rack=aisle)
+
+        tree = self.tree("rack")
+
+        self.assertEqual(self.names(tree), [("Aisle 1", [("Shelf A", [])])])
+        self.assertEqual(tree[0]["godown"], str(godown.id))
@@ -0,0 +1,195 @@
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.inventory.models import InventoryTransaction, StockReport
+from apps.item.models import AlternateUnits, Godown, MeasurementUnit, StockItem
+from apps.item.units import ConversionError, ConversionGraph, conversion_graphs
+from apps.main.functions import get_auto_id
+from apps.main.utils import UserProxy
+
+
+class ConversionGraphTest(TestCase):
+    def test_factors_chain_through_related_units(self):
+        nos, box, carton, kg = (uuid.uuid4() for _ in range(4))
+        graph = ConversionGraph.build(
+            nos,
+            [
+                (box, nos, "12"),
+                (carton, box, "10"),
+                (kg, uuid.uuid4(), "1"),
+                (uuid.uuid4(), nos, "abc"),
+            ],
+        )
+
+        self.assertEqual(graph.factor(carton), 120)
+        self.assertEqual(graph.to_base(2, box), 24)
+        self.assertEqual(graph.convert(60, nos, carton), Decimal("0.5"))
+        self.assertEqual(graph.convert(3, carton, box), 30)
+        self.assertEqual(graph.factor(None), 1)
+        with self.assertRaises(ConversionError):
+            graph.factor(kg)
+
+
+class UnitConversionTest(TestCase):
+    def setUp(self):
+        self.organization_id = uuid.uuid4()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProxy(uuid.uuid4(), self.organization_id)
+        )
+        self.nos = self.create(MeasurementUnit, name="Nos")
+        self.box = self.create(MeasurementUnit, name="Box")
+        self.kg = self.create(MeasurementUnit, name="Kg")
+        self.godown = self.create(Godown, name="Main")
+        self.item = self.create(StockItem, name="Pen", unit=self.nos)
+        self.box_unit = self.create(
+            AlternateUnits,
+            alternative_unit="Box",
+            unit_value=self.box,
+            related_unit=self.nos,
+            related_unit_values="12",
+        )
+        self.item.alternative_units.add(self.box_unit)
+
+    def create(self, model, **fields):
+        return model.objects.create(
+            auto_id=get_auto_id(model), organization_id=self.organization_id, **fields
+        )
+
+    def post(self, quantity, unit, **fields):
+        fields.setdefault("item", self.item)
+        return InventoryTransaction.objects.create(
+            organization_id=self.organization_id,
+            unit=unit,
+            godown=self.godown,
+            quantity=quantity,
+            transaction_type="Inbound",
+            **fields,
+        )
+
+    def balance(self):
+        return StockReport.objects.get(item=self.item, godown=self.godown).closing_balance
+
+    def test_postings_are_kept_in_the_base_unit(self):
+        transaction = self.post(2, self.box, rate=Decimal("100"))
+        self.post(5, self.nos)
+
+        transaction.refresh_from_db()
+        self.assertEqual((transaction.quantity, transaction.unit), (24, self.nos))
+        self.assertEqual(
+            (transaction.entered_quantity, transaction.entered_unit), (2, self.box)
+        )
+        self.assertEqual(transaction.priced_quantity, 2)
+        self.assertEqual(self.balance(), 29)
+
+        # Editing the base quantity drops what was entered.
+        transaction.quantity = 10
+        transaction.save()
+        self.assertIsNone(transaction.entered_unit_id)
+        self.assertEqual(self.balance(), 15)
+
+    def test_inverse_factors_that_do_not_terminate(self):
+        # Stocked in boxes of 7: a Nos is 1/7 Box, which no decimal holds.
+        item = self.create(StockItem, name="Crayons", unit=self.box)
+        item.alternative_units.add(
+            self.create(
+                AlternateUnits,
+                alternative_unit="Box",
+                unit_value=self.box,
+                related_unit=self.nos,
+                related_unit_values="7",
+            )
+        )
+
+        transaction = self.post(14, self.nos, item=item)
+
+        self.assertEqual((transaction.quantity, transaction.unit), (2, self.box))
+        self.assertEqual(
+            StockReport.objects.get(item=item).closing_balance, 2
+        )
+        with self.assertRaises(ValidationError):
+            self.post(10, self.nos, item=item)
+
+    def test_units_that_do_not_convert_are_rejected(self):
+        with self.assertRaises(ValidationError) as unknown:
+            self.post(1, self.kg)
+        self.box_unit.related_unit_values = "2.5"
+        self.box_unit.save()
+        with self.assertRaises(ValidationError) as fraction:
+            self.post(1, self.box)
+
+        self.assertIn("unit", unknown.exception.message_dict)
+        self.assertIn("quantity", fraction.exception.message_dict)
+        self.assertFalse(StockReport.objects.exists())
+
+    def test_graphs_are_cached_until_units_change(self):
+        graphs = conversion_graphs(self.organization_id, [self.item.id])
+        with CaptureQueriesContext(connection) as context:
+            cached = conversion_graphs(self.organization_id, [self.item.id])
+
+        self.assertEqual(len(context), 0)
+        self.assertEqual(cached[str(self.item.id)].factor(self.box.id), 12)
+        self.assertEqual(graphs.keys(), cached.keys())
+        self.assertEqual(conversion_graphs(uuid.uuid4(), [self.item.id]), {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.box_unit.related_unit_values = "6"
+            self.box_unit.save()
+        graph = conversion_graphs(self.organization_id, [self.item.id])
+        self.assertEqual(graph[str(self.item.id)].factor(self.box.id), 6)
+
+    def test_convert_endpoint(self):
+        response = self.client.post(
+            "/api/v1/item/units/convert/",
+            {
+                "conversions": [
+                    {"item": str(self.item.id), "quantity": "30", "to_unit": str(self.box.id)},
+                    {"item": str(self.item.id), "quantity": "1", "from_unit": str(self.box.id)},
+                    {"item": str(self.item.id), "quantity": "1", "from_unit": str(self.kg.id)},
+                    {"item": str(uuid.uuid4()), "quantity": "1"},
+                ]
+            },
+            format="json",
+        )
+        invalid = self.client.post(
+            "/api/v1/item/units/convert/", {"conversions": []}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()["data"]
+        self.assertEqual([row.get("converted") for row in rows], [2.5, 12, None, None])
+        self.assertEqual(rows[3]["error"], "Unknown item.")
+        self.assertIn("error", rows[2])
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_stock_endpoint(self):
+        self.post(3, self.box)
+        self.post(6, self.nos)
+
+        response = self.client.post(
+            "/api/v1/item/units/stock/",
+            {
+                "items": [
+                    {"item": str(self.item.id), "unit": str(self.box.id)},
+                    {"item": str(self.item.id)},
+                ],
+                "godown": str(self.godown.id),
+            },
+            format="json",
+        )
+
+        rows = response.json()["data"]
+        self.assertEqual([row["quantity"] for row in rows], [3.5, 42])
+        self.assertEqual(rows[0]["base_quantity"], 42)
+
+    def test_unit_lists_carry_the_conversion(self):
+        response = self.client.get("/api/v1/item/stock-items-units/")
+
+        units = response.json()["results"][0]["unit_details"]["alternative_units"]
+        self.assertEqual([unit["conversion"] for unit in units], [12.0, 1.0])
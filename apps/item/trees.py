@@ -0,0 +1,65 @@
+"""
+Stock group, stock category and rack trees.
+
+An organization's whole hierarchy is read in one query and linked in
+memory; the tree serializers take the parent and children of a node from
+the serializer context instead of querying per node. The rendered tree is
+cached per organization and invalidated by any write to a node.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from apps.main.functions import bump_cache_version_on_commit, versioned_cache_key
+
+
+TREE_CACHE_TIMEOUT = 60 * 60
+
+
+def tree_cache_namespace(model):
+    return f"tree:{model._meta.db_table}"
+
+
+def tree_context(nodes, parent_field):
+    """
+    Serializer context linking ``nodes`` by ``parent_field``.
+
+    ``nodes`` maps an id to its node and ``children`` a node's id (``None``
+    for the roots) to its child nodes, in the order they were read.
+    """
+    parent_attname = f"{parent_field}_id"
+    by_id = {}
+    children = defaultdict(list)
+    for node in nodes:
+        by_id[node.pk] = node
+        children[getattr(node, parent_attname)].append(node)
+    return {"nodes": by_id, "children": children}
+
+
+def render_tree(queryset, parent_field, serializer_class):
+    """
+    Serialize the root nodes of ``queryset`` with their descendants,
+    siblings in the order they were created.
+    """
+    context = tree_context(list(queryset.order_by("auto_id")), parent_field)
+    roots = context["children"].get(None, [])
+    return serializer_class(roots, many=True, context=context).data
+
+
+def cached_tree(organization_id, queryset, parent_field, serializer_class):
+    key = versioned_cache_key(
+        tree_cache_namespace(queryset.model), organization_id, serializer_class.__name__
+    )
+    tree = cache.get(key)
+    if tree is None:
+        tree = list(render_tree(queryset, parent_field, serializer_class))
+        cache.set(key, tree, TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def forget_trees_on_commit(model, organization_ids):
+    """Invalidate the cached trees of ``model`` after a node write."""
+    bump_cache_version_on_commit(
+        tree_cache_namespace(model),
+        [organization_id for organization_id in organization_ids if organization_id],
+    )
@@ -0,0 +1,209 @@
+"""
+Conversions between the units of a stock item.
+
+An item is stocked in its base ``unit``; each of its ``AlternateUnits``
+says that one ``unit_value`` is ``related_unit_values`` of
+``related_unit``. A ``ConversionGraph`` parses those factors once and
+walks them from the base unit, so it knows every reachable unit as a
+number of base units and a conversion is a single multiplication.
+
+Graphs are kept in the shared cache, versioned per organization and moved
+to a new version after any item or alternate unit write, and in a small
+in-process LRU in front of it keyed by that version. Stock postings build
+their graphs from the database instead, as a write earlier in the same
+transaction is not yet reflected in the cache.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+
+from apps.item.models import StockItem
+from apps.main.functions import bump_cache_version_on_commit, get_cache_version
+
+
+UNIT_GRAPH_CACHE = "unit-graph"
+UNIT_GRAPH_CACHE_TIMEOUT = 60 * 60
+LOCAL_CACHE_SIZE = 10000
+QUANTITY_PRECISION = Decimal("0.000001")
+
+
+class ConversionError(ValueError):
+    pass
+
+
+def parse_factor(value):
+    """The positive number stored in ``related_unit_values``, or ``None``."""
+    try:
+        factor = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError):
+        return None
+    return factor if factor.is_finite() and factor > 0 else None
+
+
+def round_quantity(quantity):
+    """``quantity`` to ``QUANTITY_PRECISION``, without trailing zeros."""
+    quantity = quantity.quantize(QUANTITY_PRECISION)
+    if quantity == quantity.to_integral_value():
+        return quantity.quantize(Decimal(1))
+    return quantity.normalize()
+
+
+def _key(unit_id):
+    return str(unit_id) if unit_id else None
+
+
+class ConversionGraph:
+    """The units of one item, each as a number of base units."""
+
+    def __init__(self, base_unit_id, factors=None):
+        self.base_unit_id = _key(base_unit_id)
+        self.factors = factors or {}
+        if self.base_unit_id:
+            self.factors[self.base_unit_id] = Decimal(1)
+
+    @classmethod
+    def build(cls, base_unit_id, edges):
+        """
+        ``edges`` are ``(unit_id, related_unit_id, factor)`` triples, one
+        ``unit_id`` being ``factor`` ``related_unit_id``. Units not linked
+        to the base unit, and factors that do not parse, are left out; when
+        two paths disagree the shorter one wins.
+        """
+        graph = cls(base_unit_id)
+        links = defaultdict(list)
+        for unit_id, related_unit_id, factor in edges:
+            factor = parse_factor(factor)
+            unit_id, related_unit_id = _key(unit_id), _key(related_unit_id)
+            if factor is None or not unit_id or not related_unit_id:
+                continue
+            links[related_unit_id].append((unit_id, factor))
+            links[unit_id].append((related_unit_id, 1 / factor))
+
+        pending = [graph.base_unit_id] if graph.base_unit_id else []
+        while pending:
+            reached = []
+            for unit_id in pending:
+                for other_id, factor in links[unit_id]:
+                    if other_id not in graph.factors:
+                        graph.factors[other_id] = graph.factors[unit_id] * factor
+                        reached.append(other_id)
+            pending = reached
+        return graph
+
+    @classmethod
+    def for_item(cls, item):
+        """The graph of ``item`` from its (ideally prefetched) alternate units."""
+        return cls.build(
+            item.unit_id,
+            (
+                (unit.unit_value_id, unit.related_unit_id, unit.related_unit_values)
+                for unit in item.alternative_units.all()
+            ),
+        )
+
+    def factor(self, unit_id):
+        """Base units in one ``unit_id``; no unit means the base unit."""
+        if not unit_id:
+            return Decimal(1)
+        try:
+            return self.factors[_key(unit_id)]
+        except KeyError:
+            raise ConversionError(f"Unit {unit_id} does not convert to the item's unit.")
+
+    def to_base(self, quantity, unit_id):
+        return Decimal(quantity) * self.factor(unit_id)
+
+    def convert(self, quantity, from_unit_id, to_unit_id=None):
+        return self.to_base(quantity, from_unit_id) / self.factor(to_unit_id)
+
+
+def load_conversion_graphs(item_ids):
+    """``{item_id: ConversionGraph}`` built from the database in two queries."""
+    base_units = dict(
+        StockItem.objects.filter(pk__in=item_ids).values_list("id", "unit_id")
+    )
+    edges = defaultdict(list)
+    links = StockItem.alternative_units.through.objects.filter(
+        stockitem_id__in=base_units
+    ).values_list(
+        "stockitem_id",
+        "alternateunits__unit_value_id",
+        "alternateunits__related_unit_id",
+        "alternateunits__related_unit_values",
+    )
+    for item_id, *edge in links:
+        edges[item_id].append(edge)
+    return {
+        item_id: ConversionGraph.build(unit_id, edges[item_id])
+        for item_id, unit_id in base_units.items()
+    }
+
+
+class _LocalGraphs:
+    """Thread-safe LRU of versioned key -> graph; entries never go stale."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        with self._lock:
+            found = {}
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            return found
+
+    def set_many(self, entries):
+        with self._lock:
+            self._entries.update(entries)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_local_graphs = _LocalGraphs(LOCAL_CACHE_SIZE)
+
+
+def conversion_graphs(organization_id, item_ids):
+    """
+    ``{str(item_id): ConversionGraph}`` for the items of one organization,
+    from the caches where possible. Unknown items are left out.
+    """
+    version = get_cache_version(UNIT_GRAPH_CACHE, organization_id)
+    keys = {
+        f"{UNIT_GRAPH_CACHE}:{organization_id}:v{version}:{item_id}": item_id
+        for item_id in {_key(item_id) for item_id in item_ids}
+    }
+    found = _local_graphs.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        shared = cache.get_many(missing)
+        found.update(shared)
+        missing = [key for key in missing if key not in shared]
+    if missing:
+        loaded = {
+            str(item_id): graph
+            for item_id, graph in load_conversion_graphs(
+                StockItem.objects.filter(
+                    organization_id=organization_id,
+                    pk__in=[keys[key] for key in missing],
+                ).values("pk")
+            ).items()
+        }
+        entries = {key: loaded[keys[key]] for key in missing if keys[key] in loaded}
+        cache.set_many(entries, UNIT_GRAPH_CACHE_TIMEOUT)
+        found.update(entries)
+    _local_graphs.set_many(found)
+    return {keys[key]: graph for key, graph in found.items()}
+
+
+def forget_unit_graphs_on_commit(organization_ids):
+    """Move organizations to new graph versions once the write commits."""
+    bump_cache_version_on_commit(
+        UNIT_GRAPH_CACHE,
+        [organization_id for organization_id in organization_ids if organization_id],
+    )
@@ -0,0 +1,93 @@
+"""
+Conditional GET for per-organization master data.
+
+Every master model has a cache version per organization, bumped after each
+committed write. A response decorated with ``conditional_by_organization``
+is identified by the versions of the models it reads: the ETag is derived
+from them, a client presenting it gets a 304, and other clients get the
+payload cached under it. A request that finds its answer this way costs
+cache reads only.
+"""
+import functools
+import hashlib
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.main.functions import bump_cache_version_on_commit, get_cache_version
+
+
+CONDITIONAL_CACHE_TIMEOUT = 60 * 60
+
+
+def master_cache_namespace(model):
+    return f"master:{model._meta.db_table}"
+
+
+def forget_master_data_on_commit(model, organization_ids):
+    """Change the ETags of the responses reading ``model`` after commit."""
+    bump_cache_version_on_commit(
+        master_cache_namespace(model),
+        [organization_id for organization_id in organization_ids if organization_id],
+    )
+
+
+def conditional_by_organization(*models, timeout=CONDITIONAL_CACHE_TIMEOUT):
+    """
+    Serve a GET function view through ETags and a shared-cache copy of its
+    200 responses. ``models`` are every model the response reads; the view
+    must only read rows of the requesting user's organization.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            organization_id = request.user.fk_organization
+            versions = [
+                get_cache_version(master_cache_namespace(model), organization_id)
+                for model in models
+            ]
+            identity = (
+                view.__module__,
+                view.__qualname__,
+                request.build_absolute_uri(),
+                versions,
+            )
+            digest = hashlib.sha1(repr(identity).encode()).hexdigest()
+            etag = f'"{digest}"'
+            key = f"conditional:{organization_id}:{digest}"
+
+            cached = cache.get(key)
+            not_modified = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=cached["last_modified"] if cached else None,
+            )
+            if not_modified is not None:
+                not_modified["ETag"] = etag
+                return not_modified
+
+            if cached is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = {
+                    "data": response.data,
+                    "last_modified": int(now().timestamp()),
+                }
+                cache.set(key, cached, timeout)
+
+            response = Response(cached["data"], status=status.HTTP_200_OK)
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(cached["last_modified"])
+            # Clients may keep the copy but must revalidate it.
+            response["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapped
+
+    return decorator
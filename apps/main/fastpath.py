@@ -0,0 +1,206 @@
+"""
+Read-only list rendering straight from ``QuerySet.values_list()``.
+
+Serializing a list with a ``ModelSerializer`` builds a model instance per
+row and walks every serializer field for it, which is most of the time a
+large list takes. A ``ValuesSerializer`` reads the same columns as tuples,
+joined in the one query, and maps each with a function picked once per
+class from the serializer's own fields, so the rendered JSON is the same
+as the serializer's.
+
+Fields the serializer computes itself (method fields, ``source="*"``,
+reverse and many-to-many relations) are filled by a ``load_<field>(rows)``
+method of the subclass, which gets every row of the list at once and
+returns a function of one row.
+"""
+import threading
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+
+class _Skip:
+    """Marks a field the serializer would leave out of a row."""
+
+
+SKIP = _Skip()
+
+
+def _identity(value):
+    return value
+
+
+def _value_mapper(field, model_field):
+    """A function taking a non-null column value to its representation."""
+    kind = type(field)
+    if kind is serializers.CharField:
+        return str
+    if kind is serializers.IntegerField:
+        return int
+    if kind is serializers.BooleanField:
+        return bool
+    if kind is serializers.UUIDField and field.uuid_format == "hex_verbose":
+        return str
+    if kind is PrimaryKeyRelatedField and field.pk_field is None:
+        return _identity
+    if isinstance(model_field, models.FileField):
+        # The column holds the name; the serializer renders the file's URL,
+        # made absolute in ``data`` when there is a request.
+        storage = model_field.storage
+        if not _uses_url(field):
+            return lambda name: name or None
+        return lambda name: storage.url(name) if name else None
+    return field.to_representation
+
+
+def _uses_url(field):
+    return getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+
+
+def _missing_relation(field):
+    """What the serializer renders when a relation on the source is null."""
+    if field.default is not empty:
+        return field.get_default
+    if field.allow_null:
+        return lambda: None
+    if not field.required:
+        return lambda: SKIP
+    return None
+
+
+class ValuesSerializer:
+    """
+    The output of ``serializer_class`` for the rows of a queryset, without
+    building the rows as model instances.
+    """
+
+    serializer_class = None
+    _compiled = None
+    _lock = threading.Lock()
+
+    def __init__(self, queryset, context=None):
+        self.queryset = queryset
+        self.context = context or {}
+
+    @classmethod
+    def compile(cls):
+        """
+        ``(lookups, fields, urls)`` of the serializer: the columns to read;
+        per field ``(name, column, mapper, relations, missing)``, with the
+        column positions of the relations on the way to it and what to do
+        when one is null, or ``(name, loader, None, (), None)``; and the
+        fields holding file URLs.
+        """
+        serializer = cls.serializer_class()
+        model = serializer.Meta.model
+        lookups = [model._meta.pk.name]
+        fields = []
+        urls = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            plan = cls._plan(model, field)
+            if plan is None:
+                loader = f"load_{name}"
+                if not hasattr(cls, loader):
+                    raise TypeError(
+                        f"{cls.__name__} cannot read {cls.serializer_class.__name__}."
+                        f"{name} from the columns; define {loader}()."
+                    )
+                fields.append((name, loader, None, (), None))
+                continue
+            lookup, relations, model_field = plan
+            missing = _missing_relation(field) if relations else None
+            if relations and missing is None:
+                raise TypeError(f"{name} is required but its relation may be null.")
+            positions = []
+            for column in [*relations, lookup]:
+                if column not in lookups:
+                    lookups.append(column)
+                positions.append(lookups.index(column))
+            fields.append(
+                (
+                    name,
+                    positions[-1],
+                    _value_mapper(field, model_field),
+                    tuple(positions[:-1]),
+                    missing,
+                )
+            )
+            if isinstance(model_field, models.FileField) and _uses_url(field):
+                urls.append(name)
+        return lookups, fields, urls
+
+    @staticmethod
+    def _plan(model, field):
+        """``(lookup, relation lookups, model field)`` of a column field."""
+        if isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+            return None
+        path = []
+        relations = []
+        attrs = field.source.split(".")
+        for position, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            path.append(attr)
+            last = position == len(attrs) - 1
+            if model_field.many_to_many or model_field.one_to_many:
+                return None
+            if model_field.is_relation and not last:
+                relations.append("__".join(path))
+                model = model_field.related_model
+            elif not model_field.is_relation and not last:
+                return None
+        return "__".join(path), relations, model_field
+
+    @classmethod
+    def compiled(cls):
+        if cls.__dict__.get("_compiled") is None:
+            with cls._lock:
+                if cls.__dict__.get("_compiled") is None:
+                    cls._compiled = cls.compile()
+        return cls._compiled
+
+    @property
+    def data(self):
+        lookups, fields, urls = self.compiled()
+        rows = list(self.queryset.values_list(*lookups))
+        loaded = {}
+        loaders = [(name, loader) for name, loader, mapper, _, _ in fields if mapper is None]
+        if loaders:
+            named = [dict(zip(lookups, row)) for row in rows]
+            for name, loader in loaders:
+                loaded[name] = getattr(self, loader)(named)
+        else:
+            named = rows
+
+        data = []
+        for row, named_row in zip(rows, named):
+            item = {}
+            for name, position, mapper, related, missing in fields:
+                if mapper is None:
+                    item[name] = loaded[name](named_row)
+                    continue
+                if related and None in [row[index] for index in related]:
+                    value = missing()
+                    if value is not SKIP:
+                        item[name] = value
+                    continue
+                value = row[position]
+                item[name] = None if value is None else mapper(value)
+            data.append(item)
+
+        request = self.context.get("request")
+        if request is not None:
+            for item in data:
+                for name in urls:
+                    if item.get(name) is not None:
+                        item[name] = request.build_absolute_uri(item[name])
+        return data
+
@@ -0,0 +1,171 @@
+"""
+Sparse fieldsets.
+
+A client asks for some of a serializer's fields with ``?fields=id,name`` or
+for a named set of them with ``?projection=``. The serializer then builds
+and renders only those fields, and the queryset is narrowed with
+``only()``, ``select_related()`` and ``prefetch_related()`` to the columns
+and relations they read. Model fields are followed through their
+``source``; a serializer lists what its other fields read in
+``field_requirements``, and a field it does not list leaves the query as
+it is.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from drf_yasg import openapi
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+SPARSE_FIELD_PARAMETERS = [
+    openapi.Parameter(
+        "fields",
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        description="Comma separated fields to return.",
+    ),
+    openapi.Parameter(
+        "projection",
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        description="A named set of fields to return.",
+    ),
+]
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Renders only the fields named in ``context["fields"]``, when given.
+
+    ``field_requirements`` maps a field that is not a model field, or
+    reads more than its ``source``, to what it needs loaded: lists of
+    ``only``, ``select_related`` and ``prefetch_related`` lookups.
+    """
+
+    field_requirements = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        # Nested serializers share the context but not the field names.
+        if requested is None or self.root not in (self, self.parent):
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
+
+
+def _model_field_requirements(model, field):
+    """What a field rendering a model field through its source needs."""
+    if isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+        return None
+    path = []
+    related = []
+    for position, attr in enumerate(field.source.split(".")):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        path.append(attr)
+        lookup = "__".join(path)
+        last = position == len(field.source.split(".")) - 1
+        if model_field.many_to_many or model_field.one_to_many:
+            return {"prefetch_related": [lookup]} if last else None
+        if model_field.is_relation and not last:
+            related.append(lookup)
+            model = model_field.related_model
+        elif not model_field.is_relation and not last:
+            return None
+    return {"only": [*related, lookup], "select_related": related}
+
+
+def project_queryset(queryset, serializer_class, names):
+    """
+    Narrow ``queryset`` to what the ``names`` fields of
+    ``serializer_class`` read, or return it unchanged when one of them is
+    not known.
+    """
+    fields = serializer_class().fields
+    requirements = getattr(serializer_class, "field_requirements", {})
+    only = {queryset.model._meta.pk.name}
+    related = set()
+    prefetch = {}
+    for name in names:
+        needs = requirements.get(name)
+        if needs is None:
+            needs = _model_field_requirements(queryset.model, fields[name])
+        if needs is None:
+            return queryset
+        related.update(needs.get("select_related", ()))
+        only.update(needs.get("only", ()))
+        only.update(needs.get("select_related", ()))
+        for lookup in needs.get("prefetch_related", ()):
+            key = lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            prefetch.setdefault(key, lookup)
+
+    queryset = queryset.select_related(None).prefetch_related(None).only(*only)
+    if related:
+        queryset = queryset.select_related(*related)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch.values())
+    return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Lets the ``GET`` requests of a view ask for ``?fields=`` or one of the
+    named ``field_projections`` with ``?projection=``. Its serializers use
+    SparseFieldsSerializerMixin and its ``get_queryset`` goes through
+    ``sparse_queryset``.
+    """
+
+    field_projections = {}
+
+    def get_sparse_fields(self, serializer_class=None):
+        """The field names asked for, or ``None`` for every field."""
+        params = self.request.query_params
+        projection = params.get("projection")
+        if projection:
+            if projection not in self.field_projections:
+                raise ValidationError(
+                    {
+                        "projection": [
+                            f"Unknown projection {projection!r}. Available "
+                            f"projections: {', '.join(self.field_projections)}."
+                        ]
+                    }
+                )
+            names = list(self.field_projections[projection])
+        else:
+            names = [
+                name.strip()
+                for name in params.get("fields", "").split(",")
+                if name.strip()
+            ]
+            if not names:
+                return None
+
+        available = (serializer_class or self.get_serializer_class())().fields
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError(
+                {
+                    "fields": [
+                        f"Unknown fields: {', '.join(unknown)}. "
+                        f"Available fields: {', '.join(available)}."
+                    ]
+                }
+            )
+        return names
+
+    def sparse_queryset(self, queryset, serializer_class=None):
+        names = self.get_sparse_fields(serializer_class)
+        if names is None:
+            return queryset
+        return project_queryset(
+            queryset, serializer_class or self.get_serializer_class(), names
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == "GET":
+            context["fields"] = self.get_sparse_fields()
+        return context
@@ -16,7 +16,19 @@ from django.utils.crypto import get_random_string
 from datetime import timedelta
 import datetime
 
-from django.db.models import Case, Value, When
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    IntegrityError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import Max
 # from notification.models import FCMDevice
 from django.contrib.contenttypes.models import ContentType
 
@@ -67,12 +79,191 @@ def get_client_ip(request):
 #                 message += str(err) + "|"
 #     return message[:-1]
 
+# Ids reserved per process and table when the database has sequences.
+AUTO_ID_BLOCK_SIZE = 20
+
+_auto_id_blocks = {}
+_auto_id_lock = threading.Lock()
+_auto_id_connections = threading.local()
+
+
 def get_auto_id(model):
-    queryset = model.objects.all()
-    if queryset.exists():
-        return int(queryset.order_by("-auto_id","-date_added").first().auto_id) + 1
-    else:
-        return 1
+    return get_auto_ids(model, 1)[0]
+
+
+def get_auto_ids(model, count):
+    """
+    Allocate ``count`` unique ``auto_id`` values for ``model``.
+
+    On PostgreSQL the ids come from a per-table sequence, which is never
+    rolled back, so each process keeps a block of ``AUTO_ID_BLOCK_SIZE`` ids
+    and only goes back to the database when it runs out. Elsewhere a row of
+    ``AutoIdSequence`` is incremented in a short transaction of its own
+    connection, or in the current one on SQLite. Both start from the
+    table's ``MAX(auto_id)`` the first time they are used.
+    """
+    if count <= 0:
+        return []
+    if connection.vendor == "postgresql":
+        return _sequence_auto_ids(model, count)
+    return _counter_auto_ids(model, count)
+
+
+def _max_auto_id(model):
+    return model._base_manager.aggregate(max_id=Max("auto_id"))["max_id"] or 0
+
+
+def _sequence_name(model):
+    return f"{model._meta.db_table}_auto_id_seq"[:63]
+
+
+def _sequence_auto_ids(model, count):
+    name = _sequence_name(model)
+    with _auto_id_lock:
+        block = _auto_id_blocks.get(name, [])
+        if len(block) < count:
+            fetched, cacheable = _fetch_sequence_values(model, name, count + AUTO_ID_BLOCK_SIZE)
+            if not cacheable:
+                return fetched[:count]
+            block = block + fetched
+        ids, _auto_id_blocks[name] = block[:count], block[count:]
+    return ids
+
+
+def _fetch_sequence_values(model, name, count):
+    """
+    Return ``(values, cacheable)``; values from a sequence created in the
+    current transaction are not cached, as a rollback would drop it.
+    """
+    quoted = connection.ops.quote_name(name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [quoted])
+        created = cursor.fetchone()[0] is None
+        if created:
+            try:
+                with transaction.atomic():
+                    cursor.execute(f"CREATE SEQUENCE {quoted}")
+            except DatabaseError:
+                # Another process created it since the check.
+                created = False
+        if created:
+            cursor.execute(
+                "SELECT setval(%s, %s, false)", [quoted, _max_auto_id(model) + 1]
+            )
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)", [quoted, count]
+        )
+        values = [row[0] for row in cursor.fetchall()]
+    return values, not created
+
+
+def _counter_auto_ids(model, count):
+    if connection.vendor == "sqlite":
+        # SQLite has a single writer: another connection would only wait for
+        # the lock of this one, so the counter moves in this transaction.
+        with transaction.atomic():
+            last_value = _increment_counter(connection, model, count)
+        return list(range(last_value - count + 1, last_value + 1))
+
+    counter = _counter_connection()
+    counter.set_autocommit(False)
+    try:
+        last_value = _increment_counter(counter, model, count)
+        counter.commit()
+    except BaseException:
+        counter.rollback()
+        raise
+    finally:
+        counter.set_autocommit(True)
+    return list(range(last_value - count + 1, last_value + 1))
+
+
+def _counter_connection():
+    """
+    This thread's connection for the counters. Their rows are committed at
+    once, so their locks are not held until the request's transaction ends.
+    """
+    counter = getattr(_auto_id_connections, "connection", None)
+    if counter is None:
+        counter = connections.create_connection(DEFAULT_DB_ALIAS)
+        _auto_id_connections.connection = counter
+    counter.close_if_unusable_or_obsolete()
+    return counter
+
+
+def _increment_counter(db, model, count):
+    """Add ``count`` to the ``AutoIdSequence`` row of ``model``; the new value."""
+    from apps.main.models import AutoIdSequence
+
+    name = model._meta.label_lower
+    table = db.ops.quote_name(AutoIdSequence._meta.db_table)
+    update = f"UPDATE {table} SET last_value = last_value + %s WHERE name = %s"
+    with db.cursor() as cursor:
+        cursor.execute(update, [count, name])
+        if not cursor.rowcount:
+            savepoint = db.savepoint()
+            try:
+                cursor.execute(
+                    f"INSERT INTO {table} (name, last_value) VALUES (%s, %s)",
+                    [name, _max_auto_id(model) + count],
+                )
+            except IntegrityError:
+                # Another allocation created the row since the update.
+                db.savepoint_rollback(savepoint)
+                cursor.execute(update, [count, name])
+            else:
+                db.savepoint_commit(savepoint)
+        cursor.execute(f"SELECT last_value FROM {table} WHERE name = %s", [name])
+        return cursor.fetchone()[0]
+
+
+def _initial_cache_version():
+    # Clock based, so a version lost to eviction restarts above any version
+    # that older cached entries could still carry.
+    return time.time_ns() // 1000
+
+
+def get_cache_version(namespace, organization_id):
+    """Current cache generation of ``namespace`` for one organization."""
+    return cache.get_or_set(
+        f"{namespace}:version:{organization_id}", _initial_cache_version, timeout=None
+    )
+
+
+def bump_cache_version(namespace, organization_id):
+    """
+    Invalidate every cached entry of ``namespace`` for one organization.
+
+    Keys embed the version, so bumping it orphans the old entries (they
+    expire on their own) without having to know or delete them. Returns the
+    new version, or ``None`` when a concurrent bump set it first.
+    """
+    key = f"{namespace}:version:{organization_id}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_cache_version()
+        return version if cache.add(key, version, timeout=None) else None
+
+
+def bump_cache_version_on_commit(namespace, organization_ids):
+    # After commit, so a concurrent reader cannot cache pre-commit data
+    # under the new version.
+    organization_ids = {str(organization_id) for organization_id in organization_ids}
+    transaction.on_commit(
+        lambda: [
+            bump_cache_version(namespace, organization_id)
+            for organization_id in organization_ids
+        ]
+    )
+
+
+def versioned_cache_key(namespace, organization_id, *parts):
+    version = get_cache_version(namespace, organization_id)
+    return ":".join(
+        [namespace, str(organization_id), f"v{version}", *(str(part) for part in parts)]
+    )
+
 
 # def get_auto_id(model):
 #     """Generate a unique auto_id for the given model_class."""
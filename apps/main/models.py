@@ -17,7 +17,10 @@
 #         abstract = True
 
 import uuid
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Concat, Substr
 
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -30,3 +33,153 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class HierarchyMixin(models.Model):
+    """
+    Materialized path over a self-referencing ``parent_field``.
+
+    ``path`` holds the ``auto_id`` of every ancestor and of the row itself,
+    each followed by ``PATH_SEPARATOR``, so a subtree is a single prefix
+    match and a move rewrites the descendants in one UPDATE. The path is
+    maintained by ``save``; rows written with ``bulk_create`` or
+    ``QuerySet.update`` need ``rebuild_paths``.
+    """
+
+    PATH_SEPARATOR = "/"
+
+    parent_field = None
+
+    path = models.CharField(
+        max_length=1024, blank=True, default="", db_index=True, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def path_segment(self):
+        return f"{self.auto_id}{self.PATH_SEPARATOR}"
+
+    def _stored_path(self, pk):
+        if pk is None:
+            return ""
+        return (
+            type(self)
+            ._default_manager.filter(pk=pk)
+            .values_list("path", flat=True)
+            .first()
+            or ""
+        )
+
+    def creates_cycle(self, parent):
+        """Whether making ``parent`` this row's parent would form a cycle."""
+        if parent is None or self._state.adding:
+            return False
+        if parent.pk == self.pk:
+            return True
+        current = self._stored_path(self.pk)
+        return bool(current) and self._stored_path(parent.pk).startswith(current)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        parent_attname = f"{self.parent_field}_id"
+        if update_fields is not None and not {
+            self.parent_field,
+            parent_attname,
+        } & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        parent_id = getattr(self, parent_attname)
+        old_path = "" if self._state.adding else self._stored_path(self.pk)
+        parent_path = self._stored_path(parent_id)
+        if parent_id == self.pk or (old_path and parent_path.startswith(old_path)):
+            raise ValidationError(
+                {self.parent_field: "A record cannot be moved under itself."}
+            )
+        self.path = parent_path + self.path_segment
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "path"}
+        super().save(*args, **kwargs)
+
+        if old_path and old_path != self.path:
+            type(self)._default_manager.filter(path__startswith=old_path).exclude(
+                pk=self.pk
+            ).update(path=Concat(Value(self.path), Substr("path", len(old_path) + 1)))
+
+    def get_descendants(self, include_self=True):
+        descendants = type(self)._default_manager.filter(path__startswith=self.path)
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
+
+    def get_ancestors(self, include_self=False):
+        auto_ids = [
+            int(segment) for segment in self.path.split(self.PATH_SEPARATOR) if segment
+        ]
+        if not include_self:
+            auto_ids = auto_ids[:-1]
+        return type(self)._default_manager.filter(auto_id__in=auto_ids)
+
+    @classmethod
+    def subtree_q(cls, lookup, pk):
+        """
+        ``Q`` matching rows whose ``lookup`` is the row ``pk`` or one of its
+        descendants. The path is read in a subquery, so filtering costs no
+        extra query.
+        """
+        path = cls._default_manager.filter(pk=pk).values("path")[:1]
+        return Q(**{f"{lookup}__path__startswith": Subquery(path)})
+
+    @classmethod
+    def rebuild_paths(cls, organization_id=None, batch_size=1000):
+        """Recompute ``path`` from the parent links; returns the rows changed."""
+        rows = cls._default_manager.all()
+        if organization_id is not None:
+            rows = rows.filter(organization_id=organization_id)
+        nodes = {
+            pk: (auto_id, parent_id, path)
+            for pk, auto_id, parent_id, path in rows.values_list(
+                "pk", "auto_id", f"{cls.parent_field}_id", "path"
+            ).iterator()
+        }
+        paths = {}
+
+        for pk in nodes:
+            chain = []
+            ancestor = pk
+            while ancestor in nodes and ancestor not in paths and ancestor not in chain:
+                chain.append(ancestor)
+                ancestor = nodes[ancestor][1]
+            # A parent outside ``nodes`` or a cycle starts a new root.
+            prefix = paths.get(ancestor, "")
+            for node in reversed(chain):
+                prefix += f"{nodes[node][0]}{cls.PATH_SEPARATOR}"
+                paths[node] = prefix
+
+        changed = [
+            cls(pk=pk, path=paths[pk])
+            for pk, (_, _, path) in nodes.items()
+            if path != paths[pk]
+        ]
+        cls._default_manager.bulk_update(changed, ["path"], batch_size=batch_size)
+        return len(changed)
+
+
+class AutoIdSequence(models.Model):
+    """
+    Last ``auto_id`` handed out per table.
+
+    Used by ``apps.main.functions.get_auto_ids`` on databases without native
+    sequences; the row is locked by the incrementing UPDATE, so concurrent
+    allocations serialize on it instead of racing on ``MAX(auto_id)``.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+    class Meta:
+        db_table = "auto_id_sequence"
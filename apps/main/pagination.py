@@ -1,7 +1,103 @@
+import base64
+import json
+
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPagination(pagination.PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 1000
-    page_query_param = 'page'
\ No newline at end of file
+    page_query_param = 'page'
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination over a composite, unique ``ordering``.
+
+    Each page is fetched with ``WHERE (ordering) > (last row)`` instead of an
+    OFFSET, so deep pages cost the same as the first one. Works with model
+    querysets and ``values()`` querysets alike. ``ordering`` fields must not
+    be NULL and the last one must be unique.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    ordering = ("id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = getattr(view, "keyset_ordering", None) or self.ordering
+
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        if cursor is not None:
+            queryset = queryset.filter(self._after(ordering, cursor))
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_cursor = (
+            self.encode_cursor([self._value(rows[-1], field) for field in ordering])
+            if self.has_next
+            else None
+        )
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "results": data,
+            }
+        )
+
+    @staticmethod
+    def encode_cursor(values):
+        payload = json.dumps([str(value) for value in values]).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+        if not isinstance(values, list):
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+        return values
+
+    @staticmethod
+    def _value(row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    @staticmethod
+    def _after(ordering, values):
+        # (a, b, c) > (x, y, z)  <=>  a > x OR (a = x AND (b > y OR (b = y AND c > z)))
+        if len(values) != len(ordering):
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+        condition = None
+        for field, value in reversed(list(zip(ordering, values))):
+            greater = Q(**{f"{field}__gt": value})
+            condition = greater if condition is None else greater | (Q(**{field: value}) & condition)
+        return condition
@@ -0,0 +1,23 @@
+from django.db import connection
+
+
+class IndexUsageMixin:
+    """
+    ``assertUsesIndex`` checks the plan of a query names an index.
+
+    SQLite plans as if a table without statistics held about a million
+    rows; PostgreSQL would scan the few rows of a test table, so sequential
+    scans are turned off for the plan, leaving it to show whether an index
+    can serve the query at all.
+    """
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan, f"{index_name} is not used:\n{plan}")
+        return plan
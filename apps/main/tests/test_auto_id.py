@@ -0,0 +1,70 @@
+from unittest import mock, skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.item.models import Godown, MeasurementUnit
+from apps.main import functions
+from apps.main.functions import get_auto_id, get_auto_ids
+from apps.main.models import AutoIdSequence
+
+
+class AutoIdAllocatorTest(TestCase):
+    def test_starts_after_existing_rows(self):
+        Godown.objects.create(auto_id=41, name="Main")
+
+        self.assertEqual(get_auto_id(Godown), 42)
+        self.assertEqual(get_auto_id(Godown), 43)
+
+    def test_bulk_allocation_is_contiguous_and_unique(self):
+        first = get_auto_ids(MeasurementUnit, 3)
+        second = get_auto_ids(MeasurementUnit, 2)
+
+        self.assertEqual(first, [1, 2, 3])
+        self.assertEqual(second, [4, 5])
+        self.assertEqual(get_auto_ids(MeasurementUnit, 0), [])
+
+    def test_counters_are_per_table(self):
+        get_auto_ids(Godown, 5)
+
+        self.assertEqual(get_auto_id(MeasurementUnit), 1)
+        self.assertEqual(
+            dict(AutoIdSequence.objects.values_list("name", "last_value")),
+            {"item.godown": 5, "item.measurementunit": 1},
+        )
+
+    def test_allocation_does_not_scan_the_table_once_initialised(self):
+        get_auto_id(Godown)
+
+        # UPDATE of the counter row and the read back, inside a savepoint.
+        with self.assertNumQueries(4):
+            get_auto_id(Godown)
+
+
+@skipUnless(
+    connection.vendor not in ("postgresql", "sqlite"),
+    "Counters use a connection of their own on other databases only.",
+)
+class CounterConnectionAutoIdTest(TransactionTestCase):
+    def test_ids_are_not_reused_after_a_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                first = get_auto_id(Godown)
+                raise RuntimeError
+
+        self.assertEqual(get_auto_id(Godown), first + 1)
+
+
+@skipUnless(connection.vendor == "postgresql", "Sequences are used on PostgreSQL only.")
+class SequenceAutoIdTest(TestCase):
+    def test_refills_do_not_create_the_sequence_again(self):
+        get_auto_id(Godown)
+
+        with mock.patch.dict(functions._auto_id_blocks, clear=True):
+            with CaptureQueriesContext(connection) as context:
+                get_auto_id(Godown)
+
+        statements = [query["sql"] for query in context]
+        self.assertTrue(any("to_regclass" in sql for sql in statements))
+        self.assertFalse(any("CREATE SEQUENCE" in sql for sql in statements))